@@ -0,0 +1,58 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.core.config import settings
+from app.db import base_class, session
+
+# 导入所有模型，使两套声明基类的元数据完整
+import app.models  # noqa
+import app.models.monitor.job  # noqa
+import app.models.monitor.job_stat  # noqa
+import app.models.monitor.login_log  # noqa
+import app.models.monitor.online  # noqa
+import app.models.monitor.oper_log  # noqa
+import app.models.system.dict  # noqa
+import app.models.tool.gen  # noqa
+import app.models.utils.config  # noqa
+
+config = context.config
+config.set_main_option("sqlalchemy.url", settings.DATABASE_URL.replace("%", "%%"))
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+# 模型分别继承app.db.session.Base和app.db.base_class.Base
+target_metadata = [session.Base.metadata, base_class.Base.metadata]
+
+
+def run_migrations_offline() -> None:
+    """生成SQL脚本而不连接数据库"""
+    context.configure(
+        url=config.get_main_option("sqlalchemy.url"),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """连接数据库执行迁移"""
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section, {}),
+        prefix="sqlalchemy.",
+        poolclass=pool.NullPool,
+    )
+    with connectable.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
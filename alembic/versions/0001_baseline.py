@@ -0,0 +1,25 @@
+"""基线：sql/myfast_admin_20250612.sql导入后的表结构
+
+已有数据库执行 alembic stamp 0001_baseline 标记为基线，不做任何改动；
+新环境先导入SQL脚本再执行 alembic upgrade head。
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2025-06-12 00:00:00
+
+"""
+from typing import Sequence, Union
+
+
+revision: str = "0001_baseline"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    pass
+
+
+def downgrade() -> None:
+    pass
@@ -0,0 +1,53 @@
+"""热点查询索引
+
+- sys_user(dept_id, status, del_flag)：按部门和状态筛选用户
+- sys_dict_data(dict_type, status, dict_sort)：按类型获取启用字典并排序，避免filesort
+- sys_menu(parent_id, order_num)：菜单列表和菜单树排序
+- sys_job_log(job_group, status)、sys_job_log(create_time)：日志筛选、时间范围查询和保留策略
+- sys_role_menu(menu_id)：主键以role_id开头，按菜单反查角色需要单独索引
+
+Revision ID: 0002_hot_query_indexes
+Revises: 0001_baseline
+Create Date: 2025-06-20 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0002_hot_query_indexes"
+down_revision: Union[str, None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_sys_user_dept_status", "sys_user", ["dept_id", "status", "del_flag"]),
+    ("ix_sys_dict_data_type_status_sort", "sys_dict_data", ["dict_type", "status", "dict_sort"]),
+    ("ix_sys_menu_parent_order", "sys_menu", ["parent_id", "order_num"]),
+    ("ix_sys_job_log_group_status", "sys_job_log", ["job_group", "status"]),
+    ("ix_sys_job_log_create_time", "sys_job_log", ["create_time"]),
+    ("ix_sys_role_menu_menu_id", "sys_role_menu", ["menu_id"]),
+]
+
+
+def _existing_indexes(table: str) -> set:
+    # 离线生成SQL时无法检查数据库
+    if context.is_offline_mode():
+        return set()
+    inspector = sa.inspect(op.get_bind())
+    return {index["name"] for index in inspector.get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        # 手工建过同名索引的环境跳过
+        if name not in _existing_indexes(table):
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        if name in _existing_indexes(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,123 @@
+"""列表筛选的全文索引
+
+- MySQL：为每个搜索列建立单列FULLTEXT索引（ngram解析器，支持中文）。停用词在建索引时生效，
+  建议先设置innodb_ft_enable_stopword=0（my.cnf），否则含a、i等字母的英文搜索词只能使用LIKE
+- SQLite：为每张表建立FTS5外部内容表{table}_fts（trigram分词）及同步触发器
+其他数据库不做改动，搜索退回内存n-gram索引或LIKE。列清单与app/db/search.py中的SEARCHABLE_COLUMNS一致。
+
+Revision ID: 0003_search_indexes
+Revises: 0002_hot_query_indexes
+Create Date: 2025-06-25 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "0003_search_indexes"
+down_revision: Union[str, None] = "0002_hot_query_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# 表名 -> (主键, 搜索列)
+SEARCHABLE_COLUMNS = {
+    "sys_user": ("user_id", ["username", "nickname"]),
+    "sys_role": ("role_id", ["role_name", "role_key"]),
+    "sys_post": ("post_id", ["post_name", "post_code"]),
+    "sys_dept": ("dept_id", ["dept_name"]),
+    "sys_menu": ("menu_id", ["menu_name"]),
+    "sys_dict_type": ("dict_id", ["dict_name", "dict_type"]),
+    "sys_dict_data": ("dict_code", ["dict_label"]),
+    "sys_config": ("config_id", ["config_name", "config_key", "config_value"]),
+    "sys_job": ("job_id", ["job_name", "job_group", "invoke_target"]),
+    "sys_job_log": ("job_log_id", ["job_name"]),
+    "gen_table": ("id", ["table_name", "table_comment"]),
+}
+
+
+def _existing_tables() -> set:
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _upgrade_mysql() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, (_, columns) in SEARCHABLE_COLUMNS.items():
+        if table not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        for column in columns:
+            name = f"ft_{table}_{column}"
+            if name not in existing:
+                op.execute(f"ALTER TABLE `{table}` ADD FULLTEXT INDEX `{name}` (`{column}`) WITH PARSER ngram")
+
+
+def _downgrade_mysql() -> None:
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    for table, (_, columns) in SEARCHABLE_COLUMNS.items():
+        if table not in tables:
+            continue
+        existing = {index["name"] for index in inspector.get_indexes(table)}
+        for column in columns:
+            name = f"ft_{table}_{column}"
+            if name in existing:
+                op.drop_index(name, table_name=table)
+
+
+def _upgrade_sqlite() -> None:
+    tables = _existing_tables()
+    for table, (pk, columns) in SEARCHABLE_COLUMNS.items():
+        fts = f"{table}_fts"
+        if table not in tables or fts in tables:
+            continue
+        cols = ", ".join(columns)
+        new_cols = ", ".join(f"new.{c}" for c in columns)
+        old_cols = ", ".join(f"old.{c}" for c in columns)
+        op.execute(
+            f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}', content_rowid='{pk}', tokenize='trigram')"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new_cols}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old_cols}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.{pk}, {old_cols}); "
+            f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.{pk}, {new_cols}); END"
+        )
+        # 为已有数据建立索引
+        op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _downgrade_sqlite() -> None:
+    tables = _existing_tables()
+    for table in SEARCHABLE_COLUMNS:
+        fts = f"{table}_fts"
+        if fts not in tables:
+            continue
+        for suffix in ("ai", "ad", "au"):
+            op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+        op.execute(f"DROP TABLE {fts}")
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "mysql":
+        _upgrade_mysql()
+    elif dialect == "sqlite":
+        _upgrade_sqlite()
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == "mysql":
+        _downgrade_mysql()
+    elif dialect == "sqlite":
+        _downgrade_sqlite()
@@ -0,0 +1,74 @@
+"""操作日志审计
+
+sys_oper_log由审计中间件批量写入：
+- 新增列perms（接口要求的权限标识）、cost_time（耗时毫秒）、request_id（请求关联ID）
+- sys_oper_log(oper_time)：按时间倒序分页和时间范围查询
+- sys_oper_log(status, oper_time)、sys_oper_log(oper_name, oper_time)：按状态或操作人员筛选后按时间排序
+
+Revision ID: 0004_oper_log_audit
+Revises: 0003_search_indexes
+Create Date: 2025-06-28 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0004_oper_log_audit"
+down_revision: Union[str, None] = "0003_search_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "sys_oper_log"
+
+
+def _new_columns() -> list:
+    return [
+        sa.Column("perms", sa.String(100), server_default="", comment="接口要求的权限标识"),
+        sa.Column("cost_time", sa.BigInteger(), server_default="0", comment="消耗时间（毫秒）"),
+        sa.Column("request_id", sa.String(64), server_default="", comment="请求关联ID"),
+    ]
+
+
+INDEXES = [
+    ("ix_sys_oper_log_oper_time", ["oper_time"]),
+    ("ix_sys_oper_log_status_time", ["status", "oper_time"]),
+    ("ix_sys_oper_log_name_time", ["oper_name", "oper_time"]),
+]
+
+
+def _existing_columns() -> set:
+    # 离线生成SQL时无法检查数据库
+    if context.is_offline_mode():
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(TABLE)}
+
+
+def _existing_indexes() -> set:
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(TABLE)}
+
+
+def upgrade() -> None:
+    columns = _existing_columns()
+    for column in _new_columns():
+        if column.name not in columns:
+            op.add_column(TABLE, column)
+    indexes = _existing_indexes()
+    for name, index_columns in INDEXES:
+        if name not in indexes:
+            op.create_index(name, TABLE, index_columns)
+
+
+def downgrade() -> None:
+    indexes = _existing_indexes()
+    for name, _ in reversed(INDEXES):
+        if name in indexes:
+            op.drop_index(name, table_name=TABLE)
+    columns = _existing_columns()
+    for column in reversed(_new_columns()):
+        if column.name in columns:
+            op.drop_column(TABLE, column.name)
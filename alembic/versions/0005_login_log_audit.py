@@ -0,0 +1,74 @@
+"""登录日志
+
+sys_login_log由登录接口批量写入：
+- 新增列request_id（请求关联ID）
+- sys_login_log(login_time)：按时间倒序分页、时间范围统计和清理
+- sys_login_log(status, login_time)、sys_login_log(user_name, login_time)、sys_login_log(ipaddr, login_time)：
+  按状态、账号或IP筛选后按时间排序
+
+Revision ID: 0005_login_log_audit
+Revises: 0004_oper_log_audit
+Create Date: 2025-06-29 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0005_login_log_audit"
+down_revision: Union[str, None] = "0004_oper_log_audit"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLE = "sys_login_log"
+
+
+def _new_columns() -> list:
+    return [
+        sa.Column("request_id", sa.String(64), server_default="", comment="请求关联ID"),
+    ]
+
+
+INDEXES = [
+    ("ix_sys_login_log_login_time", ["login_time"]),
+    ("ix_sys_login_log_status_time", ["status", "login_time"]),
+    ("ix_sys_login_log_name_time", ["user_name", "login_time"]),
+    ("ix_sys_login_log_ip_time", ["ipaddr", "login_time"]),
+]
+
+
+def _existing_columns() -> set:
+    # 离线生成SQL时无法检查数据库
+    if context.is_offline_mode():
+        return set()
+    return {column["name"] for column in sa.inspect(op.get_bind()).get_columns(TABLE)}
+
+
+def _existing_indexes() -> set:
+    if context.is_offline_mode():
+        return set()
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(TABLE)}
+
+
+def upgrade() -> None:
+    columns = _existing_columns()
+    for column in _new_columns():
+        if column.name not in columns:
+            op.add_column(TABLE, column)
+    indexes = _existing_indexes()
+    for name, index_columns in INDEXES:
+        if name not in indexes:
+            op.create_index(name, TABLE, index_columns)
+
+
+def downgrade() -> None:
+    indexes = _existing_indexes()
+    for name, _ in reversed(INDEXES):
+        if name in indexes:
+            op.drop_index(name, table_name=TABLE)
+    columns = _existing_columns()
+    for column in reversed(_new_columns()):
+        if column.name in columns:
+            op.drop_column(TABLE, column.name)
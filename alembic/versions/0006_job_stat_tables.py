@@ -0,0 +1,73 @@
+"""定时任务执行统计表
+
+sys_job_stat_hourly、sys_job_stat_daily不在初始化SQL中，此前只由启动预热的schema任务按需创建。
+表已存在（预热任务创建过）时跳过。
+
+Revision ID: 0006_job_stat_tables
+Revises: 0005_login_log_audit
+Create Date: 2025-06-30 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision: str = "0006_job_stat_tables"
+down_revision: Union[str, None] = "0005_login_log_audit"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = [
+    ("sys_job_stat_hourly", "uk_job_stat_hourly", "定时任务执行小时统计表"),
+    ("sys_job_stat_daily", "uk_job_stat_daily", "定时任务执行日统计表"),
+]
+
+
+def _columns() -> list:
+    return [
+        sa.Column("stat_id", sa.Integer(), primary_key=True, autoincrement=True, comment="统计ID"),
+        sa.Column("job_name", sa.String(64), nullable=False, comment="任务名称"),
+        sa.Column("job_group", sa.String(64), nullable=False, comment="任务组名"),
+        sa.Column("stat_time", sa.DateTime(), nullable=False, comment="统计周期开始时间"),
+        sa.Column("total_count", sa.Integer(), server_default="0", comment="执行次数"),
+        sa.Column("success_count", sa.Integer(), server_default="0", comment="成功次数"),
+        sa.Column("fail_count", sa.Integer(), server_default="0", comment="失败次数"),
+        sa.Column("timed_count", sa.Integer(), server_default="0", comment="有耗时记录的执行次数"),
+        sa.Column("min_duration", sa.Float(), nullable=True, comment="最短耗时（毫秒）"),
+        sa.Column("max_duration", sa.Float(), nullable=True, comment="最长耗时（毫秒）"),
+        sa.Column("sum_duration", sa.Float(), server_default="0", comment="总耗时（毫秒）"),
+        sa.Column("p95_duration", sa.Float(), nullable=True, comment="P95耗时（毫秒）"),
+        sa.Column("duration_histogram", sa.String(500), server_default="", comment="耗时分布直方图"),
+        sa.Column("last_failure_time", sa.DateTime(), nullable=True, comment="最近失败时间"),
+        sa.Column("last_failure_message", sa.String(500), nullable=True, comment="最近失败信息"),
+        sa.Column("update_time", sa.DateTime(), nullable=True, comment="更新时间"),
+    ]
+
+
+def _existing_tables() -> set:
+    # 离线生成SQL时无法检查数据库
+    if context.is_offline_mode():
+        return set()
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade() -> None:
+    tables = _existing_tables()
+    for name, unique_name, comment in TABLES:
+        if name in tables:
+            continue
+        op.create_table(
+            name,
+            *_columns(),
+            sa.UniqueConstraint("job_name", "job_group", "stat_time", name=unique_name),
+            comment=comment,
+        )
+
+
+def downgrade() -> None:
+    tables = _existing_tables()
+    for name, _, _ in reversed(TABLES):
+        if name in tables:
+            op.drop_table(name)
@@ -1,35 +1,64 @@
-from typing import Generator
-
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from datetime import datetime
+from functools import partial
+from typing import Any, Dict, List, Optional
+import logging
 
-from app.db.session import SessionLocal
+from app.db.session import SessionLocal, get_db, release_db
+from app.core.cache import cache_namespace
 from app.core.config import settings
 from app.models.system.user import SysUser
 from app.crud.system.user import user
 from app.schemas.utils.token import TokenPayload
 from app.service.monitor.online import ONLINE_KEY_PREFIX
-from app.core.redis import redis_client
+from app.core.redis import redis_available, redis_client
+from app.core.request_context import current_timings, timer
 import json
 
+logger = logging.getLogger(__name__)
+
 
 # 创建OAuth2PasswordBearer依赖项
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
+# async接口认证使用的用户状态和权限缓存，用户、角色、菜单及其关联提交修改后自动失效
+principal_cache = cache_namespace(
+    "principal", ttl=600,
+    tables=("sys_user", "sys_role", "sys_menu", "sys_role_menu", "sys_user_role"),
+)
 
-def get_db() -> Generator:
-    """
-    获取数据库会话
-    """
-    db = SessionLocal()
+
+def _decode_token(token: str) -> int:
+    """解析JWT令牌，返回用户ID"""
     try:
-        yield db
-    finally:
-        db.close()
+        with timer("jwt"):
+            payload = jwt.decode(
+                token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+            token_data = TokenPayload(**payload)
+        return int(token_data.sub)
+    except (jwt.JWTError, ValidationError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无法验证凭据",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def _check_required(user_permissions: List[str], required_permissions: list) -> None:
+    """检查是否拥有全部所需权限，超级管理员拥有所有权限"""
+    if "*:*:*" in user_permissions:
+        return
+    for permission in required_permissions:
+        if permission not in user_permissions:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="没有足够的权限执行此操作",
+            )
 
 
 def get_current_user(
@@ -40,32 +69,20 @@ def get_current_user(
     """
     获取当前用户
     """
-    try:
-        # 解析JWT令牌
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        token_data = TokenPayload(**payload)
-    except (jwt.JWTError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="无法验证凭据",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # 根据令牌中的用户ID获取用户
-    user_id = int(token_data.sub)
-    user_obj = db.query(SysUser).filter(SysUser.user_id == user_id).first()
+    # 解析JWT令牌，根据令牌中的用户ID获取用户
+    user_id = _decode_token(token)
+    with timer("user"):
+        user_obj = db.query(SysUser).filter(SysUser.user_id == user_id).first()
     if not user_obj:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在"
         )
     
-    # 尝试更新在线用户的最后访问时间
-    try:
-        key = f"{ONLINE_KEY_PREFIX}{token}"
-        if redis_client.exists(key):
-            # 获取当前用户信息
+    # 尝试更新在线用户的最后访问时间，Redis熔断期间直接跳过，不等待连接超时
+    if redis_available():
+        try:
+            key = f"{ONLINE_KEY_PREFIX}{token}"
+            # 获取当前用户信息，键不存在时返回None
             user_data = redis_client.get(key)
             if user_data:
                 user_info = json.loads(user_data)
@@ -83,10 +100,17 @@ def get_current_user(
                     settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
                     json.dumps(user_info)
                 )
-    except Exception as e:
-        # 更新在线状态失败不应影响正常业务逻辑
-        print(f"[WARN] 更新在线用户状态失败: {str(e)}")
+        except Exception as e:
+            # 更新在线状态失败不应影响正常业务逻辑
+            logger.warning("更新在线用户状态失败: %s", e)
+    
+    # 记录到请求上下文，供操作日志使用
+    timings = current_timings()
+    if timings is not None:
+        timings.extra["user"] = (user_obj.user_id, user_obj.username)
     
+    # 认证只读取数据，提前归还连接，接口不访问数据库时不再占用连接
+    release_db(db)
     return user_obj
 
 
@@ -110,20 +134,65 @@ def check_permissions(required_permissions: list):
         current_user: SysUser = Depends(get_current_active_user)
     ) -> bool:
         # 获取用户权限
-        user_permissions = user.get_user_permissions(current_user)
+        with timer("perm"):
+            user_permissions = user.get_user_permissions(current_user)
         
-        # 超级管理员拥有所有权限
-        if "*:*:*" in user_permissions:
-            return True
+        release_db(db)
         
-        # 检查是否拥有所需权限
-        for permission in required_permissions:
-            if permission not in user_permissions:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="没有足够的权限执行此操作",
-                )
+        timings = current_timings()
+        if timings is not None:
+            timings.extra["perms"] = required_permissions
         
+        # 检查是否拥有所需权限
+        _check_required(user_permissions, required_permissions)
         return True
     
+    return permission_dependency
+
+
+def _load_principal(user_id: int) -> Optional[Dict[str, Any]]:
+    """查询用户状态和权限（在线程中执行，使用独立会话，结果会被缓存，总是读主库）"""
+    db = SessionLocal()
+    db.use_primary = True
+    try:
+        user_obj = db.query(SysUser).filter(SysUser.user_id == user_id).first()
+        if not user_obj:
+            return None
+        return {
+            "user_id": user_obj.user_id,
+            "username": user_obj.username,
+            "status": user_obj.status,
+            "perms": user.get_user_permissions(user_obj),
+        }
+    finally:
+        db.close()
+
+
+def check_permissions_async(required_permissions: list):
+    """
+    check_permissions的asyncio版本，供线程池饱和时仍需响应的async接口使用
+
+    同步依赖即使挂在async接口上也会在AnyIO线程池中执行。本依赖在事件循环中解码令牌，
+    用户状态和权限从缓存读取（本地层或asyncio Redis客户端），都未命中时才在asyncio默认
+    线程池中查询数据库，整个认证过程不占用AnyIO线程池。不更新在线用户的最后访问时间。
+    """
+    async def permission_dependency(token: str = Depends(oauth2_scheme)) -> bool:
+        user_id = _decode_token(token)
+        with timer("perm"):
+            principal = await principal_cache.aget_or_load(str(user_id), partial(_load_principal, user_id))
+        if not principal:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="用户不存在"
+            )
+        if principal["status"] != "0":
+            raise HTTPException(status_code=400, detail="用户未激活")
+
+        timings = current_timings()
+        if timings is not None:
+            timings.extra["user"] = (principal["user_id"], principal["username"])
+            timings.extra["perms"] = required_permissions
+
+        _check_required(principal["perms"], required_permissions)
+        return True
+
     return permission_dependency 
\ No newline at end of file
@@ -2,7 +2,7 @@ from fastapi import APIRouter
 
 from app.api.v1.auth import login, register, logout
 from app.api.v1.system import user, profile, role, menu, dept, post, dict, config
-from app.api.v1.monitor import online, server, job
+from app.api.v1.monitor import online, server, job, database, cache, operlog, logininfor
 from app.api.v1.tool import gen
 
 # 创建API路由器
@@ -27,6 +27,10 @@ api_router.include_router(config.router, prefix="/system/config", tags=["参数
 api_router.include_router(online.router, prefix="/monitor/online", tags=["在线用户"])
 api_router.include_router(server.router, prefix="/monitor/server", tags=["服务器监控"])
 api_router.include_router(job.router, prefix="/monitor/job", tags=["定时任务"])
+api_router.include_router(database.router, prefix="/monitor/db", tags=["数据库监控"])
+api_router.include_router(cache.router, prefix="/monitor/cache", tags=["缓存监控"])
+api_router.include_router(operlog.router, prefix="/monitor/operlog", tags=["操作日志"])
+api_router.include_router(logininfor.router, prefix="/monitor/logininfor", tags=["登录日志"])
 
 # 代码生成工具路由
 api_router.include_router(gen.router, prefix="/tool/gen", tags=["代码生成"])
\ No newline at end of file
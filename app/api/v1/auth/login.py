@@ -1,5 +1,5 @@
 from datetime import timedelta, datetime
-from typing import Any
+from typing import Any, Optional
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Body
@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_db, get_current_active_user
 from app.core.config import settings
+from app.core.request_context import current_request_id
 from app.crud.system.user import user
 from app.models.system.user import SysUser
 from app.schemas.utils.token import Token
@@ -15,7 +16,10 @@ from app.schemas.system.user import UserLogin, UserInfo
 from app.schemas.utils.common import ResponseModel
 from app.utils.jwt import create_access_token
 from app.service.monitor.online import online_service
+from app.service.monitor.login_guard import LoginLock, login_guard
+from app.service.monitor.login_log_writer import login_log_writer
 from app.core.security import verify_password
+from app.utils.user_agent import parse_user_agent
 
 # 创建日志记录器
 logger = logging.getLogger(__name__)
@@ -23,6 +27,45 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def _client_ip(request: Request) -> str:
+    return request.client.host if request.client else ""
+
+
+def _record_login(request: Request, username: str, success: bool, msg: str, counted: bool = True) -> Optional[LoginLock]:
+    """
+    记录登录日志（放入缓冲区，由后台线程批量写入sys_login_log）并更新登录防护计数
+    :param counted: 是否计入失败次数，账号已锁定、已禁用等与密码无关的失败不计入
+    :return: 本次失败触发的锁定信息
+    """
+    ip_addr = _client_ip(request)
+    if settings.LOGIN_LOG_ENABLED:
+        try:
+            browser, os_name = parse_user_agent(request.headers.get("user-agent", ""))
+            login_log_writer.submit({
+                "user_name": username[:50],
+                "ipaddr": ip_addr,
+                # 地点查询需要访问外部接口，不在登录请求中进行
+                "login_location": "",
+                "browser": browser,
+                "os": os_name,
+                "status": "0" if success else "1",
+                "msg": msg[:255],
+                "login_time": datetime.now(),
+                "request_id": current_request_id() or "",
+            })
+        except Exception as e:
+            # 登录日志失败不影响登录
+            logger.warning("记录登录日志失败: %s", e)
+    if not counted:
+        return None
+    return login_guard.record(username, ip_addr, success)
+
+
+def _lock_message(lock: LoginLock) -> str:
+    target = "账号" if lock.scope == "user" else "IP"
+    return f"登录失败次数过多，{target}已锁定，请{max(1, lock.retry_after // 60)}分钟后再试"
+
+
 @router.post("/login", response_model=ResponseModel[Token], summary="OAuth2标准登录", description="使用OAuth2标准方式登录系统，获取访问令牌")
 def login_access_token(
     request: Request,
@@ -37,19 +80,31 @@ def login_access_token(
     返回:
     - **token**: 访问令牌信息
     """
+    # 账号或IP失败次数过多时直接拒绝，不校验密码
+    lock = login_guard.check(form_data.username, _client_ip(request))
+    if lock:
+        _record_login(request, form_data.username, False, "登录锁定", counted=False)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=_lock_message(lock),
+            headers={"Retry-After": str(lock.retry_after)},
+        )
+
     # 验证用户
     user_obj = user.authenticate(db, username=form_data.username, password=form_data.password)
     if not user_obj:
+        _record_login(request, form_data.username, False, "用户名或密码错误")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="用户名或密码错误",
             headers={"WWW-Authenticate": "Bearer"},
         )
     if not user.is_active(user_obj):
+        _record_login(request, form_data.username, False, "用户未激活", counted=False)
         raise HTTPException(status_code=400, detail="用户未激活")
     
     # 更新登录信息
-    login_ip = request.client.host if request.client else ""
+    login_ip = _client_ip(request)
     db.query(SysUser).filter(SysUser.user_id == user_obj.user_id).update({
         "login_ip": login_ip,
         "login_date": datetime.now()
@@ -64,7 +119,8 @@ def login_access_token(
     
     # 保存在线用户信息到Redis
     online_service.save_online_user(token=token, user=user_obj, ip_addr=login_ip)
-    print(f"[DEBUG] OAuth2登录成功: 用户={user_obj.username}, IP={login_ip}, Token={token[:10]}...")
+    _record_login(request, user_obj.username, True, "登录成功")
+    logger.info("OAuth2登录成功: 用户=%s, IP=%s", user_obj.username, login_ip)
     
     return ResponseModel[Token](
         code=200,
@@ -77,7 +133,7 @@ def login_access_token(
 
 
 @router.post("/account", response_model=ResponseModel[Token], summary="系统账号登录", description="使用用户名密码登录系统，获取访问令牌")
-async def login_account(
+def login_account(
     request: Request,
     db: Session = Depends(get_db), 
     login_info: UserLogin = Body(..., description="登录信息")
@@ -88,20 +144,29 @@ async def login_account(
     username = login_info.username.strip()
     password = login_info.password
     
+    # 账号或IP失败次数过多时直接拒绝，不校验密码
+    lock = login_guard.check(username, _client_ip(request))
+    if lock:
+        _record_login(request, username, False, "登录锁定", counted=False)
+        return ResponseModel(code=429, msg=_lock_message(lock))
+    
     # 查询用户
     db_obj = user.get_by_username(db, username=username)
     if not db_obj:
-        logger.error(f"用户 {username} 不存在")
+        logger.error("用户 %s 不存在", username)
+        _record_login(request, username, False, "用户不存在")
         return ResponseModel(code=403, msg="用户名或密码错误")
     
     # 校验密码
     if not verify_password(password, db_obj.password):
-        logger.error(f"用户 {username} 密码错误")
+        logger.error("用户 %s 密码错误", username)
+        _record_login(request, username, False, "密码错误")
         return ResponseModel(code=403, msg="用户名或密码错误")
     
     # 检查用户状态
     if not db_obj.status or db_obj.status != "0":
-        logger.error(f"用户 {username} 已禁用")
+        logger.error("用户 %s 已禁用", username)
+        _record_login(request, username, False, "用户已禁用", counted=False)
         return ResponseModel(code=403, msg="该用户已被禁用")
     
     # 生成token
@@ -109,12 +174,12 @@ async def login_account(
     access_token = create_access_token(db_obj.user_id, expires_delta=access_token_expires)
     
     # 记录在线用户
-    ip_addr = request.client.host
+    ip_addr = _client_ip(request)
     online_service.save_online_user(access_token, db_obj, ip_addr)
+    _record_login(request, username, True, "登录成功")
     
     # 返回token
-    logger.info(f"账号登录成功: 用户={username}, IP={ip_addr}, Token={access_token[:10]}...")
-    print(f"[DEBUG] 账号登录成功: 用户={username}, IP={ip_addr}, Token={access_token[:10]}...")
+    logger.info("账号登录成功: 用户=%s, IP=%s", username, ip_addr)
     
     return ResponseModel(data=Token(
         access_token=access_token,
@@ -1,4 +1,5 @@
 from typing import Any
+import logging
 
 from fastapi import APIRouter, Depends, Request
 
@@ -9,6 +10,8 @@ from app.models.system.user import SysUser
 from app.schemas.utils.common import ResponseModel
 from app.service.monitor.online import online_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -31,9 +34,9 @@ def logout(
     
     if token:
         # 从Redis中移除在线用户记录
-        print(f"[DEBUG] 用户退出登录: 用户ID={current_user.user_id}, 用户名={current_user.username}, Token={token[:10]}...")
+        logger.info("用户退出登录: 用户ID=%s, 用户名=%s", current_user.user_id, current_user.username)
         online_service.remove_online_user(token)
     else:
-        print(f"[WARN] 用户退出登录但未找到Token: 用户ID={current_user.user_id}, 用户名={current_user.username}")
+        logger.warning("用户退出登录但未找到Token: 用户ID=%s, 用户名=%s", current_user.user_id, current_user.username)
     
     return ResponseModel(msg="退出成功") 
\ No newline at end of file
@@ -0,0 +1,40 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Path
+
+from app.api.deps import check_permissions
+from app.core.cache import cache_stats, invalidate
+from app.core.cache_bus import invalidation_bus
+from app.core.redis import redis_status
+from app.db.snapshot import reference_snapshot
+from app.schemas.utils.common import ResponseModel
+
+router = APIRouter()
+
+
+@router.get("", response_model=ResponseModel, summary="获取缓存统计", description="获取各缓存命名空间的命中率、加载耗时、失效广播的传播延迟、参考数据快照以及Redis连接状态")
+def get_cache_stats(
+    _: bool = Depends(check_permissions(["monitor:server:list"]))
+) -> Any:
+    """
+    获取当前worker进程内的缓存统计
+    """
+    return ResponseModel(data={
+        "namespaces": cache_stats(),
+        "bus": invalidation_bus.status(),
+        "snapshot": reference_snapshot.status(),
+        "redis": redis_status(),
+    })
+
+
+@router.delete("/{namespace}", response_model=ResponseModel, summary="清空缓存命名空间", description="递增命名空间版本，使所有进程中该命名空间的缓存失效")
+def clear_cache_namespace(
+    namespace: str = Path(..., description="命名空间"),
+    _: bool = Depends(check_permissions(["monitor:server:list"]))
+) -> Any:
+    """
+    清空缓存命名空间
+    """
+    if not invalidate(namespace):
+        raise HTTPException(status_code=404, detail="缓存命名空间不存在")
+    return ResponseModel(msg="清空成功")
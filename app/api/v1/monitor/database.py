@@ -0,0 +1,66 @@
+from typing import Any
+
+from fastapi import APIRouter, Depends, Query
+
+from app.api.deps import check_permissions, check_permissions_async
+from app.core.config import settings
+from app.db.pool import pool_tracker
+from app.db.session import replica_router
+from app.service.monitor.process import process_metrics_service
+from app.db.sql_monitor import sql_monitor
+from app.schemas.utils.common import ResponseModel
+
+router = APIRouter()
+
+
+@router.get("/slow", response_model=ResponseModel, summary="获取SQL语句统计", description="按语句指纹获取执行次数、总耗时、最大耗时排名靠前的SQL")
+def get_slow_statements(
+    limit: int = Query(20, ge=1, le=200, description="返回条数"),
+    order_by: str = Query("total_ms", pattern="^(total_ms|max_ms|avg_ms|count)$", description="排序字段"),
+    _: bool = Depends(check_permissions(["monitor:db:list"]))
+) -> Any:
+    """
+    获取当前worker进程内SQL语句指纹的执行统计
+    """
+    return ResponseModel(data={
+        "slow_query_ms": settings.SQL_SLOW_QUERY_MS,
+        "statements": sql_monitor.top(limit=limit, order_by=order_by),
+    })
+
+
+@router.delete("/slow", response_model=ResponseModel, summary="清空SQL语句统计", description="清空当前worker进程内的SQL语句统计")
+def reset_slow_statements(
+    _: bool = Depends(check_permissions(["monitor:db:remove"]))
+) -> Any:
+    """
+    清空SQL语句统计
+    """
+    sql_monitor.reset()
+    return ResponseModel(msg="清空成功")
+
+
+@router.get("/replicas", response_model=ResponseModel, summary="获取从库状态", description="获取只读从库的复制延迟和可用状态")
+def get_replica_status(
+    _: bool = Depends(check_permissions(["monitor:db:list"]))
+) -> Any:
+    """
+    获取从库状态，不可用的从库不参与读请求路由
+    """
+    return ResponseModel(data=replica_router.status())
+
+
+@router.get("/pool", response_model=ResponseModel, summary="获取连接池状态", description="获取当前worker进程各连接池的容量、已借出连接及其所属路由和占用时长")
+async def get_pool_status(
+    _: bool = Depends(check_permissions_async(["monitor:db:list"]))
+) -> Any:
+    """
+    获取连接池状态
+    同步接口在线程池中执行，线程数大于连接池容量时请求会在获取连接处排队，可据此调整DB_POOL_SIZE
+    接口和认证依赖都不占用线程池，线程池占满时仍可响应
+    """
+    threadpool = process_metrics_service.get_threadpool_info()
+    return ResponseModel(data={
+        "pools": pool_tracker.status(settings.DB_POOL_LEAK_SECONDS),
+        "threadpool": threadpool,
+        "leak_seconds": settings.DB_POOL_LEAK_SECONDS,
+    })
@@ -1,5 +1,6 @@
 from typing import Any, Optional, Type
 import datetime
+import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -9,6 +10,9 @@ from app.models.system.user import SysUser
 from app.schemas.monitor.job import JobCreate, JobUpdate, JobOut
 from app.schemas.utils.common import ResponseModel
 from app.service.monitor.job import job_service
+from app.service.monitor.job_stat import job_stat_service
+
+logger = logging.getLogger(__name__)
 
 
 def sqlalchemy_to_pydantic(obj: Any, model_class: Type) -> Any:
@@ -21,50 +25,42 @@ def sqlalchemy_to_pydantic(obj: Any, model_class: Type) -> Any:
     Returns:
         转换后的Pydantic模型对象
     """
-    print(f"[DEBUG] sqlalchemy_to_pydantic - 输入对象类型: {type(obj)}")
+    logger.debug("sqlalchemy_to_pydantic - 输入对象类型: %s", type(obj))
     try:
         # 先检查obj是否为model_class的实例，如果是则直接返回
         if isinstance(obj, model_class):
-            print(f"[DEBUG] 对象已经是目标类型: {model_class.__name__}")
             return obj
             
         # 如果obj是一个字典的items()视图或者元组列表，先转为字典
         if hasattr(obj, 'items') and callable(getattr(obj, 'items')):
-            print(f"[DEBUG] 对象有items方法，尝试转为字典")
             obj_dict = dict(obj.items())
             return model_class.model_validate(obj_dict)
         
         # 如果对象有to_dict方法（我们自定义的）
         if hasattr(obj, 'to_dict') and callable(getattr(obj, 'to_dict')):
             obj_dict = obj.to_dict()
-            print(f"[DEBUG] 使用to_dict方法转换为字典: {obj_dict}")
             return model_class.model_validate(obj_dict)
         
         # 如果是SQLAlchemy模型对象
         if hasattr(obj, '__table__'):
-            print(f"[DEBUG] 检测到SQLAlchemy模型对象，处理中...")
             # 转换为字典
             obj_dict = {c.name: getattr(obj, c.name) for c in obj.__table__.columns}
-            print(f"[DEBUG] 转换为字典: {obj_dict}")
             return model_class.model_validate(obj_dict)
         
         # 如果是元组且有_fields属性（namedtuple）
         if isinstance(obj, tuple):
-            print(f"[DEBUG] 检测到元组对象: {obj}")
+            logger.debug("sqlalchemy_to_pydantic - 元组对象: %s", obj)
             # 如果只有两个元素，且第一个可能是键，第二个是值（键值对形式）
             if len(obj) == 2 and isinstance(obj[0], str):
-                print(f"[DEBUG] 可能是单个键值对元组: {obj}")
                 # 创建只包含这个键值对的字典
                 return {obj[0]: obj[1]}
                 
             if hasattr(obj, '_fields'):
-                print(f"[DEBUG] namedtuple处理: _fields={obj._fields}")
                 obj_dict = dict(zip(obj._fields, obj))
                 return model_class.model_validate(obj_dict)
             else:
                 # 对于普通元组，尝试识别属性值
                 # 根据数据库表的结构尝试按顺序赋值
-                print(f"[DEBUG] 处理普通元组，假设顺序与属性按SQLAlchemy模型顺序匹配")
                 from app.models.monitor.job import SysJob
                 # 获取SysJob表的所有列名
                 columns = [c.name for c in SysJob.__table__.columns]
@@ -72,11 +68,9 @@ def sqlalchemy_to_pydantic(obj: Any, model_class: Type) -> Any:
                 # 如果元组长度与列数匹配，则按顺序映射
                 if len(obj) == len(columns):
                     obj_dict = dict(zip(columns, obj))
-                    print(f"[DEBUG] 处理普通元组，按列顺序匹配: {obj_dict}")
                     return model_class.model_validate(obj_dict)
                 else:
-                    print(f"[ERROR] 元组长度({len(obj)})与模型列数({len(columns)})不匹配")
-                    print(f"[DEBUG] 将尝试使用索引访问元组字段...")
+                    logger.warning("元组长度(%d)与模型列数(%d)不匹配，按索引映射关键字段", len(obj), len(columns))
                     # 尝试通过索引访问
                     obj_dict = {}
                     # 根据实际返回的元组结构，手动映射关键字段
@@ -108,7 +102,6 @@ def sqlalchemy_to_pydantic(obj: Any, model_class: Type) -> Any:
                     if len(obj) > 12:
                         obj_dict["update_time"] = obj[12]
                     
-                    print(f"[DEBUG] 手动映射后的字典: {obj_dict}")
                     return model_class.model_validate(obj_dict)
         
         # 如果是字典
@@ -129,7 +122,7 @@ def sqlalchemy_to_pydantic(obj: Any, model_class: Type) -> Any:
                    if not k.startswith('_') and not callable(getattr(obj, k))}
         return model_class.model_validate(obj_dict)
     except Exception as e:
-        print(f"Error converting object to Pydantic model: {e}, obj: {obj}")
+        logger.error("转换为Pydantic模型失败: %s, obj: %r", e, obj)
         raise ValueError(f"Cannot convert object to Pydantic model: {e}")
 
 
@@ -151,9 +144,11 @@ def list_jobs(
     获取定时任务列表
     """
     # 记录请求参数
-    print(f"[DEBUG] list_jobs - 参数: job_name={job_name}, job_group={job_group}, status={status}, page={page}, page_size={page_size}")
+    logger.debug(
+        "list_jobs - 参数: job_name=%s, job_group=%s, status=%s, page=%s, page_size=%s",
+        job_name, job_group, status, page, page_size,
+    )
     skip = (page - 1) * page_size
-    print(f"[DEBUG] 调用 job_service.get_jobs 获取任务列表, skip={skip}, limit={page_size}")
     jobs, total = job_service.get_jobs(
         db,
         skip=skip, 
@@ -162,7 +157,7 @@ def list_jobs(
         job_group=job_group,
         status=status
     )
-    print(f"[DEBUG] job_service.get_jobs 返回，总计: {total}，数据类型: {type(jobs)}")
+    logger.debug("list_jobs - 总计: %s", total)
     
     # 直接构建为可序列化的字典
     rows = []
@@ -175,7 +170,6 @@ def list_jobs(
                 if isinstance(value, datetime.datetime):
                     job_dict[key] = value.isoformat()
             rows.append(job_dict)
-            print(f"[DEBUG] 转换SQLAlchemy对象到字典: {job_dict}")
     
     # 创建分页信息
     page_info = {
@@ -196,6 +190,34 @@ def list_jobs(
     return response_data
 
 
+@router.get("/stats", response_model=ResponseModel, summary="获取任务执行统计", description="从小时/日汇总表获取任务执行次数、成功率和耗时分布，默认最近24小时（按小时）或30天（按天），跨度最多7天（按小时）或366天（按天）")
+def get_job_stats(
+    *,
+    db: Session = Depends(get_db),
+    granularity: str = Query("hour", pattern="^(hour|day)$", description="统计粒度：hour小时 day天"),
+    job_name: Optional[str] = None,
+    job_group: Optional[str] = None,
+    begin_time: Optional[datetime.datetime] = None,
+    end_time: Optional[datetime.datetime] = None,
+    _: bool = Depends(check_permissions(["monitor:job:query"]))
+) -> Any:
+    """
+    获取任务执行统计
+    """
+    try:
+        stats = job_stat_service.get_stats(
+            db,
+            granularity=granularity,
+            job_name=job_name,
+            job_group=job_group,
+            begin_time=begin_time,
+            end_time=end_time
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ResponseModel(data=stats)
+
+
 @router.get("/{job_id}", response_model=ResponseModel[JobOut], summary="获取定时任务详情", description="根据任务ID获取定时任务详情")
 def get_job(
     *,
@@ -317,6 +339,8 @@ def list_job_logs(
     job_name: Optional[str] = None,
     job_group: Optional[str] = None,
     status: Optional[str] = None,
+    begin_time: Optional[datetime.datetime] = None,
+    end_time: Optional[datetime.datetime] = None,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     _: bool = Depends(check_permissions(["monitor:job:query"]))
@@ -324,7 +348,10 @@ def list_job_logs(
     """
     获取定时任务日志列表
     """
-    print(f"[DEBUG] list_job_logs - 参数: job_name={job_name}, job_group={job_group}, status={status}, page={page}, page_size={page_size}")
+    logger.debug(
+        "list_job_logs - 参数: job_name=%s, job_group=%s, status=%s, page=%s, page_size=%s",
+        job_name, job_group, status, page, page_size,
+    )
     skip = (page - 1) * page_size
     logs, total = job_service.get_job_logs(
         db,
@@ -332,7 +359,9 @@ def list_job_logs(
         limit=page_size,
         job_name=job_name,
         job_group=job_group,
-        status=status
+        status=status,
+        begin_time=begin_time,
+        end_time=end_time
     )
     
     # 直接构建为可序列化的字典
@@ -346,7 +375,6 @@ def list_job_logs(
                 if isinstance(value, datetime.datetime):
                     log_dict[key] = value.isoformat()
             rows.append(log_dict)
-            print(f"[DEBUG] 转换日志SQLAlchemy对象到字典: {log_dict}")
     
     # 创建分页信息
     page_info = {
@@ -376,5 +404,69 @@ def clean_job_logs(
     """
     清空所有定时任务日志
     """
-    count = job_service.clean_all_job_logs(db)
-    return ResponseModel(data={"count": count}, msg=f"已清除{count}条日志") 
\ No newline at end of file
+    result = job_service.clean_all_job_logs(db)
+    if result["skipped"]:
+        return ResponseModel(code=409, data={"count": 0, "skipped": True}, msg="其他清理正在进行，请稍后再试")
+    count = result["deleted"]
+    return ResponseModel(data={"count": count, "skipped": False}, msg=f"已清除{count}条日志")
+
+@router.get("/log/archive/list", summary="获取归档任务日志列表", description="按时间范围分页查询已归档的定时任务日志")
+def list_archived_job_logs(
+    *,
+    job_name: Optional[str] = None,
+    job_group: Optional[str] = None,
+    status: Optional[str] = None,
+    begin_time: Optional[datetime.datetime] = None,
+    end_time: Optional[datetime.datetime] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    _: bool = Depends(check_permissions(["monitor:job:query"]))
+) -> Any:
+    """
+    获取归档任务日志列表
+    """
+    logs, total = job_service.get_archived_job_logs(
+        begin_time=begin_time,
+        end_time=end_time,
+        job_name=job_name,
+        job_group=job_group,
+        status=status,
+        page=page,
+        page_size=page_size
+    )
+
+    rows = []
+    for log in logs:
+        log_dict = dict(log)
+        if isinstance(log_dict.get("create_time"), datetime.datetime):
+            log_dict["create_time"] = log_dict["create_time"].isoformat()
+        rows.append(log_dict)
+
+    return {
+        "code": 200,
+        "msg": "操作成功",
+        "rows": rows,
+        "pageInfo": {
+            "page": page,
+            "pageSize": page_size,
+            "total": total
+        }
+    }
+
+
+@router.post("/log/purge", response_model=ResponseModel, summary="按保留策略清理任务日志", description="按最大保留天数和行数分批清理定时任务日志")
+def purge_job_logs(
+    *,
+    db: Session = Depends(get_db),
+    retention_days: Optional[int] = Query(None, ge=0, description="最大保留天数，默认取系统配置"),
+    max_rows: Optional[int] = Query(None, ge=0, description="最大保留行数，默认取系统配置"),
+    archive: Optional[bool] = Query(None, description="清理前是否归档，默认取系统配置"),
+    _: bool = Depends(check_permissions(["monitor:job:remove"]))
+) -> Any:
+    """
+    按保留策略清理任务日志
+    """
+    result = job_service.purge_job_logs(db, retention_days=retention_days, max_rows=max_rows, archive=archive)
+    if result["skipped"]:
+        return ResponseModel(code=409, data=result, msg="其他清理正在进行，请稍后再试")
+    return ResponseModel(data=result, msg=f"已清除{result['deleted']}条日志")
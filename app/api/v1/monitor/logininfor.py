@@ -0,0 +1,156 @@
+from typing import Any, Optional
+from datetime import datetime
+import logging
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, check_permissions
+from app.core.config import settings
+from app.core.redis import redis_available
+from app.crud.monitor.login_log import login_log as login_log_crud
+from app.schemas.monitor.login_log import LoginLogOut, LoginStats
+from app.schemas.utils.common import ResponseModel, PageResponseModel, PageInfo
+from app.service.monitor.login_guard import MAX_STATS_WINDOW, login_guard
+from app.service.monitor.login_log_writer import login_log_writer
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/list", response_model=PageResponseModel[LoginLogOut], summary="获取登录日志列表", description="按时间范围等条件分页查询登录日志")
+def list_login_logs(
+    db: Session = Depends(get_db),
+    *,
+    user_name: Optional[str] = None,
+    ipaddr: Optional[str] = None,
+    status: Optional[str] = None,
+    begin_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    _: bool = Depends(check_permissions(["monitor:logininfor:list"]))
+) -> Any:
+    """
+    获取登录日志列表
+    """
+    result = login_log_crud.search(
+        db,
+        user_name=user_name,
+        ipaddr=ipaddr,
+        status=status,
+        begin_time=begin_time,
+        end_time=end_time,
+        page=page,
+        page_size=page_size
+    )
+    return PageResponseModel[LoginLogOut](
+        rows=[LoginLogOut.model_validate(item) for item in result["items"]],
+        pageInfo=PageInfo(
+            page=page,
+            pageSize=page_size,
+            total=result["total"]
+        )
+    )
+
+
+@router.get("/stats", response_model=ResponseModel[LoginStats], summary="获取登录失败统计", description="按时间窗口统计登录次数、失败次数和失败率，以及当前小时失败最多的IP和账号")
+def get_login_stats(
+    db: Session = Depends(get_db),
+    *,
+    windows: Optional[str] = Query(None, description="时间窗口（秒），多个用逗号分隔，默认LOGIN_STATS_WINDOWS"),
+    top: int = Query(10, ge=1, le=100),
+    _: bool = Depends(check_permissions(["monitor:logininfor:list"]))
+) -> Any:
+    """
+    获取登录失败统计
+    优先读取Redis中的分钟和小时计数，Redis不可用时按登录日志表统计
+    """
+    try:
+        window_list = [int(w) for w in windows.split(",") if w.strip()] if windows else list(settings.LOGIN_STATS_WINDOWS)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="时间窗口格式错误")
+    if not window_list or any(w < 60 or w > MAX_STATS_WINDOW for w in window_list):
+        raise HTTPException(status_code=400, detail=f"时间窗口需在60到{MAX_STATS_WINDOW}秒之间")
+
+    if redis_available():
+        try:
+            return ResponseModel[LoginStats](data=LoginStats(**login_guard.stats(window_list, top=top)))
+        except Exception as e:
+            logger.warning("读取Redis登录统计失败，改为按登录日志表统计: %s", e)
+    return ResponseModel[LoginStats](data=LoginStats(**login_guard.stats_from_db(db, window_list, top=top)))
+
+
+@router.get("/writer", response_model=ResponseModel, summary="获取登录日志写入状态", description="查看批量写入缓冲区、溢出和丢弃统计")
+def get_writer_stats(
+    _: bool = Depends(check_permissions(["monitor:logininfor:list"]))
+) -> Any:
+    """
+    获取登录日志写入状态
+    """
+    return ResponseModel(data=login_log_writer.stats())
+
+
+@router.put("/unlock", response_model=ResponseModel, summary="解除登录锁定", description="解除账号或IP因登录失败次数过多产生的锁定")
+def unlock_login(
+    *,
+    user_name: Optional[str] = None,
+    ipaddr: Optional[str] = None,
+    _: bool = Depends(check_permissions(["monitor:logininfor:unlock"]))
+) -> Any:
+    """
+    解除登录锁定
+    """
+    if not user_name and not ipaddr:
+        raise HTTPException(status_code=400, detail="请指定账号或IP")
+    count = login_guard.unlock(username=user_name, ip=ipaddr)
+    return ResponseModel(data={"count": count}, msg="解锁成功")
+
+
+@router.get("/{info_id}", response_model=ResponseModel[LoginLogOut], summary="获取登录日志详情", description="根据日志ID获取登录日志详情")
+def get_login_log(
+    *,
+    db: Session = Depends(get_db),
+    info_id: int,
+    _: bool = Depends(check_permissions(["monitor:logininfor:query"]))
+) -> Any:
+    """
+    获取登录日志详情
+    """
+    log_obj = login_log_crud.get(db, id=info_id)
+    if not log_obj:
+        raise HTTPException(status_code=404, detail="登录日志不存在")
+    return ResponseModel[LoginLogOut](data=LoginLogOut.model_validate(log_obj))
+
+
+@router.delete("/clean", response_model=ResponseModel, summary="清理登录日志", description="清空登录日志，指定before时只删除该时间之前的日志")
+def clean_login_logs(
+    *,
+    db: Session = Depends(get_db),
+    before: Optional[datetime] = None,
+    _: bool = Depends(check_permissions(["monitor:logininfor:remove"]))
+) -> Any:
+    """
+    清理登录日志
+    """
+    count = login_log_crud.clean(db, before=before)
+    return ResponseModel(data={"count": count}, msg=f"已清除{count}条日志")
+
+
+@router.delete("/{info_ids}", response_model=ResponseModel, summary="删除登录日志", description="删除指定登录日志，多个ID用逗号分隔")
+def delete_login_logs(
+    *,
+    db: Session = Depends(get_db),
+    info_ids: str,
+    _: bool = Depends(check_permissions(["monitor:logininfor:remove"]))
+) -> Any:
+    """
+    删除登录日志
+    """
+    try:
+        ids = [int(i) for i in info_ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日志ID格式错误")
+    count = login_log_crud.delete_by_ids(db, ids=ids) if ids else 0
+    return ResponseModel(data={"count": count}, msg=f"已删除{count}条日志")
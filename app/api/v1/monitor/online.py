@@ -1,5 +1,6 @@
 from typing import Any, Optional
 from datetime import datetime
+import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -10,6 +11,8 @@ from app.schemas.monitor.online import ForceLogoutParams
 from app.schemas.utils.common import ResponseModel
 from app.service.monitor.online import online_service
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -26,7 +29,9 @@ def list_online_users(
     """
     获取在线用户列表
     """
-    print(f"[DEBUG] list_online_users API调用 - 参数: ipaddr={ipaddr}, username={username}, page={page}, page_size={page_size}")
+    logger.debug(
+        "list_online_users - 参数: ipaddr=%s, username=%s, page=%s, page_size=%s", ipaddr, username, page, page_size
+    )
     skip = (page - 1) * page_size
     online_users, total = online_service.get_online_users(
         db,
@@ -36,11 +41,9 @@ def list_online_users(
         username=username
     )
     
-    print(f"[DEBUG] 返回在线用户数量: {len(online_users)}, 总数: {total}")
-    
     # 如果返回的用户列表为空但应该有数据，记录警告
-    if not online_users and total > 0:
-        print("[WARN] 在线用户列表返回空，但总数不为0")
+    if not online_users and total > skip:
+        logger.warning("在线用户列表返回空，但总数为%d", total)
     
     # 将返回的数据转换为纯字典格式，移除datetime对象
     online_users_dict = []
@@ -53,8 +56,6 @@ def list_online_users(
             user_dict["last_access_time"] = user_dict["last_access_time"].strftime("%Y-%m-%d %H:%M:%S")
         online_users_dict.append(user_dict)
     
-    print(f"[DEBUG] 返回前的用户数据: {online_users_dict}")
-    
     # 直接返回标准格式，不使用响应模型验证
     return {
         "code": 200,
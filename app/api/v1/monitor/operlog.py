@@ -0,0 +1,109 @@
+from typing import Any, Optional
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_db, check_permissions
+from app.crud.monitor.oper_log import oper_log as oper_log_crud
+from app.schemas.monitor.oper_log import OperLogOut
+from app.schemas.utils.common import ResponseModel, PageResponseModel, PageInfo
+from app.service.monitor.oper_log_writer import oper_log_writer
+
+router = APIRouter()
+
+
+@router.get("/list", response_model=PageResponseModel[OperLogOut], summary="获取操作日志列表", description="按时间范围等条件分页查询操作日志")
+def list_oper_logs(
+    db: Session = Depends(get_db),
+    *,
+    title: Optional[str] = None,
+    oper_name: Optional[str] = None,
+    business_type: Optional[int] = None,
+    status: Optional[int] = None,
+    begin_time: Optional[datetime] = None,
+    end_time: Optional[datetime] = None,
+    page: int = Query(1, ge=1),
+    page_size: int = Query(10, ge=1, le=100),
+    _: bool = Depends(check_permissions(["monitor:operlog:list"]))
+) -> Any:
+    """
+    获取操作日志列表
+    """
+    result = oper_log_crud.search(
+        db,
+        title=title,
+        oper_name=oper_name,
+        business_type=business_type,
+        status=status,
+        begin_time=begin_time,
+        end_time=end_time,
+        page=page,
+        page_size=page_size
+    )
+    return PageResponseModel[OperLogOut](
+        rows=[OperLogOut.model_validate(item) for item in result["items"]],
+        pageInfo=PageInfo(
+            page=page,
+            pageSize=page_size,
+            total=result["total"]
+        )
+    )
+
+
+@router.get("/writer", response_model=ResponseModel, summary="获取操作日志写入状态", description="查看批量写入缓冲区、溢出和丢弃统计")
+def get_writer_stats(
+    _: bool = Depends(check_permissions(["monitor:operlog:list"]))
+) -> Any:
+    """
+    获取操作日志写入状态
+    """
+    return ResponseModel(data=oper_log_writer.stats())
+
+
+@router.get("/{oper_id}", response_model=ResponseModel[OperLogOut], summary="获取操作日志详情", description="根据日志ID获取操作日志详情")
+def get_oper_log(
+    *,
+    db: Session = Depends(get_db),
+    oper_id: int,
+    _: bool = Depends(check_permissions(["monitor:operlog:query"]))
+) -> Any:
+    """
+    获取操作日志详情
+    """
+    log_obj = oper_log_crud.get(db, id=oper_id)
+    if not log_obj:
+        raise HTTPException(status_code=404, detail="操作日志不存在")
+    return ResponseModel[OperLogOut](data=OperLogOut.model_validate(log_obj))
+
+
+@router.delete("/clean", response_model=ResponseModel, summary="清理操作日志", description="清空操作日志，指定before时只删除该时间之前的日志")
+def clean_oper_logs(
+    *,
+    db: Session = Depends(get_db),
+    before: Optional[datetime] = None,
+    _: bool = Depends(check_permissions(["monitor:operlog:remove"]))
+) -> Any:
+    """
+    清理操作日志
+    """
+    count = oper_log_crud.clean(db, before=before)
+    return ResponseModel(data={"count": count}, msg=f"已清除{count}条日志")
+
+
+@router.delete("/{oper_ids}", response_model=ResponseModel, summary="删除操作日志", description="删除指定操作日志，多个ID用逗号分隔")
+def delete_oper_logs(
+    *,
+    db: Session = Depends(get_db),
+    oper_ids: str,
+    _: bool = Depends(check_permissions(["monitor:operlog:remove"]))
+) -> Any:
+    """
+    删除操作日志
+    """
+    try:
+        ids = [int(i) for i in oper_ids.split(",") if i.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="日志ID格式错误")
+    count = oper_log_crud.delete_by_ids(db, ids=ids) if ids else 0
+    return ResponseModel(data={"count": count}, msg=f"已删除{count}条日志")
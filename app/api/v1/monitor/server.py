@@ -1,11 +1,17 @@
-from typing import Any
+from typing import Any, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
-from app.api.deps import check_permissions
+from app.api.deps import check_permissions, check_permissions_async
+from app.core.config import settings
 from app.schemas.monitor.server import ServerInfo
 from app.schemas.utils.common import ResponseModel
 from app.service.monitor.server import server_service
+from app.service.monitor.metrics_history import metrics_history, SERIES
+from app.service.monitor.server_stream import server_stream_hub
+from app.service.monitor.server_cluster import server_cluster_service
+from app.service.monitor.process import process_metrics_service
 
 router = APIRouter()
 
@@ -18,4 +24,77 @@ def get_server_info(
     获取服务器基本信息，包括CPU、内存、磁盘等
     """
     server_info = server_service.get_server_info()
-    return ResponseModel[ServerInfo](data=server_info)
\ No newline at end of file
+    return ResponseModel[ServerInfo](data=server_info)
+
+
+@router.get("/history", response_model=ResponseModel, summary="获取服务器指标历史", description="按时间窗口和分辨率获取CPU、负载、内存、磁盘IO和网络速率的历史数据")
+def get_server_history(
+    series: str = Query(",".join(SERIES), description="序列名称，多个用逗号分隔"),
+    resolution: str = Query("1s", pattern="^(1s|1m|15m)$", description="分辨率：1s、1m、15m"),
+    start: Optional[float] = Query(None, description="开始时间戳（秒）"),
+    end: Optional[float] = Query(None, description="结束时间戳（秒）"),
+    _: bool = Depends(check_permissions(["monitor:server:list"]))
+) -> Any:
+    """
+    获取服务器指标历史，每个点为[时间戳, 最小值, 平均值, 最大值]
+    """
+    names = [name.strip() for name in series.split(",") if name.strip()]
+    unknown = [name for name in names if name not in SERIES]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"不支持的序列: {','.join(unknown)}")
+
+    data = metrics_history.query(names, resolution=resolution, start=start, end=end)
+    return ResponseModel(data={"resolution": resolution, "series": data})
+
+
+@router.get("/cluster", response_model=ResponseModel, summary="获取集群服务器信息", description="获取所有节点上报的服务器信息及在线节点的汇总数据")
+def get_cluster_info(
+    _: bool = Depends(check_permissions(["monitor:server:list"]))
+) -> Any:
+    """
+    获取集群服务器信息，超过SERVER_NODE_STALE_AFTER秒未上报的节点标记为stale，不计入汇总
+    """
+    return ResponseModel(data=server_cluster_service.get_cluster_info())
+
+
+@router.get("/process", response_model=ResponseModel, summary="获取应用进程指标", description="获取当前worker进程的事件循环延迟、线程池占用、GC、内存、文件描述符和线程数")
+async def get_process_info(
+    _: bool = Depends(check_permissions_async(["monitor:server:list"]))
+) -> Any:
+    """
+    获取当前worker进程的运行时指标
+    接口和认证依赖都在事件循环中执行，线程池饱和时本接口不需要排队
+    """
+    return ResponseModel(data=process_metrics_service.get_process_info())
+
+
+@router.get("/stream", summary="实时推送服务器信息", description="通过SSE推送后台采样的服务器信息，首条为完整快照，之后只推送变化的字段")
+async def stream_server_info(
+    request: Request,
+    _: bool = Depends(check_permissions_async(["monitor:server:list"]))
+) -> Any:
+    """
+    实时推送服务器信息（text/event-stream）
+    认证依赖在事件循环中执行，线程池饱和时仍可建立推送连接
+    - event: snapshot 完整的服务器信息
+    - event: delta 与上一条相比发生变化的字段
+    客户端消费过慢时只保留最新数据，并在下一条消息中重新发送完整快照
+    """
+    subscriber = server_stream_hub.subscribe()
+
+    async def event_generator():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = await subscriber.next_event(settings.SERVER_STREAM_HEARTBEAT, request.is_disconnected)
+                if event is None:
+                    break
+                yield event
+        finally:
+            server_stream_hub.unsubscribe(subscriber)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
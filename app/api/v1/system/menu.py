@@ -1,4 +1,5 @@
 from typing import Any, List, Optional
+import logging
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
@@ -9,6 +10,8 @@ from app.schemas.system.menu import MenuCreate, MenuUpdate, MenuOut, MenuTree
 from app.schemas.utils.common import ResponseModel
 from app.crud.system.menu import menu as menu_crud
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -40,7 +43,7 @@ def get_menu_tree(
     """
     获取菜单树结构
     """
-    menus = menu_crud.get_tree(db)
+    menus = menu_crud.get_tree_data(db)
     return ResponseModel[List[MenuTree]](data=menus)
 
 
@@ -160,8 +163,6 @@ def get_role_menus(
     """
     获取角色关联的菜单列表
     """
-    print(f"[API] 获取角色菜单: role_id={role_id}")
-    
     try:
         # 获取角色的菜单ID列表
         menu_ids = menu_crud.get_role_menu_ids(db, role_id=role_id)
@@ -179,11 +180,9 @@ def get_role_menus(
             "data": menu_tree
         }
         
-        print(f"[API] 角色菜单树响应完成，树节点数: {len(menu_tree)}")
-        
         return response
     except Exception as e:
-        print(f"[API ERROR] 获取角色菜单异常: {str(e)}")
+        logger.error("获取角色菜单异常: role_id=%s, %s", role_id, e, exc_info=True)
         
         response = {
             "code": 500,
@@ -1,4 +1,5 @@
 from typing import Any, List, Optional
+import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -9,6 +10,8 @@ from app.schemas.system.post import PostCreate, PostUpdate, PostOut
 from app.schemas.utils.common import ResponseModel, PageResponseModel, PageInfo
 from app.crud.system.post import post as post_crud
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -49,9 +52,7 @@ def list_posts(
             )
         )
     except Exception as e:
-        import traceback
-        print(f"获取岗位列表出错: {str(e)}")
-        print(traceback.format_exc())
+        logger.error("获取岗位列表出错: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=f"服务器错误: {str(e)}")
 
 
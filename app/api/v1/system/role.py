@@ -1,4 +1,5 @@
 from typing import Any, List, Optional
+import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
@@ -9,6 +10,8 @@ from app.schemas.system.role import RoleCreate, RoleUpdate, RoleOut
 from app.schemas.utils.common import ResponseModel
 from app.crud.system.role import role as role_crud
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -26,7 +29,10 @@ def list_roles(
     """
     获取角色列表
     """
-    print(f"[API] 角色列表请求参数: page={page}, page_size={page_size}, role_name={role_name}, role_key={role_key}, status={status}")
+    logger.debug(
+        "角色列表请求参数: page=%s, page_size=%s, role_name=%s, role_key=%s, status=%s",
+        page, page_size, role_name, role_key, status,
+    )
     
     skip = (page - 1) * page_size
     roles, total = role_crud.get_multi_with_filter(
@@ -38,7 +44,7 @@ def list_roles(
         status=status
     )
     
-    print(f"[API] 查询到 {len(roles)} 条角色数据，总数: {total}")
+    logger.debug("查询到 %d 条角色数据，总数: %s", len(roles), total)
     
     # 确保返回的数据包含必要的字段，特别是前端期望的字段
     role_list = []
@@ -65,8 +71,6 @@ def list_roles(
         "page_size": page_size
     }
     
-    print(f"[API] 角色列表响应: {response}")
-    
     return response
 
 
@@ -80,7 +84,6 @@ def get_role(
     """
     获取角色详情
     """
-    print(f"[API] 获取角色详情: role_id={role_id}")
     role_obj = role_crud.get_by_id(db, role_id=role_id)
     if not role_obj:
         raise HTTPException(status_code=404, detail="角色不存在")
@@ -109,11 +112,9 @@ def get_role(
             "data": role_data
         }
         
-        print(f"[API] 角色详情响应: {response}")
-        
         return response
     except Exception as e:
-        print(f"[API ERROR] 获取角色详情异常: {str(e)}")
+        logger.error("获取角色详情异常: role_id=%s, %s", role_id, e, exc_info=True)
         # 返回错误信息但保留基本角色数据
         role_data = {
             "role_id": role_obj.role_id,
@@ -8,6 +8,7 @@ from app.crud.system.user import user
 from app.models.system.user import SysUser
 from app.schemas.system.user import User, UserCreate, UserUpdate
 from app.schemas.utils.common import ResponseModel, PageResponseModel, PageInfo
+from app.db.search import search_contains
 
 router = APIRouter()
 
@@ -30,9 +31,9 @@ def read_users(
     # 构建查询条件
     query = db.query(SysUser)
     if username:
-        query = query.filter(SysUser.username.like(f"%{username}%"))
+        query = query.filter(search_contains(db, SysUser.username, username))
     if nickname:
-        query = query.filter(SysUser.nickname.like(f"%{nickname}%"))
+        query = query.filter(search_contains(db, SysUser.nickname, nickname))
     if status:
         query = query.filter(SysUser.status == status)
     if dept_id:
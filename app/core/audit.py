@@ -0,0 +1,162 @@
+"""
+操作日志审计中间件
+
+写操作（OPER_LOG_METHODS）结束后记录模块、接口、要求的权限、操作人员、参数摘要、状态和耗时，
+放入有界缓冲区后立即返回，由后台线程多行插入sys_oper_log，请求路径上没有额外的数据库提交。
+缓冲区满时写入溢出文件，未配置溢出文件则丢弃并计数（见BatchWriter）。
+
+请求体不落库：边读取边计算SHA-256，只记录摘要和长度；查询参数和路径参数中的敏感字段打码。
+操作人员和权限由认证依赖写入请求上下文，所以本中间件需要在ServerTimingMiddleware内层。
+"""
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.request_context import current_timings, matched_route
+from app.service.monitor.oper_log_writer import oper_log_writer
+
+logger = logging.getLogger(__name__)
+
+# 请求方式 -> 业务类型（0其它 1新增 2修改 3删除）
+BUSINESS_TYPES = {"POST": 1, "PUT": 2, "PATCH": 2, "DELETE": 3}
+
+# 参数名包含这些词时打码
+SENSITIVE_KEYS = ("password", "pwd", "token", "secret")
+
+
+def _mask(params: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        key: "******" if any(word in key.lower() for word in SENSITIVE_KEYS) else value
+        for key, value in params.items()
+    }
+
+
+def _truncate(text: str, limit: int) -> str:
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+class AuditMiddleware:
+    """操作日志审计中间件（纯ASGI实现，不缓冲请求体和响应体）"""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.prefixes = tuple(f"{settings.API_V1_STR}{path}" for path in settings.OPER_LOG_EXCLUDE_PATHS)
+        self.methods = {method.upper() for method in settings.OPER_LOG_METHODS}
+
+    def _audited(self, scope: Scope) -> bool:
+        if scope["type"] != "http" or scope.get("method") not in self.methods:
+            return False
+        path = scope.get("path", "")
+        return path.startswith(settings.API_V1_STR) and not path.startswith(self.prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not settings.OPER_LOG_ENABLED or not self._audited(scope):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        oper_time = datetime.now()
+        body_hash = hashlib.sha256()
+        body_size = 0
+        status_code = 500
+        # 错误响应只保留前OPER_LOG_PARAM_MAX_LENGTH字节作为错误消息
+        error_body = bytearray()
+        error_limit = settings.OPER_LOG_PARAM_MAX_LENGTH
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_size
+            message = await receive()
+            if message["type"] == "http.request":
+                body = message.get("body", b"")
+                body_hash.update(body)
+                body_size += len(body)
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and status_code >= 400 and len(error_body) < error_limit:
+                error_body.extend(message.get("body", b"")[:error_limit - len(error_body)])
+            await send(message)
+
+        error: Optional[BaseException] = None
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            try:
+                record = self._build_record(
+                    scope,
+                    oper_time=oper_time,
+                    cost_ms=(time.perf_counter() - started) * 1000,
+                    status_code=status_code,
+                    body_digest=body_hash.hexdigest() if body_size else "",
+                    body_size=body_size,
+                    error_message=repr(error) if error is not None else error_body.decode("utf-8", "replace"),
+                )
+                oper_log_writer.submit(record)
+            except Exception as e:
+                # 审计失败不影响请求
+                logger.warning("记录操作日志失败: %s", e)
+
+    @staticmethod
+    def _build_record(
+        scope: Scope,
+        *,
+        oper_time: datetime,
+        cost_ms: float,
+        status_code: int,
+        body_digest: str,
+        body_size: int,
+        error_message: str,
+    ) -> Dict[str, Any]:
+        route = matched_route(scope)
+        endpoint = getattr(route, "endpoint", None)
+        tags: List[Any] = getattr(route, "tags", None) or []
+        timings = current_timings()
+        extra = timings.extra if timings is not None else {}
+        user = extra.get("user")
+        perms = extra.get("perms") or []
+        limit = settings.OPER_LOG_PARAM_MAX_LENGTH
+
+        params: Dict[str, Any] = {}
+        query_string = scope.get("query_string", b"").decode("latin-1")
+        if query_string:
+            params["query"] = _mask(dict(parse_qsl(query_string, keep_blank_values=True)))
+        if scope.get("path_params"):
+            params["path"] = _mask(dict(scope["path_params"]))
+        if body_size:
+            params["body"] = {"sha256": body_digest, "bytes": body_size}
+
+        client = scope.get("client")
+        failed = status_code >= 400
+        return {
+            "title": str(tags[0])[:50] if tags else "",
+            "business_type": BUSINESS_TYPES.get(scope["method"], 0),
+            "method": f"{endpoint.__module__}.{endpoint.__name__}"[:100] if endpoint is not None else "",
+            "request_method": scope["method"],
+            "operator_type": 1 if user else 0,
+            "oper_name": user[1] if user else "",
+            "dept_name": "",
+            "oper_url": scope.get("path", "")[:255],
+            "oper_ip": client[0] if client else "",
+            "oper_location": "",
+            "oper_param": _truncate(json.dumps(params, ensure_ascii=False, default=str), limit) if params else "",
+            "json_result": "",
+            "status": 1 if failed else 0,
+            "error_msg": _truncate(error_message, limit) if failed else "",
+            "oper_time": oper_time,
+            "perms": ",".join(perms)[:100],
+            "cost_time": int(cost_ms),
+            "request_id": timings.request_id if timings is not None else "",
+        }
@@ -0,0 +1,440 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import exc as sa_exc
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any) -> Any:
+    """JSON序列化时保留datetime类型"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return str(value)
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    """JSON反序列化时还原datetime类型"""
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+
+def _is_transient(error: Exception) -> bool:
+    """数据库不可用、连接断开、死锁等与记录内容无关的错误，恢复后重试即可成功"""
+    if isinstance(error, sa_exc.DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(
+        error, (sa_exc.OperationalError, sa_exc.InterfaceError, sa_exc.DisconnectionError, sa_exc.TimeoutError)
+    )
+
+
+class BatchWriter:
+    """
+    写后批量落库（write-behind）
+
+    业务代码通过submit()把记录放入内存缓冲区后立即返回，后台线程在缓冲区达到
+    max_batch条或距上次刷新超过flush_interval秒时，调用flush_func一次性写入整批记录。
+
+    配置了spill_path时，每条记录在进入缓冲区前先追加写入溢出文件，进程崩溃后
+    重启会重放未落库的记录；缓冲区超过max_buffer时，新记录只保留在溢出文件中，
+    未配置溢出文件则直接丢弃并计数。
+
+    每次刷新按max_batch条分块写入，每块一个事务，溢出文件逐块读取，长时间故障后重放也不会
+    一次读入全部记录。写入失败时：
+    - 数据库不可用、连接断开等临时错误：该块及之后的记录保留，下次刷新重试，不限次数
+    - 其他错误（超长、非法值等）：连续失败max_retries次后把该块二分定位无法写入的记录，
+      这些记录写入死信文件{spill_path}.dead（未配置溢出文件时记录到错误日志）并跳过，
+      其余记录正常写入，单条坏记录不会阻塞之后的所有日志
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush_func: Callable[[List[Dict[str, Any]]], None],
+        *,
+        max_batch: int = 100,
+        flush_interval: float = 2.0,
+        max_buffer: int = 10000,
+        spill_path: Optional[str] = None,
+        max_retries: int = 3
+    ):
+        self.name = name
+        self.flush_func = flush_func
+        self.max_batch = max(max_batch, 1)
+        self.flush_interval = flush_interval
+        self.max_buffer = max(max_buffer, self.max_batch)
+        self.spill_path = spill_path or None
+        self.max_retries = max(max_retries, 1)
+        # 当前块因非临时错误连续失败的次数
+        self._attempts = 0
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._buffer: List[Dict[str, Any]] = []
+        # 已轮转、尚未确认落库的溢出文件
+        self._segments: List[str] = []
+        # 为True时表示部分记录只存在于溢出文件中，刷新时需要从文件读取
+        self._overflowed = False
+        self._spill_file = None
+        self._segment_seq = 0
+
+        self._stats = {
+            "submitted": 0,
+            "flushed": 0,
+            "dropped": 0,
+            "flush_errors": 0,
+            "dead_lettered": 0,
+            "last_flush_time": None,
+            "last_flush_ms": 0.0,
+        }
+
+    def start(self) -> None:
+        """启动后台刷新线程，并接管上次未落库的溢出文件"""
+        if self._thread and self._thread.is_alive():
+            return
+        if self.spill_path:
+            self._recover_segments()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"batch-writer-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程并刷新剩余记录"""
+        self._stop_event.set()
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.flush()
+        with self._lock:
+            self._close_spill_file()
+
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """
+        提交一条记录
+        :return: 记录被接收返回True，因过载被丢弃返回False
+        """
+        with self._lock:
+            self._stats["submitted"] += 1
+            if self.spill_path:
+                self._append_spill(record)
+            if len(self._buffer) >= self.max_buffer:
+                if self.spill_path:
+                    self._overflowed = True
+                else:
+                    self._stats["dropped"] += 1
+                    return False
+            else:
+                self._buffer.append(record)
+            pending = len(self._buffer)
+
+        if pending >= self.max_batch:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """
+        立即刷新缓冲区
+        :return: 写入的记录数
+        """
+        with self._flush_lock:
+            with self._lock:
+                records = self._buffer
+                self._buffer = []
+                segments = self._segments
+                self._segments = []
+                overflowed = self._overflowed
+                self._overflowed = False
+                rotated = self._rotate_spill_file()
+                if rotated:
+                    segments.append(rotated)
+
+            started = time.perf_counter()
+            remaining: List[Dict[str, Any]] = []
+            if overflowed:
+                # 内存缓冲区不完整，以溢出文件为准
+                written, segments = self._flush_segments(segments)
+            else:
+                written, remaining = self._flush_records(records)
+                if remaining:
+                    # 溢出文件中包含已写入的记录，换成只含剩余记录的分段，崩溃后重放时不会重复写入
+                    segment = self._write_segment(remaining)
+                    if segment or not self.spill_path:
+                        self._remove_segments(segments)
+                        segments = [segment] if segment else []
+                else:
+                    self._remove_segments(segments)
+                    segments = []
+
+            with self._lock:
+                if segments or remaining:
+                    self._segments = segments + self._segments
+                    if overflowed:
+                        self._overflowed = True
+                    else:
+                        # 失败的记录放回缓冲区头部，超出上限的部分仍保留在溢出文件中
+                        combined = remaining + self._buffer
+                        self._buffer = combined[:self.max_buffer]
+                        if len(combined) > self.max_buffer:
+                            if self.spill_path:
+                                self._overflowed = True
+                            else:
+                                self._stats["dropped"] += len(combined) - self.max_buffer
+                if written:
+                    self._stats["flushed"] += written
+                    self._stats["last_flush_time"] = datetime.now()
+                    self._stats["last_flush_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            return written
+
+    def _flush_records(self, records: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        按max_batch分块写入内存中的记录
+        :return: (写入的记录数, 未写入需要重试的记录)
+        """
+        written = 0
+        for start in range(0, len(records), self.max_batch):
+            done, failed = self._write_chunk(records[start:start + self.max_batch])
+            written += done
+            if failed:
+                return written, failed + records[start + self.max_batch:]
+        return written, []
+
+    def _flush_segments(self, segments: List[str]) -> Tuple[int, List[str]]:
+        """
+        逐个分段、按max_batch分块重放溢出文件
+        :return: (写入的记录数, 仍需重试的分段)；中途失败的分段改写为只含剩余记录的新分段
+        """
+        written = 0
+        for index, path in enumerate(segments):
+            chunks = self._iter_segment(path)
+            for chunk in chunks:
+                done, failed = self._write_chunk(chunk)
+                written += done
+                if failed:
+                    segment = self._write_segment(chain(failed, chain.from_iterable(chunks)))
+                    if segment is None:
+                        # 改写失败时保留原分段，重放时已写入的记录会重复，但不会丢失
+                        return written, segments[index:]
+                    self._remove_segments([path])
+                    return written, [segment] + segments[index + 1:]
+            self._remove_segments([path])
+        return written, []
+
+    def _try_flush(self, records: List[Dict[str, Any]]) -> Optional[Exception]:
+        try:
+            self.flush_func(records)
+            return None
+        except Exception as e:
+            with self._lock:
+                self._stats["flush_errors"] += 1
+            return e
+
+    def _write_chunk(self, chunk: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        在一个事务内写入一块记录
+        :return: (写入的记录数, 需要下次重试的记录)
+        """
+        error = self._try_flush(chunk)
+        if error is None:
+            self._attempts = 0
+            return len(chunk), []
+        if _is_transient(error):
+            logger.error(f"批量写入[{self.name}]失败，{len(chunk)}条记录将在下次重试: {error}")
+            return 0, chunk
+        self._attempts += 1
+        if self._attempts < self.max_retries:
+            logger.error(
+                f"批量写入[{self.name}]失败（第{self._attempts}/{self.max_retries}次），"
+                f"{len(chunk)}条记录将在下次重试: {error}"
+            )
+            return 0, chunk
+        self._attempts = 0
+        logger.error(f"批量写入[{self.name}]连续失败{self.max_retries}次，逐步拆分定位无法写入的记录: {error}")
+        return self._bisect(chunk, error)
+
+    def _bisect(self, records: List[Dict[str, Any]], error: Exception) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        二分写入一块失败的记录，单条仍失败的记录移入死信
+        遇到临时错误时停止，返回尚未处理的记录
+        """
+        if len(records) == 1:
+            self._dead_letter(records[0], error)
+            return 0, []
+        written = 0
+        mid = len(records) // 2
+        pending = [records[:mid], records[mid:]]
+        while pending:
+            batch = pending.pop(0)
+            error = self._try_flush(batch)
+            if error is None:
+                written += len(batch)
+            elif _is_transient(error):
+                return written, [record for part in [batch] + pending for record in part]
+            elif len(batch) == 1:
+                self._dead_letter(batch[0], error)
+            else:
+                mid = len(batch) // 2
+                pending[0:0] = [batch[:mid], batch[mid:]]
+        return written, []
+
+    def _dead_letter(self, record: Dict[str, Any], error: Exception) -> None:
+        """无法写入的记录追加到死信文件，人工处理后可删除"""
+        with self._lock:
+            self._stats["dead_lettered"] += 1
+        line = json.dumps(record, ensure_ascii=False, default=_json_default)
+        if self.spill_path:
+            try:
+                with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+                    f.write("\n")
+                logger.error(f"批量写入[{self.name}]记录无法写入，已移入死信文件{self.dead_letter_path}: {error}")
+                return
+            except OSError as e:
+                logger.error(f"写入死信文件[{self.dead_letter_path}]失败: {e}")
+        logger.error(f"批量写入[{self.name}]记录无法写入，已丢弃: {error} 记录: {line[:1000]}")
+
+    @property
+    def dead_letter_path(self) -> str:
+        # 所有进程共用，文件名不以进程号开头，不会被当作溢出文件接管
+        return f"{self.spill_path}.dead"
+
+    def stats(self) -> Dict[str, Any]:
+        """获取写入统计"""
+        with self._lock:
+            result = dict(self._stats)
+            result["pending"] = len(self._buffer)
+            result["spilled_segments"] = len(self._segments)
+            result["overflowed"] = self._overflowed
+        return result
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"批量写入[{self.name}]刷新线程异常: {e}")
+
+    @property
+    def _current_spill_path(self) -> str:
+        # 每个工作进程使用独立的溢出文件，避免多进程交叉写入
+        return f"{self.spill_path}.{os.getpid()}"
+
+    def _append_spill(self, record: Dict[str, Any]) -> None:
+        try:
+            if self._spill_file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.spill_path)), exist_ok=True)
+                self._spill_file = open(self._current_spill_path, "a", encoding="utf-8")
+            self._spill_file.write(json.dumps(record, ensure_ascii=False, default=_json_default))
+            self._spill_file.write("\n")
+            self._spill_file.flush()
+        except OSError as e:
+            logger.error(f"写入溢出文件[{self._current_spill_path}]失败: {e}")
+
+    def _next_segment_path(self) -> str:
+        self._segment_seq += 1
+        return f"{self._current_spill_path}.{int(time.time() * 1000)}.{self._segment_seq}"
+
+    def _write_segment(self, records: Iterable[Dict[str, Any]]) -> Optional[str]:
+        """把记录写入新的待确认分段，未配置溢出文件或写入失败时返回None"""
+        if not self.spill_path:
+            return None
+        with self._lock:
+            path = self._next_segment_path()
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, default=_json_default))
+                    f.write("\n")
+                f.flush()
+                os.fsync(f.fileno())
+            return path
+        except OSError as e:
+            logger.error(f"写入溢出分段[{path}]失败: {e}")
+            self._remove_segments([path])
+            return None
+
+    def _rotate_spill_file(self) -> Optional[str]:
+        """把当前溢出文件改名为待确认分段，调用方需持有self._lock"""
+        if not self.spill_path:
+            return None
+        self._close_spill_file()
+        if not os.path.exists(self._current_spill_path):
+            return None
+        segment = self._next_segment_path()
+        os.replace(self._current_spill_path, segment)
+        return segment
+
+    def _close_spill_file(self) -> None:
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+
+    def _recover_segments(self) -> None:
+        """接管已退出进程遗留的溢出文件"""
+        import psutil
+
+        with self._lock:
+            recovered = []
+            for path in sorted(glob.glob(f"{glob.escape(self.spill_path)}.*")):
+                owner = path[len(self.spill_path) + 1:].split(".")[0]
+                if not owner.isdigit():
+                    continue
+                owner_pid = int(owner)
+                if owner_pid != os.getpid() and psutil.pid_exists(owner_pid):
+                    continue
+                segment = self._next_segment_path()
+                try:
+                    # 改名成功即表示由本进程接管，其他进程不会重复重放
+                    os.replace(path, segment)
+                except OSError:
+                    continue
+                recovered.append(segment)
+            if recovered:
+                logger.info(f"批量写入[{self.name}]接管{len(recovered)}个未落库的溢出文件，将重新写入")
+                self._segments.extend(recovered)
+                self._overflowed = True
+
+    def _iter_segment(self, path: str) -> Iterator[List[Dict[str, Any]]]:
+        """按max_batch条分块读取溢出文件"""
+        chunk: List[Dict[str, Any]] = []
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        chunk.append(json.loads(line, object_hook=_json_object_hook))
+                    except ValueError:
+                        # 崩溃时可能写了半行，跳过
+                        logger.warning(f"溢出文件[{path}]中存在无法解析的记录，已跳过")
+                        continue
+                    if len(chunk) >= self.max_batch:
+                        yield chunk
+                        chunk = []
+        except FileNotFoundError:
+            pass
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _remove_segments(segments: List[str]) -> None:
+        for path in segments:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
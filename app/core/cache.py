@@ -0,0 +1,622 @@
+"""
+多级缓存
+
+用@cached装饰服务方法即可接入：
+
+    @cached("dict", ttl=3600, stale_ttl=600, tables=("sys_dict_data",))
+    def get_options_by_dict_type(self, db: Session, *, dict_type: str) -> List[Dict[str, Any]]:
+        ...
+
+- 本地层：每个命名空间一个进程内LRU，条目最多存活 min(ttl, CACHE_LOCAL_TTL)，命中时不访问Redis
+- Redis层：值以JSON保存，多进程共享；Redis熔断期间只使用本地层
+- 版本：键为 {CACHE_KEY_PREFIX}:{namespace}:v{version}:{key}，invalidate()递增版本使整个命名空间失效，
+  旧键随TTL自然过期；其他进程最迟在CACHE_VERSION_CHECK_INTERVAL后读到新版本
+- 单飞：同一进程内同一个键并发未命中时只有一个线程执行加载，其余线程等待它的结果
+- 过期后可用：设置stale_ttl后，条目过期stale_ttl秒内先返回旧值，同时在后台线程刷新；
+  有db参数的方法在后台刷新时使用新建的会话
+- tables：通过ORM会话提交了这些表的写入后，命名空间自动失效
+- 主库：loader在primary_reads()中执行，失效后重新加载不会从落后的从库读到旧数据
+- 跨进程：失效通过app.core.cache_bus广播，其他worker收到后立即清空本地层；
+  订阅正常时不再轮询版本，订阅断开期间退回按CACHE_VERSION_CHECK_INTERVAL轮询
+- asyncio：aget_or_load()在事件循环中读取本地层和Redis层，未命中时在asyncio默认线程池中加载
+
+返回值必须可以JSON序列化（ORM对象需先转换为dict），调用方不应修改返回的对象。
+"""
+import asyncio
+import hashlib
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial, wraps
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import ORMExecuteState, Session, UOWTransaction
+
+from app.core.cache_bus import invalidation_bus
+from app.core.config import settings
+from app.core.metrics import CACHE_LOAD_DURATION, CACHE_REQUESTS
+from app.core.redis import get_async_redis_client, redis_available, redis_client
+from app.db.routing import primary_reads
+
+logger = logging.getLogger(__name__)
+
+# 键中参数部分超过该长度时使用摘要
+_MAX_RAW_KEY = 200
+
+
+class _LocalLRU:
+    """线程安全的LRU，条目为 (值, 创建时间, 本地过期时间)"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: Tuple[Any, float, float]) -> None:
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _Flight:
+    """一次正在进行的加载"""
+
+    __slots__ = ("event", "value", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class CacheNamespace:
+    """一个缓存命名空间"""
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        stale_ttl: float = 0,
+        local_ttl: Optional[float] = None,
+        maxsize: Optional[int] = None,
+        use_redis: bool = True,
+        tables: Iterable[str] = (),
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.local_ttl = settings.CACHE_LOCAL_TTL if local_ttl is None else local_ttl
+        self.use_redis = use_redis
+        self.tables: Set[str] = set(tables)
+        self.local = _LocalLRU(maxsize or settings.CACHE_LOCAL_MAXSIZE)
+        self._version = 0
+        self._version_checked = 0.0
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self._stats = {
+            "hit_local": 0, "hit_redis": 0, "stale": 0, "miss": 0,
+            "loads": 0, "load_errors": 0, "load_seconds": 0.0,
+        }
+
+    @property
+    def _version_key(self) -> str:
+        return f"{settings.CACHE_KEY_PREFIX}:{self.name}:version"
+
+    @property
+    def version(self) -> int:
+        """当前版本，失效总线断开时按CACHE_VERSION_CHECK_INTERVAL从Redis同步"""
+        if self.use_redis and not invalidation_bus.connected:
+            now = time.monotonic()
+            if now - self._version_checked >= settings.CACHE_VERSION_CHECK_INTERVAL:
+                self._version_checked = now
+                self.sync_version()
+        return self._version
+
+    def sync_version(self) -> None:
+        """从Redis读取版本"""
+        if not self.use_redis or not redis_available():
+            return
+        try:
+            raw = redis_client.get(self._version_key)
+            self._set_version(int(raw) if raw else 0)
+        except Exception as e:
+            logger.debug(f"读取缓存版本失败 {self.name}: {e}")
+
+    def _full_key(self, key: str) -> str:
+        return f"{settings.CACHE_KEY_PREFIX}:{self.name}:v{self.version}:{key}"
+
+    def _set_version(self, version: int) -> None:
+        if version != self._version:
+            self._version = version
+            self.local.clear()
+
+    def invalidate(self) -> None:
+        """使整个命名空间失效"""
+        self.local.clear()
+        if self.use_redis and redis_available():
+            try:
+                version = int(redis_client.incr(self._version_key))
+                self._set_version(version)
+                self._version_checked = time.monotonic()
+                invalidation_bus.publish({"namespace": self.name, "version": version})
+                return
+            except Exception as e:
+                logger.warning(f"递增缓存版本失败 {self.name}: {e}")
+        # Redis不可用时只在本进程内失效
+        self._set_version(self._version + 1)
+
+    def evict(self, key: str) -> None:
+        """使单个键失效"""
+        full_key = self._full_key(key)
+        self.local.pop(full_key)
+        if self.use_redis and redis_available():
+            try:
+                redis_client.delete(full_key)
+            except Exception as e:
+                logger.warning(f"删除缓存失败 {full_key}: {e}")
+        invalidation_bus.publish({"namespace": self.name, "key": key})
+
+    def apply_event(self, event: Dict[str, Any]) -> None:
+        """应用其他进程广播的失效事件"""
+        if "version" in event:
+            self._set_version(int(event["version"]))
+            self._version_checked = time.monotonic()
+        elif "key" in event:
+            self.local.pop(self._full_key(str(event["key"])))
+
+    def resync(self) -> None:
+        """丢弃本地层并重新读取版本（失效总线重新订阅后调用）"""
+        self.local.clear()
+        self._version_checked = time.monotonic()
+        self.sync_version()
+
+    def get_or_load(
+        self, key: str, loader: Callable[[], Any], refresher: Optional[Callable[[], Any]] = None
+    ) -> Any:
+        """
+        读取缓存，未命中时调用loader加载
+        :param refresher: 后台刷新过期条目时使用的加载函数，默认与loader相同
+        """
+        if not settings.CACHE_ENABLED:
+            return loader()
+
+        full_key = self._full_key(key)
+        now = time.time()
+        stale: Optional[Tuple[Any, float]] = None
+
+        entry = self.local.get(full_key)
+        if entry is not None:
+            value, created, local_until = entry
+            if now < local_until and now < created + self.ttl:
+                self._count("hit_local")
+                return value
+            stale = (value, created)
+
+        if self.use_redis:
+            remote = self._redis_get(full_key)
+            if remote is not None:
+                value, created = remote
+                if now < created + self.ttl:
+                    self.local.set(full_key, (value, created, self._local_until(created, now)))
+                    self._count("hit_redis")
+                    return value
+                if stale is None or created > stale[1]:
+                    stale = remote
+
+        if stale is not None and now < stale[1] + self.ttl + self.stale_ttl:
+            self._count("stale")
+            self._refresh_async(full_key, refresher or loader)
+            return stale[0]
+
+        self._count("miss")
+        return self._load(full_key, loader)
+
+    async def aget_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        get_or_load的asyncio版本，供async接口使用
+        本地层和Redis层（asyncio客户端）在事件循环中读取；都未命中时在asyncio默认线程池中执行loader，
+        不占用AnyIO线程池，同步接口占满线程池时也能加载。
+        键使用当前已知的版本，不在事件循环中同步读取Redis中的版本；不使用过期后可用。
+        """
+        if not settings.CACHE_ENABLED:
+            return await asyncio.to_thread(loader)
+
+        full_key = f"{settings.CACHE_KEY_PREFIX}:{self.name}:v{self._version}:{key}"
+        now = time.time()
+        entry = self.local.get(full_key)
+        if entry is not None:
+            value, created, local_until = entry
+            if now < local_until and now < created + self.ttl:
+                self._count("hit_local")
+                return value
+
+        if self.use_redis and redis_available():
+            try:
+                remote = self._decode_payload(await get_async_redis_client().get(full_key))
+            except Exception as e:
+                logger.debug(f"读取缓存失败 {full_key}: {e}")
+                remote = None
+            if remote is not None and now < remote[1] + self.ttl:
+                value, created = remote
+                self.local.set(full_key, (value, created, self._local_until(created, now)))
+                self._count("hit_redis")
+                return value
+
+        self._count("miss")
+        return await asyncio.to_thread(self._load, full_key, loader)
+
+    def _local_until(self, created: float, now: float) -> float:
+        if self.use_redis:
+            return min(created + self.ttl, now + self.local_ttl)
+        return created + self.ttl
+
+    def _redis_get(self, full_key: str) -> Optional[Tuple[Any, float]]:
+        if not redis_available():
+            return None
+        try:
+            raw = redis_client.get(full_key)
+        except Exception as e:
+            logger.debug(f"读取缓存失败 {full_key}: {e}")
+            return None
+        return self._decode_payload(raw)
+
+    @staticmethod
+    def _decode_payload(raw: Optional[bytes]) -> Optional[Tuple[Any, float]]:
+        if raw is None:
+            return None
+        try:
+            payload = json.loads(raw)
+            return payload["v"], float(payload["t"])
+        except (ValueError, KeyError, TypeError):
+            return None
+
+    def _store(self, full_key: str, value: Any) -> None:
+        created = time.time()
+        self.local.set(full_key, (value, created, self._local_until(created, created)))
+        if not self.use_redis or not redis_available():
+            return
+        try:
+            payload = json.dumps({"v": value, "t": created}, ensure_ascii=False)
+        except (TypeError, ValueError) as e:
+            logger.warning(f"缓存值无法序列化，只保存在本地 {full_key}: {e}")
+            return
+        try:
+            redis_client.setex(full_key, max(1, int(self.ttl + self.stale_ttl)), payload)
+        except Exception as e:
+            logger.debug(f"写入缓存失败 {full_key}: {e}")
+
+    def _join(self, full_key: str) -> Tuple[_Flight, bool]:
+        """加入同一个键正在进行的加载，没有时创建并成为执行者"""
+        with self._flights_lock:
+            flight = self._flights.get(full_key)
+            if flight is not None:
+                return flight, False
+            flight = self._flights[full_key] = _Flight()
+            return flight, True
+
+    def _run(self, full_key: str, flight: _Flight, loader: Callable[[], Any]) -> Any:
+        started = time.perf_counter()
+        try:
+            with primary_reads():
+                value = loader()
+            flight.value = value
+            self._store(full_key, value)
+            return value
+        except BaseException as e:
+            flight.error = e
+            self._stats["load_errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._stats["loads"] += 1
+            self._stats["load_seconds"] += elapsed
+            CACHE_LOAD_DURATION.labels(self.name).observe(elapsed)
+            with self._flights_lock:
+                self._flights.pop(full_key, None)
+            flight.event.set()
+
+    def _load(self, full_key: str, loader: Callable[[], Any]) -> Any:
+        flight, leader = self._join(full_key)
+        if leader:
+            return self._run(full_key, flight, loader)
+        if not flight.event.wait(settings.CACHE_LOAD_WAIT):
+            # 其他线程加载太慢，自行加载
+            with primary_reads():
+                return loader()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    def _refresh_async(self, full_key: str, loader: Callable[[], Any]) -> None:
+        flight, leader = self._join(full_key)
+        if not leader:
+            return
+
+        def refresh() -> None:
+            try:
+                self._run(full_key, flight, loader)
+            except Exception as e:
+                logger.warning(f"后台刷新缓存失败 {full_key}: {e}")
+
+        _refresh_executor().submit(refresh)
+
+    def _count(self, result: str) -> None:
+        self._stats[result] += 1
+        CACHE_REQUESTS.labels(self.name, result).inc()
+
+    def stats(self) -> Dict[str, Any]:
+        s = self._stats
+        requests = s["hit_local"] + s["hit_redis"] + s["stale"] + s["miss"]
+        return {
+            "namespace": self.name,
+            "ttl": self.ttl,
+            "stale_ttl": self.stale_ttl,
+            "use_redis": self.use_redis,
+            "version": self._version,
+            "tables": sorted(self.tables),
+            "local_size": len(self.local),
+            "requests": requests,
+            "hit_local": s["hit_local"],
+            "hit_redis": s["hit_redis"],
+            "stale": s["stale"],
+            "miss": s["miss"],
+            "hit_ratio": round((requests - s["miss"]) / requests, 4) if requests else None,
+            "loads": s["loads"],
+            "load_errors": s["load_errors"],
+            "avg_load_ms": round(s["load_seconds"] * 1000 / s["loads"], 2) if s["loads"] else None,
+        }
+
+
+_namespaces: Dict[str, CacheNamespace] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _refresh_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.CACHE_REFRESH_WORKERS, thread_name_prefix="cache-refresh"
+                )
+    return _executor
+
+
+def cache_namespace(name: str, **options: Any) -> CacheNamespace:
+    """获取命名空间，不存在时按options创建"""
+    namespace = _namespaces.get(name)
+    if namespace is None:
+        namespace = _namespaces[name] = CacheNamespace(name, **options)
+    elif options.get("tables"):
+        namespace.tables.update(options["tables"])
+    return namespace
+
+
+def invalidate(name: str) -> bool:
+    """使命名空间失效，命名空间不存在时返回False"""
+    namespace = _namespaces.get(name)
+    if namespace is None:
+        return False
+    namespace.invalidate()
+    return True
+
+
+def cache_stats() -> List[Dict[str, Any]]:
+    """所有命名空间的统计"""
+    return [ns.stats() for ns in sorted(_namespaces.values(), key=lambda n: n.name)]
+
+
+def _call_with_new_session(func: Callable[..., Any], bound: inspect.BoundArguments) -> Any:
+    """用新建的会话替换db参数后调用，请求的会话在后台刷新时可能已经关闭"""
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        arguments = dict(bound.arguments)
+        arguments["db"] = db
+        call = inspect.BoundArguments(bound.signature, arguments)
+        return func(*call.args, **call.kwargs)
+    finally:
+        db.close()
+
+
+def cached(
+    namespace: str,
+    ttl: float = 300,
+    *,
+    stale_ttl: float = 0,
+    local_ttl: Optional[float] = None,
+    maxsize: Optional[int] = None,
+    use_redis: bool = True,
+    tables: Iterable[str] = (),
+    key_func: Optional[Callable[..., Any]] = None,
+    ignore: Iterable[str] = ("self", "db"),
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """
+    缓存装饰器
+    :param namespace: 命名空间，同一命名空间的方法一起失效
+    :param ttl: 条目有效期（秒）
+    :param stale_ttl: 过期后仍可返回旧值并后台刷新的时长（秒），0表示不使用
+    :param local_ttl: 本地层最长存活时间，默认CACHE_LOCAL_TTL
+    :param use_redis: 是否使用Redis层
+    :param tables: 依赖的数据表
+    :param key_func: 用调用参数生成键，默认使用除ignore以外的全部参数
+    :param ignore: 不参与生成键的参数名
+    """
+    ns = cache_namespace(
+        namespace, ttl=ttl, stale_ttl=stale_ttl, local_ttl=local_ttl,
+        maxsize=maxsize, use_redis=use_redis, tables=tables,
+    )
+    ignored = set(ignore)
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        signature = inspect.signature(func)
+        has_db = "db" in signature.parameters
+
+        def build_key(bound: inspect.BoundArguments) -> str:
+            if key_func is not None:
+                raw = str(key_func(*bound.args, **bound.kwargs))
+            else:
+                raw = ",".join(
+                    f"{name}={value!r}" for name, value in bound.arguments.items() if name not in ignored
+                )
+            if len(raw) > _MAX_RAW_KEY:
+                raw = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+            return f"{func.__qualname__}:{raw}"
+
+        def bind(args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> inspect.BoundArguments:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return bound
+
+        @wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            bound = bind(args, kwargs)
+            loader = partial(func, *args, **kwargs)
+            refresher = partial(_call_with_new_session, func, bound) if has_db and ns.stale_ttl else None
+            return ns.get_or_load(build_key(bound), loader, refresher)
+
+        def evict(*args: Any, **kwargs: Any) -> None:
+            """使某组参数对应的条目在所有进程中失效，参数与被装饰的方法相同"""
+            ns.evict(build_key(bind(args, kwargs)))
+
+        wrapper.cache = ns
+        wrapper.evict = evict
+        return wrapper
+
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# 按数据表自动失效：记录会话写入的表，提交后使依赖这些表的命名空间失效，
+# 并通知通过on_tables_committed注册的其他进程内缓存
+
+_SESSION_TABLES_KEY = "cache_tables"
+_table_listeners: List[Tuple[Set[str], Callable[[Set[str]], None], Optional[Callable[[], None]]]] = []
+
+
+def on_tables_committed(
+    tables: Iterable[str],
+    callback: Callable[[Set[str]], None],
+    on_resync: Optional[Callable[[], None]] = None,
+) -> None:
+    """
+    注册数据表写入回调，本进程和其他进程提交这些表的写入后都会调用
+    :param callback: 参数为已提交写入的表名集合
+    :param on_resync: 失效总线重新订阅后调用（断开期间可能漏掉通知），默认以全部表调用一次callback
+    """
+    _table_listeners.append((set(tables), callback, on_resync))
+
+
+def _notify_tables(tables: Set[str]) -> Set[str]:
+    notified: Set[str] = set()
+    for watched, callback, _ in _table_listeners:
+        matched = watched & tables
+        if not matched:
+            continue
+        notified |= matched
+        try:
+            callback(matched)
+        except Exception as e:
+            logger.warning(f"数据表写入回调失败 {sorted(matched)}: {e}")
+    return notified
+
+
+def _touched(session: Session) -> Set[str]:
+    return session.info.setdefault(_SESSION_TABLES_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_tables(session: Session, flush_context: UOWTransaction) -> None:
+    tables = _touched(session)
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        state = sa_inspect(obj)
+        mapper = state.mapper
+        tables.add(mapper.local_table.name)
+        # 多对多关系的变化写入关联表，关联表行不是ORM对象
+        for rel in mapper.relationships:
+            if rel.secondary is None or not hasattr(rel.secondary, "name"):
+                continue
+            # AttributeState.history不会为此触发懒加载
+            if obj in session.deleted or state.attrs[rel.key].history.has_changes():
+                tables.add(rel.secondary.name)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_executed_tables(orm_execute_state: ORMExecuteState) -> None:
+    # session.execute(insert/update/delete) 和 query.update()/delete()
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        name = getattr(table, "name", None)
+        if name:
+            _touched(orm_execute_state.session).add(name)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_tables(session: Session) -> None:
+    tables = session.info.pop(_SESSION_TABLES_KEY, None)
+    if not tables:
+        return
+    for namespace in list(_namespaces.values()):
+        if namespace.tables & tables:
+            namespace.invalidate()
+    notified = _notify_tables(tables)
+    if notified:
+        invalidation_bus.publish({"tables": sorted(notified)})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back_tables(session: Session) -> None:
+    session.info.pop(_SESSION_TABLES_KEY, None)
+
+
+def _on_bus_event(event: Dict[str, Any]) -> None:
+    name = event.get("namespace")
+    if name is not None:
+        namespace = _namespaces.get(name)
+        if namespace is not None:
+            namespace.apply_event(event)
+    elif event.get("tables"):
+        _notify_tables(set(event["tables"]))
+
+
+def _on_bus_resync() -> None:
+    for namespace in list(_namespaces.values()):
+        namespace.resync()
+    for watched, callback, on_resync in _table_listeners:
+        try:
+            if on_resync is not None:
+                on_resync()
+            else:
+                callback(set(watched))
+        except Exception as e:
+            logger.warning(f"数据表写入回调失败 {sorted(watched)}: {e}")
+
+
+invalidation_bus.add_listener(_on_bus_event, _on_bus_resync)
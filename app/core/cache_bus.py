@@ -0,0 +1,179 @@
+"""
+缓存失效总线
+
+进程内缓存（多级缓存的本地层、内存搜索索引等）在其他worker或节点写入数据后会过期。
+写入方提交后通过Redis发布订阅广播失效事件，每个worker在lifespan中启动订阅线程，
+收到其他进程的事件后在本地执行失效：
+
+- {"namespace": 名称, "version": 版本}：命名空间整体失效
+- {"namespace": 名称, "key": 键}：命名空间内单个键失效
+- {"tables": [表名]}：这些表有已提交的写入
+
+发布订阅不保证送达，订阅断开期间的事件会丢失，所以每次（重新）订阅成功后执行一次全量重新同步。
+事件携带发布时间，收到时记录传播延迟（跨节点时包含时钟偏差）。
+"""
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import CACHE_INVALIDATION_DELAY
+from app.core.redis import redis_available, redis_client
+
+logger = logging.getLogger(__name__)
+
+EventListener = Callable[[Dict[str, Any]], None]
+ResyncListener = Callable[[], None]
+
+
+class InvalidationBus:
+    """基于Redis发布订阅的失效事件总线"""
+
+    def __init__(self):
+        self._listeners: List[Tuple[EventListener, Optional[ResyncListener]]] = []
+        self._origin: Optional[str] = None
+        self._origin_pid: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._delays: Deque[float] = deque(maxlen=settings.CACHE_BUS_DELAY_WINDOW)
+        self.connected = False
+        self.published = 0
+        self.received = 0
+        self.connects = 0
+        self.last_resync: Optional[float] = None
+
+    @property
+    def origin(self) -> str:
+        """当前进程的标识，fork出的worker进程重新生成"""
+        pid = os.getpid()
+        if self._origin is None or self._origin_pid != pid:
+            self._origin = f"{socket.gethostname()}:{pid}:{uuid.uuid4().hex[:8]}"
+            self._origin_pid = pid
+        return self._origin
+
+    def add_listener(self, on_event: EventListener, on_resync: Optional[ResyncListener] = None) -> None:
+        """
+        注册监听器
+        :param on_event: 收到其他进程的事件时调用
+        :param on_resync: 订阅（重新）建立后调用，应丢弃所有本地状态
+        """
+        self._listeners.append((on_event, on_resync))
+
+    def publish(self, event: Dict[str, Any]) -> None:
+        """广播事件，Redis不可用时跳过（其他进程依靠版本检查和TTL兜底）"""
+        if not settings.CACHE_BUS_ENABLED or not redis_available():
+            return
+        message = dict(event, origin=self.origin, ts=time.time())
+        try:
+            redis_client.publish(settings.CACHE_BUS_CHANNEL, json.dumps(message, ensure_ascii=False))
+            self.published += 1
+        except Exception as e:
+            logger.warning(f"发布缓存失效事件失败: {e}")
+
+    def start(self) -> None:
+        """启动订阅线程"""
+        if not settings.CACHE_BUS_ENABLED or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止订阅线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        delay = settings.CACHE_BUS_RECONNECT_DELAY
+        while not self._stop_event.is_set():
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(settings.CACHE_BUS_CHANNEL)
+                self.connected = True
+                self.connects += 1
+                # 先订阅再重新同步，同步期间的事件不会丢失
+                self._resync()
+                delay = settings.CACHE_BUS_RECONNECT_DELAY
+                while not self._stop_event.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self._handle(message["data"])
+            except Exception as e:
+                logger.warning(f"缓存失效订阅断开，{delay:.0f}秒后重连: {e}")
+            finally:
+                self.connected = False
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            if self._stop_event.wait(delay):
+                break
+            delay = min(delay * 2, 30.0)
+
+    def _resync(self) -> None:
+        for _, on_resync in self._listeners:
+            if on_resync is None:
+                continue
+            try:
+                on_resync()
+            except Exception as e:
+                logger.warning(f"缓存重新同步失败: {e}")
+        self.last_resync = time.time()
+
+    def _handle(self, raw: Any) -> None:
+        try:
+            event = json.loads(raw)
+        except (TypeError, ValueError):
+            return
+        if event.get("origin") == self.origin:
+            # 本进程发布的事件在发布前已经生效
+            return
+        self.received += 1
+        ts = event.get("ts")
+        if isinstance(ts, (int, float)):
+            delay = max(0.0, time.time() - ts)
+            CACHE_INVALIDATION_DELAY.observe(delay)
+            with self._lock:
+                self._delays.append(delay)
+        for on_event, _ in self._listeners:
+            try:
+                on_event(event)
+            except Exception as e:
+                logger.warning(f"处理缓存失效事件失败 {event}: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """订阅状态和传播延迟统计（毫秒）"""
+        with self._lock:
+            delays = sorted(self._delays)
+        delay_stats: Dict[str, Any] = {"samples": len(delays)}
+        if delays:
+            delay_stats.update({
+                "avg_ms": round(sum(delays) * 1000 / len(delays), 2),
+                "p95_ms": round(delays[min(len(delays) - 1, int(len(delays) * 0.95))] * 1000, 2),
+                "max_ms": round(delays[-1] * 1000, 2),
+            })
+        return {
+            "enabled": settings.CACHE_BUS_ENABLED,
+            "connected": self.connected,
+            "channel": settings.CACHE_BUS_CHANNEL,
+            "origin": self.origin,
+            "published": self.published,
+            "received": self.received,
+            "reconnects": max(0, self.connects - 1),
+            "last_resync": self.last_resync,
+            "delay": delay_stats,
+        }
+
+
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,112 @@
+"""
+日志
+
+各模块仍使用标准库logging.getLogger(__name__)，根logger只挂一个InterceptHandler，
+所有记录转交loguru统一格式化和输出：
+
+- 输出默认enqueue=True：记录放入队列后由后台线程写入终端或文件，请求线程不等待IO
+- 根logger按LOGGING_LEVEL设置级别，低于该级别的调用在格式化参数之前就被丢弃；
+  热点路径使用 logger.debug("... %s", value) 传参而不是f-string，未启用DEBUG时没有格式化开销
+- 每条记录附带当前请求的关联ID（request_id），不在请求中时为"-"
+- 逐条数据、逐个节点之类的高频调试事件先用sampled()按1/LOG_DEBUG_SAMPLE_EVERY采样
+
+在worker进程中（lifespan启动时）调用setup_logging()，队列的写入线程不会因fork丢失。
+"""
+import logging
+import sys
+import threading
+from typing import Any, Dict, Optional
+
+from loguru import logger as loguru_logger
+
+from app.core.config import settings
+from app.core.request_context import current_request_id
+
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "{extra[request_id]} | <cyan>{name}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>"
+)
+
+# 由uvicorn自行添加了handler的logger，改为传递给根logger
+_UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+_sample_counters: Dict[str, int] = {}
+_sample_lock = threading.Lock()
+
+
+class InterceptHandler(logging.Handler):
+    """把标准库logging的记录转交给loguru，保留原logger名称和调用位置"""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            try:
+                level: Any = loguru_logger.level(record.levelname).name
+            except ValueError:
+                level = record.levelno
+            loguru_logger.patch(
+                lambda r: r.update(name=record.name, function=record.funcName, line=record.lineno)
+            ).opt(exception=record.exc_info).log(level, record.getMessage())
+        except Exception:
+            self.handleError(record)
+
+
+def _add_request_id(record: Dict[str, Any]) -> None:
+    # patcher在调用日志的线程中执行，能读到当前请求的contextvar
+    record["extra"].setdefault("request_id", current_request_id() or "-")
+
+
+def _add_sinks(enqueue: bool) -> None:
+    level = settings.LOGGING_LEVEL.upper()
+    loguru_logger.add(
+        sys.stderr, level=level, format=LOG_FORMAT, enqueue=enqueue, backtrace=False, diagnose=False
+    )
+    if settings.LOG_FILE:
+        loguru_logger.add(
+            settings.LOG_FILE,
+            level=level,
+            format=LOG_FORMAT,
+            enqueue=enqueue,
+            serialize=settings.LOG_JSON,
+            rotation=settings.LOG_FILE_ROTATION,
+            retention=settings.LOG_FILE_RETENTION,
+            encoding="utf-8",
+            backtrace=False,
+            diagnose=False,
+        )
+
+
+def setup_logging() -> None:
+    """配置日志输出（应用启动时调用，重复调用会重新配置）"""
+    loguru_logger.remove()
+    loguru_logger.configure(patcher=_add_request_id)
+    _add_sinks(settings.LOG_ENQUEUE)
+
+    logging.basicConfig(handlers=[InterceptHandler()], level=settings.LOGGING_LEVEL.upper(), force=True)
+    for name in _UVICORN_LOGGERS:
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+
+def shutdown_logging() -> None:
+    """写完队列中剩余的日志，之后的日志同步输出（应用关闭时调用）"""
+    loguru_logger.remove()
+    _add_sinks(enqueue=False)
+
+
+def sampled(logger: logging.Logger, event: str, every: Optional[int] = None) -> bool:
+    """
+    高频调试事件是否输出
+    logger未启用DEBUG时直接返回False；否则同一事件每every次（默认LOG_DEBUG_SAMPLE_EVERY）返回一次True
+
+    用法: if sampled(logger, "online.session"): logger.debug("解析会话: %s", data)
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return False
+    every = every or settings.LOG_DEBUG_SAMPLE_EVERY
+    if every <= 1:
+        return True
+    with _sample_lock:
+        count = _sample_counters.get(event, 0)
+        _sample_counters[event] = count + 1
+    return count % every == 0
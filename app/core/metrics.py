@@ -0,0 +1,129 @@
+"""
+Prometheus指标
+
+设置环境变量PROMETHEUS_MULTIPROC_DIR后以多进程模式运行：每个uvicorn worker把指标写入
+该目录下的mmap文件，/metrics由任意worker汇总所有进程的数据后输出。
+目录需在启动前创建并清空，worker退出时在lifespan中标记进程结束。
+"""
+import os
+import time
+
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.request_context import route_template
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+# HTTP请求
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP请求数", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP请求耗时", ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "正在处理的HTTP请求数", multiprocess_mode="livesum"
+)
+
+# 数据库连接池
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "已借出的数据库连接数", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "超出pool_size的连接数", ["engine"], multiprocess_mode="livesum"
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "从连接池获取连接的等待时间",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30)
+)
+
+# Redis
+REDIS_LATENCY = Histogram(
+    "redis_command_duration_seconds", "Redis命令耗时", ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1)
+)
+REDIS_ERRORS = Counter(
+    "redis_command_errors_total", "Redis命令失败数", ["command"]
+)
+
+# 缓存
+CACHE_REQUESTS = Counter(
+    "cache_requests_total", "缓存访问次数", ["namespace", "result"]
+)
+CACHE_LOAD_DURATION = Histogram(
+    "cache_load_duration_seconds", "缓存未命中时加载数据的耗时", ["namespace"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+CACHE_INVALIDATION_DELAY = Histogram(
+    "cache_invalidation_delay_seconds", "缓存失效消息从发布到其他进程收到的延迟",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5)
+)
+
+# 在线会话数，由服务器采样线程按ONLINE_SESSIONS_SAMPLE_INTERVAL从Redis统计
+ONLINE_SESSIONS = Gauge(
+    "online_sessions", "在线会话数", multiprocess_mode="livemostrecent"
+)
+
+# 定时任务
+JOB_EXECUTIONS = Counter(
+    "job_executions_total", "定时任务执行次数", ["job_group", "job_name", "status"]
+)
+JOB_DURATION = Histogram(
+    "job_duration_seconds", "定时任务执行耗时", ["job_group", "job_name"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 600)
+)
+
+
+def generate_metrics() -> bytes:
+    """生成Prometheus文本格式的指标"""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead() -> None:
+    """多进程模式下worker退出时清理本进程的live指标文件"""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class PrometheusMiddleware:
+    """
+    HTTP请求指标中间件（纯ASGI实现，不缓冲响应体，对流式响应无影响）
+    """
+
+    def __init__(self, app: ASGIApp, exclude_paths: tuple = ("/metrics",)):
+        self.app = app
+        self.exclude_paths = exclude_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_PROGRESS.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            # 未匹配任何路由的请求归为一类，防止标签基数膨胀
+            route = route_template(scope) or "<unmatched>"
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            HTTP_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+
@@ -1,18 +1,278 @@
+"""
+Redis客户端
+
+进程内所有Redis访问共用同一个连接池（同步和asyncio各一个），不再每次调用前PING。
+所有命令和管道都经过熔断器：连续连接失败达到REDIS_BREAKER_FAILURES次后熔断，
+熔断期间命令直接抛出RedisUnavailable而不等待连接超时；经过REDIS_BREAKER_RESET秒后
+放行一个探测命令，成功则恢复。可选的Redis操作（如更新最后访问时间）应先检查redis_available()。
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
 import redis
+import redis.asyncio as aioredis
+from redis.asyncio.client import Pipeline as AsyncPipeline
+from redis.client import Pipeline
+
 from app.core.config import settings
+from app.core.metrics import REDIS_ERRORS, REDIS_LATENCY
+from app.core.request_context import record_timing
+
+logger = logging.getLogger(__name__)
+
+
+class RedisUnavailable(redis.ConnectionError):
+    """熔断期间拒绝执行的命令"""
+
+
+class CircuitBreaker:
+    """
+    熔断器
+
+    closed：正常放行；open：全部拒绝；half_open：只放行一个探测命令，其余拒绝
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self._probe_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        """
+        命令是否可能被放行（不发起网络请求）
+        熔断到期后返回True，让可选操作承担探测，没有其他流量时也能自动恢复
+        """
+        if self.state == self.CLOSED:
+            return True
+        return self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout
+
+    def allow(self) -> bool:
+        """当前命令是否可以执行"""
+        if self.state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            if self.state == self.OPEN and now - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probe_at = now
+                return True
+            if self.state == self.HALF_OPEN and now - self._probe_at >= self.reset_timeout:
+                # 探测命令迟迟没有结果时再放行一个
+                self._probe_at = now
+                return True
+            if self.state == self.CLOSED:
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        if self.state == self.CLOSED and self.failures == 0:
+            return
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.warning("Redis已恢复，关闭熔断")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                if self.state == self.CLOSED:
+                    logger.error(f"Redis连续失败{self.failures}次，熔断{self.reset_timeout}秒")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "open_seconds": round(time.monotonic() - self.opened_at, 1) if self.state != self.CLOSED else 0,
+        }
+
+
+redis_breaker = CircuitBreaker(settings.REDIS_BREAKER_FAILURES, settings.REDIS_BREAKER_RESET)
+
+
+@contextmanager
+def _instrument(command: str) -> Iterator[None]:
+    """熔断检查、耗时和失败统计"""
+    if not redis_breaker.allow():
+        raise RedisUnavailable(f"Redis熔断中，跳过命令 {command}")
+    started = time.perf_counter()
+    try:
+        yield
+    except (redis.ConnectionError, redis.TimeoutError):
+        REDIS_ERRORS.labels(command).inc()
+        redis_breaker.record_failure()
+        raise
+    except redis.RedisError:
+        # 服务端返回的错误说明连接正常
+        REDIS_ERRORS.labels(command).inc()
+        redis_breaker.record_success()
+        raise
+    else:
+        redis_breaker.record_success()
+    finally:
+        elapsed = time.perf_counter() - started
+        REDIS_LATENCY.labels(command).observe(elapsed)
+        record_timing("redis", elapsed)
+
+
+def _command_name(args: Sequence[Any]) -> str:
+    return str(args[0]).upper() if args else "UNKNOWN"
+
+
+class InstrumentedPipeline(Pipeline):
+    """整个管道作为一次命令统计和熔断"""
+
+    def execute(self, raise_on_error: bool = True) -> List[Any]:
+        with _instrument("PIPELINE"):
+            return super().execute(raise_on_error)
+
+
+class InstrumentedRedis(redis.Redis):
+    """记录每条命令耗时和失败次数、受熔断器保护的Redis客户端"""
+
+    def execute_command(self, *args, **options):
+        with _instrument(_command_name(args)):
+            return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> InstrumentedPipeline:
+        return InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
 
-# 创建Redis客户端
-redis_client = redis.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB,
-    password=settings.REDIS_PASSWORD,
-    decode_responses=False  # 不自动解码响应，在需要的地方手动解码
-)
 
+class AsyncInstrumentedPipeline(AsyncPipeline):
+    """asyncio版本的管道"""
 
-def get_redis_client():
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        with _instrument("PIPELINE"):
+            return await super().execute(raise_on_error)
+
+
+class AsyncInstrumentedRedis(aioredis.Redis):
+    """asyncio版本的客户端，与同步客户端共用熔断器和指标"""
+
+    async def execute_command(self, *args, **options):
+        with _instrument(_command_name(args)):
+            return await super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None) -> AsyncInstrumentedPipeline:
+        return AsyncInstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+def _pool_kwargs() -> Dict[str, Any]:
+    return {
+        "host": settings.REDIS_HOST,
+        "port": settings.REDIS_PORT,
+        "db": settings.REDIS_DB,
+        "password": settings.REDIS_PASSWORD or None,
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        # 连接池耗尽时最多等待一个连接超时，而不是立即报错
+        "timeout": settings.REDIS_CONNECT_TIMEOUT,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT,
+        "health_check_interval": settings.REDIS_HEALTH_CHECK_INTERVAL,
+        "decode_responses": False,  # 不自动解码响应，在需要的地方手动解码
+    }
+
+
+# 同步连接池和客户端
+redis_pool = redis.BlockingConnectionPool(**_pool_kwargs())
+redis_client = InstrumentedRedis(connection_pool=redis_pool)
+
+# asyncio客户端在第一次使用时创建，连接绑定到当时的事件循环
+_async_client: Optional[AsyncInstrumentedRedis] = None
+
+
+def get_redis_client() -> InstrumentedRedis:
     """
     获取Redis客户端
     """
-    return redis_client 
\ No newline at end of file
+    return redis_client
+
+
+def get_async_redis_client() -> AsyncInstrumentedRedis:
+    """
+    获取asyncio Redis客户端
+    """
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncInstrumentedRedis(
+            connection_pool=aioredis.BlockingConnectionPool(**_pool_kwargs())
+        )
+    return _async_client
+
+
+def redis_available() -> bool:
+    """Redis是否可用，可选的Redis操作在返回False时应直接跳过"""
+    return redis_breaker.available
+
+
+def run_pipeline(
+    commands: Iterable[Sequence[Any]], transaction: bool = False, raise_on_error: bool = True
+) -> List[Any]:
+    """
+    一次往返执行多条命令
+    :param commands: 命令列表，如 [("GET", key), ("EXPIRE", key, 60)]
+    :param transaction: 是否用MULTI/EXEC包裹
+    :return: 按顺序排列的结果
+    """
+    pipe = redis_client.pipeline(transaction=transaction)
+    for command in commands:
+        pipe.execute_command(*command)
+    return pipe.execute(raise_on_error=raise_on_error)
+
+
+def run_transaction(func: Callable[[Pipeline], Any], *watches: str, **kwargs: Any) -> Any:
+    """
+    乐观锁事务：WATCH指定的键后调用func(pipe)，键被其他客户端修改时自动重试
+    func中先用pipe读取，再调用pipe.multi()后写入；返回func的返回值
+    """
+    return redis_client.transaction(func, *watches, value_from_callable=True, **kwargs)
+
+
+async def async_run_pipeline(
+    commands: Iterable[Sequence[Any]], transaction: bool = False, raise_on_error: bool = True
+) -> List[Any]:
+    """run_pipeline的asyncio版本"""
+    pipe = get_async_redis_client().pipeline(transaction=transaction)
+    for command in commands:
+        pipe.execute_command(*command)
+    return await pipe.execute(raise_on_error=raise_on_error)
+
+
+def redis_status() -> Dict[str, Any]:
+    """连接池和熔断器状态"""
+    return {
+        "breaker": redis_breaker.status(),
+        "pool": {
+            "max_connections": redis_pool.max_connections,
+            "created": len(getattr(redis_pool, "_connections", [])),
+        },
+    }
+
+
+async def close_redis() -> None:
+    """关闭连接池（应用关闭时调用）"""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.connection_pool.disconnect()
+        _async_client = None
+    redis_pool.disconnect()
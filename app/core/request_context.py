@@ -0,0 +1,211 @@
+"""
+请求上下文计时
+
+中间件为每个请求创建RequestTimings并放入contextvar，SQL、Redis和认证等环节按类别累加耗时，
+响应头中输出Server-Timing，浏览器开发者工具的Timing面板可直接查看耗时分布。
+同步接口在线程池中执行时AnyIO会复制contextvar，线程中记录的耗时写入的是同一个对象。
+
+每个请求有一个关联ID（沿用请求头X-Request-ID，没有时生成），写入响应头和该请求的所有日志。
+"""
+import json
+import logging
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger("app.timing")
+
+# 各类别在Server-Timing中的说明
+# 响应头只能使用ASCII字符
+CATEGORY_DESC = {
+    "jwt": "JWT decode",
+    "user": "User lookup",
+    "perm": "Permission check",
+    "db": "SQL",
+    "redis": "Redis",
+}
+
+
+def matched_route(scope: Scope) -> Optional[Any]:
+    """获取请求匹配的路由对象，路由阶段未记录时重新匹配"""
+    route = scope.get("route")
+    if route is not None:
+        return route
+    app = scope.get("app")
+    for route in getattr(getattr(app, "router", None), "routes", []):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route
+    return None
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """获取请求匹配的路由模板（如/system/user/{user_id}），避免路径参数造成基数膨胀"""
+    return getattr(matched_route(scope), "path", None)
+
+
+class RequestTimings:
+    """单个请求内按类别累加的耗时"""
+
+    def __init__(
+        self, method: str = "", path: str = "", scope: Optional[Scope] = None, request_id: Optional[str] = None
+    ):
+        self.method = method
+        self.path = path
+        self.scope = scope
+        self.request_id = request_id or uuid.uuid4().hex[:16]
+        self._route: Optional[str] = None
+        # 请求内的附加数据，如SQL语句预算是否已告警
+        self.extra: Dict[str, Any] = {}
+        self.started = time.perf_counter()
+        self.durations: Dict[str, float] = {}
+        self.counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, category: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[category] = self.durations.get(category, 0.0) + seconds
+            self.counts[category] = self.counts.get(category, 0) + 1
+
+    @property
+    def route(self) -> str:
+        """匹配的路由模板，未匹配时返回原始路径"""
+        if self._route is None:
+            self._route = (route_template(self.scope) if self.scope is not None else None) or self.path
+        return self._route
+
+    def count(self, category: str) -> int:
+        return self.counts.get(category, 0)
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def to_header(self) -> str:
+        """生成Server-Timing头，耗时单位为毫秒，各类别可能有重叠（如用户查询包含SQL）"""
+        parts: List[str] = []
+        with self._lock:
+            items = list(self.durations.items())
+            counts = dict(self.counts)
+        for category, seconds in items:
+            desc = f"{CATEGORY_DESC.get(category, category)} x{counts[category]}"
+            parts.append(f'{category};dur={seconds * 1000:.2f};desc="{desc}"')
+        parts.append(f"total;dur={self.elapsed() * 1000:.2f}")
+        return ", ".join(parts)
+
+    def to_dict(self) -> Dict[str, object]:
+        with self._lock:
+            durations = {k: round(v * 1000, 3) for k, v in self.durations.items()}
+            counts = dict(self.counts)
+        return {
+            "request_id": self.request_id,
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "total_ms": round(self.elapsed() * 1000, 3),
+            "timings_ms": durations,
+            "counts": counts,
+        }
+
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """获取当前请求的计时对象，不在请求中时返回None"""
+    return _current.get()
+
+
+def current_request_id() -> Optional[str]:
+    """获取当前请求的关联ID，不在请求中时返回None"""
+    timings = _current.get()
+    return timings.request_id if timings is not None else None
+
+
+def _incoming_request_id(scope: Scope) -> Optional[str]:
+    """读取请求头中的X-Request-ID，只接受长度合理的可打印ASCII"""
+    for name, value in scope.get("headers", []):
+        if name == b"x-request-id":
+            if 0 < len(value) <= 64 and value.isascii() and value.decode("ascii").isprintable():
+                return value.decode("ascii")
+            return None
+    return None
+
+
+def record_timing(category: str, seconds: float) -> None:
+    """把一段耗时累加到当前请求，不在请求中时忽略"""
+    timings = _current.get()
+    if timings is not None:
+        timings.add(category, seconds)
+
+
+@contextmanager
+def timer(category: str) -> Iterator[None]:
+    """统计代码块耗时并累加到当前请求"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(category, time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """
+    请求上下文和Server-Timing中间件（纯ASGI实现）
+
+    总是为请求建立计时上下文（SQL语句预算、日志关联ID等依赖它）并输出X-Request-ID响应头，
+    SERVER_TIMING_ENABLED控制是否输出Server-Timing响应头；
+    响应头中的total为开始处理到发送响应头的耗时；按SERVER_TIMING_LOG_SAMPLE_RATE采样，
+    以及超过SERVER_TIMING_SLOW_MS的慢请求，在响应结束后输出一行JSON日志。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(scope.get("method", ""), scope.get("path", ""), scope, _incoming_request_id(scope))
+        token = _current.set(timings)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-request-id", timings.request_id.encode("ascii")))
+                if settings.SERVER_TIMING_ENABLED:
+                    headers.append((b"server-timing", timings.to_header().encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            self._log(timings, status_code)
+
+    @staticmethod
+    def _log(timings: RequestTimings, status_code: int) -> None:
+        slow = timings.elapsed() * 1000 >= settings.SERVER_TIMING_SLOW_MS
+        if not slow and random.random() >= settings.SERVER_TIMING_LOG_SAMPLE_RATE:
+            return
+        data = timings.to_dict()
+        data["status"] = status_code
+        data["slow"] = slow
+        logger.info(json.dumps(data, ensure_ascii=False))
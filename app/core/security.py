@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime, timedelta
 from typing import Any, Union, Optional
 
@@ -6,6 +7,8 @@ from passlib.context import CryptContext
 
 from app.core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # 密码上下文，用于哈希和验证
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -25,8 +28,7 @@ def create_access_token(
     to_encode = {"exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
-    # 输出调试信息
-    print(f"[DEBUG] 创建访问令牌: subject={subject}, expires={expire}")
+    logger.debug("创建访问令牌: subject=%s, expires=%s", subject, expire)
     
     return encoded_jwt
 
@@ -0,0 +1,247 @@
+"""
+启动预热与就绪状态
+
+lifespan启动后台预热任务后立即开始接受请求，/ready在预热完成前返回503，
+负载均衡据此在预热完成后才转发流量；/health只表示进程存活。
+
+预热分两个阶段，阶段内的任务在线程中并行执行，每个任务有独立的超时：
+1. ORM映射配置、数据库连接池填充、Redis连接、服务器静态信息采集、参考数据快照
+2. 代码生成和任务统计表结构检查、代码生成模板编译、字典选项、参数、菜单树缓存（依赖阶段1的映射和连接池）
+
+应用导入时不执行这些工作，worker启动后即可开始监听端口，进程回收和扩容时冷启动更快。
+
+必需任务（数据库连接池）失败或超时时不会就绪，按WARMUP_RETRY_INTERVAL重试；
+其余任务失败只记录日志，首次请求时按原来的方式加载。
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class WarmupTask:
+    name: str
+    func: Callable[[], Any]
+    required: bool = False
+    status: str = "pending"  # pending、running、ok、failed、timeout
+    elapsed_ms: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+
+def _configure_mappers() -> int:
+    from sqlalchemy.orm import configure_mappers
+
+    import app.models  # noqa: F401  确保所有模型已导入
+    configure_mappers()
+    return 0
+
+
+def _fill_pools() -> Dict[str, int]:
+    """每个引擎同时借出若干连接再归还，连接池中保留已建立的连接"""
+    from app.db.session import engine, replica_engines
+
+    count = max(1, min(settings.WARMUP_POOL_CONNECTIONS, settings.DB_POOL_SIZE))
+    result = {}
+    for name, db_engine in [("primary", engine)] + [(f"replica{i}", e) for i, e in enumerate(replica_engines)]:
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(db_engine.connect())
+        finally:
+            for conn in connections:
+                conn.close()
+        result[name] = len(connections)
+    return result
+
+
+def _ping_redis() -> bool:
+    from app.core.redis import redis_client
+
+    return bool(redis_client.ping())
+
+
+def _create_tables() -> List[str]:
+    """
+    代码生成和任务执行统计表不在初始化SQL中，不存在时创建
+    统计表由迁移0006_job_stat_tables创建，这里兼容未执行迁移的部署；统计表缺失时任务日志仍正常落库
+    """
+    from app.db.session import engine
+    from app.models.monitor.job_stat import SysJobStatDaily, SysJobStatHourly
+    from app.models.tool.gen import GenTable, GenTableColumn
+
+    tables = [GenTable.__table__, GenTableColumn.__table__, SysJobStatHourly.__table__, SysJobStatDaily.__table__]
+    for table in tables:
+        table.create(engine, checkfirst=True)
+    return [table.name for table in tables]
+
+
+def _collect_server_info() -> str:
+    """采集一次服务器信息，CPU型号、主机名等静态信息只在首次采集时读取"""
+    from app.service.monitor.server import server_service
+
+    return server_service.collect().hostname
+
+
+def _compile_templates() -> int:
+    """加载全部代码生成模板，编译结果保存在Jinja环境的缓存中"""
+    from app.service.tool.gen_service import gen_service
+
+    templates = gen_service.env.list_templates(filter_func=lambda name: name.endswith(".j2"))
+    for name in templates:
+        gen_service.env.get_template(name)
+    return len(templates)
+
+
+def _start_snapshot() -> Optional[int]:
+    from app.db.snapshot import reference_snapshot
+
+    reference_snapshot.start()
+    return reference_snapshot.status()["version"]
+
+
+def _with_session(func: Callable[[Any], Any]) -> Callable[[], Any]:
+    def run() -> Any:
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            return func(db)
+        finally:
+            db.close()
+    return run
+
+
+def _preload_dicts(db: Any) -> int:
+    from app.crud.system.dict import dict_data, dict_type
+
+    types = dict_type.get_enabled_dict_types(db)
+    for item in types:
+        dict_data.get_options_by_dict_type(db, dict_type=item.dict_type)
+    return len(types)
+
+
+def _preload_configs(db: Any) -> int:
+    from app.crud.utils.config import config
+    from app.models.utils.config import SysConfig
+
+    keys = [row[0] for row in db.query(SysConfig.config_key).all()]
+    for key in keys:
+        config.get_config_value_by_key(db, config_key=key)
+    return len(keys)
+
+
+def _preload_menus(db: Any) -> int:
+    from app.crud.system.menu import menu
+
+    return len(menu.get_tree_data(db))
+
+
+class Warmup:
+    """预热任务执行和就绪状态"""
+
+    def __init__(self):
+        self.phases: List[List[WarmupTask]] = [
+            [
+                WarmupTask("mappers", _configure_mappers),
+                WarmupTask("db_pool", _fill_pools, required=True),
+                WarmupTask("redis", _ping_redis),
+                WarmupTask("server_info", _collect_server_info),
+                WarmupTask("snapshot", _start_snapshot),
+            ],
+            [
+                WarmupTask("schema", _create_tables),
+                WarmupTask("templates", _compile_templates),
+                WarmupTask("dict_cache", _with_session(_preload_dicts)),
+                WarmupTask("config_cache", _with_session(_preload_configs)),
+                WarmupTask("menu_cache", _with_session(_preload_menus)),
+            ],
+        ]
+        self.ready = False
+        self.shutting_down = False
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """在事件循环中启动后台预热"""
+        self.started_at = time.time()
+        if not settings.WARMUP_ENABLED:
+            self._finish()
+            return
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """标记为不再就绪并取消未完成的预热"""
+        self.shutting_down = True
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self) -> None:
+        for phase in self.phases:
+            await asyncio.gather(*[self._run_task(task) for task in phase])
+        required = [task for phase in self.phases for task in phase if task.required]
+        while any(task.status != "ok" for task in required):
+            await asyncio.sleep(settings.WARMUP_RETRY_INTERVAL)
+            await asyncio.gather(*[self._run_task(task) for task in required if task.status != "ok"])
+        self._finish()
+
+    async def _run_task(self, task: WarmupTask) -> None:
+        task.status = "running"
+        started = time.perf_counter()
+        try:
+            task.result = await asyncio.wait_for(
+                asyncio.to_thread(task.func), timeout=settings.WARMUP_TASK_TIMEOUT
+            )
+            task.status = "ok"
+            task.error = None
+        except asyncio.TimeoutError:
+            # 线程中的任务无法中断，会在后台继续执行完
+            task.status = "timeout"
+            task.error = f"超过{settings.WARMUP_TASK_TIMEOUT}秒"
+        except Exception as e:
+            task.status = "failed"
+            task.error = str(e)
+        task.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        if task.status == "ok":
+            logger.info(f"预热任务{task.name}完成，耗时{task.elapsed_ms}ms")
+        else:
+            logger.warning(f"预热任务{task.name}{'失败' if task.status == 'failed' else '超时'}: {task.error}")
+
+    def _finish(self) -> None:
+        self.ready = True
+        self.finished_at = time.time()
+        if self.started_at is not None:
+            logger.info(f"预热完成，耗时{(self.finished_at - self.started_at) * 1000:.0f}ms")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready and not self.shutting_down,
+            "shutting_down": self.shutting_down,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "tasks": [
+                {
+                    "name": task.name,
+                    "required": task.required,
+                    "status": task.status,
+                    "elapsed_ms": task.elapsed_ms,
+                    "error": task.error,
+                }
+                for phase in self.phases for task in phase
+            ],
+        }
+
+
+warmup = Warmup()
@@ -1,10 +1,16 @@
-from typing import Any, Dict, Optional, Union
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import func, insert
 from sqlalchemy.orm import Session
 from fastapi.encoders import jsonable_encoder
 
 from app.crud.utils.base import CRUDBase
 from app.models.monitor.job import SysJob, SysJobLog
 from app.schemas.monitor.job import JobCreate, JobUpdate, JobLogCreate
+from app.db.search import search_contains, search_any
+
+logger = logging.getLogger(__name__)
 
 
 class CRUDJob(CRUDBase[SysJob, JobCreate, JobUpdate]):
@@ -56,19 +62,20 @@ class CRUDJob(CRUDBase[SysJob, JobCreate, JobUpdate]):
         page_size: int = 10
     ) -> Dict[str, Any]:
         """搜索任务"""
-        print(f"[DEBUG] CRUDJob.search_by_keyword - 参数: keyword={keyword}, job_name={job_name}, job_group={job_group}, status={status}, page={page}, page_size={page_size}")
+        logger.debug(
+            "CRUDJob.search_by_keyword - 参数: keyword=%s, job_name=%s, job_group=%s, status=%s, page=%s, page_size=%s",
+            keyword, job_name, job_group, status, page, page_size,
+        )
         query = db.query(self.model)
         
         # 搜索条件
         if keyword:
-            query = query.filter(
-                (self.model.job_name.like(f"%{keyword}%")) | 
-                (self.model.job_group.like(f"%{keyword}%")) |
-                (self.model.invoke_target.like(f"%{keyword}%"))
-            )
+            query = query.filter(search_any(
+                db, [self.model.job_name, self.model.job_group, self.model.invoke_target], keyword
+            ))
         
         if job_name:
-            query = query.filter(self.model.job_name.like(f"%{job_name}%"))
+            query = query.filter(search_contains(db, self.model.job_name, job_name))
         
         if job_group:
             query = query.filter(self.model.job_group == job_group)
@@ -78,14 +85,10 @@ class CRUDJob(CRUDBase[SysJob, JobCreate, JobUpdate]):
             
         # 计算总数
         total = query.count()
-        print(f"[DEBUG] CRUDJob.search_by_keyword - 数据总数: {total}")
         
         # 分页
         items = query.order_by(self.model.job_id).offset((page - 1) * page_size).limit(page_size).all()
-        print(f"[DEBUG] CRUDJob.search_by_keyword - 返回数据条数: {len(items)}, 第一条数据类型: {type(items[0]) if items else 'None'}")
-
-        if items and items[0] is not None:
-            print(f"[DEBUG] 第一条任务属性: {items[0].__dict__ if hasattr(items[0], '__dict__') else items[0]}")
+        logger.debug("CRUDJob.search_by_keyword - 数据总数: %s, 返回数据条数: %d", total, len(items))
         
         return {
             "total": total,
@@ -118,6 +121,8 @@ class CRUDJobLog(CRUDBase[SysJobLog, JobLogCreate, Any]):
         job_group: str = None,
         job_id: int = None,
         status: str = None,
+        begin_time: datetime = None,
+        end_time: datetime = None,
         page: int = 1, 
         page_size: int = 10
     ) -> Dict[str, Any]:
@@ -126,7 +131,7 @@ class CRUDJobLog(CRUDBase[SysJobLog, JobLogCreate, Any]):
         
         # 搜索条件
         if job_name:
-            query = query.filter(self.model.job_name.like(f"%{job_name}%"))
+            query = query.filter(search_contains(db, self.model.job_name, job_name))
         
         if job_group:
             query = query.filter(self.model.job_group == job_group)
@@ -137,6 +142,12 @@ class CRUDJobLog(CRUDBase[SysJobLog, JobLogCreate, Any]):
             
         if status:
             query = query.filter(self.model.status == status)
+
+        if begin_time:
+            query = query.filter(self.model.create_time >= begin_time)
+
+        if end_time:
+            query = query.filter(self.model.create_time <= end_time)
             
         # 计算总数
         total = query.count()
@@ -149,9 +160,78 @@ class CRUDJobLog(CRUDBase[SysJobLog, JobLogCreate, Any]):
             "items": items
         }
     
-    def clean(self, db: Session) -> int:
-        """清空任务日志"""
-        result = db.query(self.model).delete(synchronize_session=False)
+    def create_multi(self, db: Session, *, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        多行插入任务日志（不提交事务）
+        :param rows: 日志字典列表，键为数据库列名
+        :param batch_size: 每条INSERT语句包含的最大行数
+        :return: 插入的行数
+        """
+        columns = {c.name for c in self.model.__table__.columns}
+        values = [{k: v for k, v in row.items() if k in columns} for row in rows]
+        for i in range(0, len(values), batch_size):
+            db.execute(insert(self.model).values(values[i:i + batch_size]))
+        return len(values)
+
+    def get_max_id(self, db: Session) -> Optional[int]:
+        """获取当前最大的日志ID"""
+        return db.query(func.max(self.model.job_log_id)).scalar()
+
+    def get_purge_upper_id(
+        self, db: Session, *, before: Optional[datetime] = None, keep_rows: int = 0
+    ) -> Optional[int]:
+        """
+        计算需要清理的日志ID上界（包含）
+        :param before: 早于该时间的日志需要清理
+        :param keep_rows: 最多保留的行数，0表示不限制
+        :return: 日志ID上界，无需清理时返回None
+        """
+        upper_ids = []
+        if before:
+            upper_ids.append(
+                db.query(func.max(self.model.job_log_id))
+                .filter(self.model.create_time < before)
+                .scalar()
+            )
+        if keep_rows > 0:
+            # 按主键倒序跳过需要保留的行，第一条即为超出部分的最大ID
+            upper_ids.append(
+                db.query(self.model.job_log_id)
+                .order_by(self.model.job_log_id.desc())
+                .offset(keep_rows)
+                .limit(1)
+                .scalar()
+            )
+        upper_ids = [i for i in upper_ids if i is not None]
+        return max(upper_ids) if upper_ids else None
+
+    def get_chunk(
+        self, db: Session, *, start_id: int, end_id: int, limit: int, with_rows: bool = False
+    ) -> List[Any]:
+        """
+        按主键顺序获取一批日志
+        :param start_id: 起始ID（包含）
+        :param end_id: 结束ID（包含）
+        :param limit: 最大行数
+        :param with_rows: 是否返回完整记录，否则只返回ID
+        """
+        columns = [self.model] if with_rows else [self.model.job_log_id]
+        query = (
+            db.query(*columns)
+            .filter(self.model.job_log_id >= start_id, self.model.job_log_id <= end_id)
+            .order_by(self.model.job_log_id)
+            .limit(limit)
+        )
+        if with_rows:
+            return query.all()
+        return [row[0] for row in query.all()]
+
+    def delete_range(self, db: Session, *, start_id: int, end_id: int) -> int:
+        """按主键范围删除日志并提交"""
+        result = db.query(self.model).filter(
+            self.model.job_log_id >= start_id,
+            self.model.job_log_id <= end_id
+        ).delete(synchronize_session=False)
         db.commit()
         return result
 
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud.utils.base import CRUDBase
+from app.models.monitor.job_stat import SysJobStatHourly, SysJobStatDaily
+
+
+class CRUDJobStat(CRUDBase[Any, Any, Any]):
+    """任务执行统计CRUD（小时表和日表共用）"""
+
+    def get_bucket(
+        self, db: Session, *, job_name: str, job_group: str, stat_time: datetime, for_update: bool = False
+    ) -> Optional[Any]:
+        """获取指定任务在某个统计周期的记录"""
+        query = db.query(self.model).filter(
+            self.model.job_name == job_name,
+            self.model.job_group == job_group,
+            self.model.stat_time == stat_time
+        )
+        if for_update:
+            query = query.with_for_update()
+        return query.first()
+
+    def get_or_create_bucket(self, db: Session, *, job_name: str, job_group: str, stat_time: datetime) -> Any:
+        """
+        获取并锁定统计记录，不存在时创建（不提交事务）
+        多个进程同时创建同一周期时，唯一索引冲突的一方回滚保存点后重新读取
+        """
+        db_obj = self.get_bucket(db, job_name=job_name, job_group=job_group, stat_time=stat_time, for_update=True)
+        if db_obj:
+            return db_obj
+        try:
+            with db.begin_nested():
+                db_obj = self.model(
+                    job_name=job_name,
+                    job_group=job_group,
+                    stat_time=stat_time,
+                    total_count=0,
+                    success_count=0,
+                    fail_count=0,
+                    timed_count=0,
+                    sum_duration=0,
+                    duration_histogram=""
+                )
+                db.add(db_obj)
+            return db_obj
+        except IntegrityError:
+            return self.get_bucket(db, job_name=job_name, job_group=job_group, stat_time=stat_time, for_update=True)
+
+    def get_range(
+        self,
+        db: Session,
+        *,
+        job_name: Optional[str] = None,
+        job_group: Optional[str] = None,
+        begin_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> List[Any]:
+        """按时间范围获取统计记录"""
+        query = db.query(self.model)
+        if job_name:
+            query = query.filter(self.model.job_name == job_name)
+        if job_group:
+            query = query.filter(self.model.job_group == job_group)
+        if begin_time:
+            query = query.filter(self.model.stat_time >= begin_time)
+        if end_time:
+            query = query.filter(self.model.stat_time <= end_time)
+        return query.order_by(self.model.stat_time, self.model.job_name, self.model.job_group).all()
+
+
+job_stat_hourly = CRUDJobStat(SysJobStatHourly)
+job_stat_daily = CRUDJobStat(SysJobStatDaily)
@@ -0,0 +1,140 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.crud.utils.base import CRUDBase
+from app.models.monitor.login_log import SysLoginLog
+
+
+class CRUDLoginLog(CRUDBase[SysLoginLog, Any, Any]):
+    """登录日志CRUD"""
+
+    def search(
+        self,
+        db: Session,
+        *,
+        user_name: str = None,
+        ipaddr: str = None,
+        status: str = None,
+        begin_time: datetime = None,
+        end_time: datetime = None,
+        page: int = 1,
+        page_size: int = 10
+    ) -> Dict[str, Any]:
+        """
+        搜索登录日志
+        按(login_time)、(status, login_time)、(user_name, login_time)、(ipaddr, login_time)索引筛选和排序
+        """
+        query = db.query(self.model)
+
+        if user_name:
+            query = query.filter(self.model.user_name == user_name)
+
+        if ipaddr:
+            query = query.filter(self.model.ipaddr == ipaddr)
+
+        if status is not None:
+            query = query.filter(self.model.status == status)
+
+        if begin_time:
+            query = query.filter(self.model.login_time >= begin_time)
+
+        if end_time:
+            query = query.filter(self.model.login_time <= end_time)
+
+        total = query.count()
+        items = (
+            query.order_by(self.model.login_time.desc(), self.model.info_id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .all()
+        )
+
+        return {
+            "total": total,
+            "items": items
+        }
+
+    def count_by_status(self, db: Session, *, since: datetime) -> Tuple[int, int]:
+        """
+        统计某时间之后的登录次数和失败次数（Redis不可用时的统计来源）
+        :return: (登录次数, 失败次数)
+        """
+        rows = (
+            db.query(self.model.status, func.count())
+            .filter(self.model.login_time >= since)
+            .group_by(self.model.status)
+            .all()
+        )
+        counts = {status: count for status, count in rows}
+        return sum(counts.values()), counts.get("1", 0)
+
+    def top_failures(self, db: Session, *, column: str, since: datetime, limit: int = 10) -> List[Tuple[str, int]]:
+        """统计某时间之后失败次数最多的IP或账号"""
+        field = getattr(self.model, column)
+        return [
+            (key, count) for key, count in
+            db.query(field, func.count().label("failures"))
+            .filter(self.model.status == "1", self.model.login_time >= since)
+            .group_by(field)
+            .order_by(func.count().desc())
+            .limit(limit)
+            .all()
+        ]
+
+    def create_multi(self, db: Session, *, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        多行插入登录日志（不提交事务）
+        :param rows: 日志字典列表，键为数据库列名
+        :param batch_size: 每条INSERT语句包含的最大行数
+        :return: 插入的行数
+        """
+        columns = {c.name for c in self.model.__table__.columns}
+        values = [{k: v for k, v in row.items() if k in columns} for row in rows]
+        for i in range(0, len(values), batch_size):
+            db.execute(insert(self.model).values(values[i:i + batch_size]))
+        return len(values)
+
+    def delete_by_ids(self, db: Session, *, ids: List[int]) -> int:
+        """按ID删除登录日志并提交"""
+        result = db.query(self.model).filter(self.model.info_id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        return result
+
+    def clean(self, db: Session, *, before: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        """
+        清理登录日志（按主键范围分批删除并提交，避免长时间锁表）
+        :param before: 只删除早于该时间的日志，为空时全部删除
+        """
+        query = db.query(func.max(self.model.info_id))
+        if before:
+            query = query.filter(self.model.login_time < before)
+        upper_id = query.scalar()
+        if upper_id is None:
+            return 0
+        total = 0
+        start_id = 0
+        while start_id <= upper_id:
+            ids = [
+                row[0] for row in
+                db.query(self.model.info_id)
+                .filter(self.model.info_id >= start_id, self.model.info_id <= upper_id)
+                .order_by(self.model.info_id)
+                .limit(batch_size)
+                .all()
+            ]
+            if not ids:
+                break
+            delete_query = db.query(self.model).filter(
+                self.model.info_id >= ids[0], self.model.info_id <= ids[-1]
+            )
+            if before:
+                delete_query = delete_query.filter(self.model.login_time < before)
+            total += delete_query.delete(synchronize_session=False)
+            db.commit()
+            start_id = ids[-1] + 1
+        return total
+
+
+login_log = CRUDLoginLog(SysLoginLog)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from app.models.monitor.online import SysUserOnline
 from app.schemas.monitor.online import OnlineUserCreate
+from app.db.search import search_contains
 
 
 class CRUDOnlineUser:
@@ -26,10 +27,10 @@ class CRUDOnlineUser:
         
         # 过滤条件
         if user_name:
-            query = query.filter(SysUserOnline.user_name.like(f"%{user_name}%"))
+            query = query.filter(search_contains(db, SysUserOnline.user_name, user_name))
         
         if ipaddr:
-            query = query.filter(SysUserOnline.ipaddr.like(f"%{ipaddr}%"))
+            query = query.filter(search_contains(db, SysUserOnline.ipaddr, ipaddr))
         
         # 计算总数
         total = query.count()
@@ -0,0 +1,119 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.crud.utils.base import CRUDBase
+from app.models.monitor.oper_log import SysOperLog
+from app.db.search import search_contains
+
+
+class CRUDOperLog(CRUDBase[SysOperLog, Any, Any]):
+    """操作日志CRUD"""
+
+    def search(
+        self,
+        db: Session,
+        *,
+        title: str = None,
+        oper_name: str = None,
+        business_type: int = None,
+        status: int = None,
+        begin_time: datetime = None,
+        end_time: datetime = None,
+        page: int = 1,
+        page_size: int = 10
+    ) -> Dict[str, Any]:
+        """
+        搜索操作日志
+        按(oper_time)、(status, oper_time)、(oper_name, oper_time)索引筛选和排序，
+        InnoDB二级索引隐含主键，按(oper_time, oper_id)倒序分页不需要额外排序
+        """
+        query = db.query(self.model)
+
+        if title:
+            query = query.filter(search_contains(db, self.model.title, title))
+
+        if oper_name:
+            query = query.filter(self.model.oper_name == oper_name)
+
+        if business_type is not None:
+            query = query.filter(self.model.business_type == business_type)
+
+        if status is not None:
+            query = query.filter(self.model.status == status)
+
+        if begin_time:
+            query = query.filter(self.model.oper_time >= begin_time)
+
+        if end_time:
+            query = query.filter(self.model.oper_time <= end_time)
+
+        total = query.count()
+        items = (
+            query.order_by(self.model.oper_time.desc(), self.model.oper_id.desc())
+            .offset((page - 1) * page_size)
+            .limit(page_size)
+            .all()
+        )
+
+        return {
+            "total": total,
+            "items": items
+        }
+
+    def create_multi(self, db: Session, *, rows: List[Dict[str, Any]], batch_size: int = 500) -> int:
+        """
+        多行插入操作日志（不提交事务）
+        :param rows: 日志字典列表，键为数据库列名
+        :param batch_size: 每条INSERT语句包含的最大行数
+        :return: 插入的行数
+        """
+        columns = {c.name for c in self.model.__table__.columns}
+        values = [{k: v for k, v in row.items() if k in columns} for row in rows]
+        for i in range(0, len(values), batch_size):
+            db.execute(insert(self.model).values(values[i:i + batch_size]))
+        return len(values)
+
+    def delete_by_ids(self, db: Session, *, ids: List[int]) -> int:
+        """按ID删除操作日志并提交"""
+        result = db.query(self.model).filter(self.model.oper_id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        return result
+
+    def clean(self, db: Session, *, before: Optional[datetime] = None, batch_size: int = 1000) -> int:
+        """
+        清理操作日志（按主键范围分批删除并提交，避免长时间锁表）
+        :param before: 只删除早于该时间的日志，为空时全部删除
+        """
+        query = db.query(func.max(self.model.oper_id))
+        if before:
+            query = query.filter(self.model.oper_time < before)
+        upper_id = query.scalar()
+        if upper_id is None:
+            return 0
+        total = 0
+        start_id = 0
+        while start_id <= upper_id:
+            ids = [
+                row[0] for row in
+                db.query(self.model.oper_id)
+                .filter(self.model.oper_id >= start_id, self.model.oper_id <= upper_id)
+                .order_by(self.model.oper_id)
+                .limit(batch_size)
+                .all()
+            ]
+            if not ids:
+                break
+            delete_query = db.query(self.model).filter(
+                self.model.oper_id >= ids[0], self.model.oper_id <= ids[-1]
+            )
+            if before:
+                delete_query = delete_query.filter(self.model.oper_time < before)
+            total += delete_query.delete(synchronize_session=False)
+            db.commit()
+            start_id = ids[-1] + 1
+        return total
+
+
+oper_log = CRUDOperLog(SysOperLog)
@@ -5,6 +5,7 @@ from app.crud.utils.base import CRUDBase
 from app.models.system.dept import SysDept
 from app.schemas.system.dept import DeptCreate, DeptUpdate, DeptTree
 from app.models.system.user import SysUser  # 导入用户模型
+from app.db.search import search_contains
 
 
 class CRUDDept(CRUDBase[SysDept, DeptCreate, DeptUpdate]):
@@ -20,7 +21,7 @@ class CRUDDept(CRUDBase[SysDept, DeptCreate, DeptUpdate]):
         
         # 应用过滤条件
         if dept_name:
-            query = query.filter(self.model.dept_name.like(f"%{dept_name}%"))
+            query = query.filter(search_contains(db, self.model.dept_name, dept_name))
         if status:
             query = query.filter(self.model.status == status)
         
@@ -5,6 +5,9 @@ from sqlalchemy import func, or_, and_
 from app.crud.utils.base import CRUDBase
 from app.models.system.dict import SysDictType, SysDictData
 from app.schemas.system.dict import DictTypeCreate, DictTypeUpdate, DictDataCreate, DictDataUpdate
+from app.db.search import search_contains
+from app.core.cache import cached
+from app.db.snapshot import reference_snapshot
 
 
 class CRUDDictType(CRUDBase[SysDictType, DictTypeCreate, DictTypeUpdate]):
@@ -37,9 +40,9 @@ class CRUDDictType(CRUDBase[SysDictType, DictTypeCreate, DictTypeUpdate]):
         
         # 应用过滤条件
         if dict_name:
-            query = query.filter(self.model.dict_name.like(f"%{dict_name}%"))
+            query = query.filter(search_contains(db, self.model.dict_name, dict_name))
         if dict_type:
-            query = query.filter(self.model.dict_type.like(f"%{dict_type}%"))
+            query = query.filter(search_contains(db, self.model.dict_type, dict_type))
         if status:
             query = query.filter(self.model.status == status)
         
@@ -178,7 +181,7 @@ class CRUDDictData(CRUDBase[SysDictData, DictDataCreate, DictDataUpdate]):
         if dict_type:
             query = query.filter(self.model.dict_type == dict_type)
         if dict_label:
-            query = query.filter(self.model.dict_label.like(f"%{dict_label}%"))
+            query = query.filter(search_contains(db, self.model.dict_label, dict_label))
         if status:
             query = query.filter(self.model.status == status)
         
@@ -255,6 +258,27 @@ class CRUDDictData(CRUDBase[SysDictData, DictDataCreate, DictDataUpdate]):
     def get_options_by_dict_type(self, db: Session, *, dict_type: str) -> List[Dict[str, Any]]:
         """
         获取指定字典类型的选项列表(用于下拉选择)
+        优先读取参考数据快照，快照不可用时查询缓存
+        """
+        snapshot = reference_snapshot.table("sys_dict_data")
+        if snapshot is None:
+            return self._load_options_by_dict_type(db, dict_type=dict_type)
+        rows = [row for row in snapshot.find("dict_type", dict_type) if row["status"] == "0"]
+        rows.sort(key=lambda row: row["dict_sort"] if row["dict_sort"] is not None else 0)
+        return [
+            {
+                "value": row["dict_value"],
+                "label": row["dict_label"],
+                "class": row["list_class"],
+                "is_default": row["is_default"]
+            }
+            for row in rows
+        ]
+    
+    @cached("dict", ttl=3600, stale_ttl=600, tables=("sys_dict_data", "sys_dict_type"))
+    def _load_options_by_dict_type(self, db: Session, *, dict_type: str) -> List[Dict[str, Any]]:
+        """
+        从数据库获取选项列表，字典数据或类型提交修改后缓存自动失效
         """
         dict_data_list = self.get_by_dict_type(db=db, dict_type=dict_type)
         
@@ -1,12 +1,17 @@
 from typing import Dict, List, Optional, Union, Any
 from sqlalchemy.orm import Session
-import traceback
+import logging
 
 from app.crud.utils.base import CRUDBase
 from app.models.system.menu import SysMenu
 from app.models.utils.relation import SysRoleMenu, SysUserRole
 from app.models.system.user import SysUser
 from app.schemas.system.menu import MenuCreate, MenuUpdate, MenuTree
+from app.db.search import search_contains
+from app.core.cache import cached
+from app.core.log import sampled
+
+logger = logging.getLogger(__name__)
 
 
 class CRUDMenu(CRUDBase[SysMenu, MenuCreate, MenuUpdate]):
@@ -22,7 +27,7 @@ class CRUDMenu(CRUDBase[SysMenu, MenuCreate, MenuUpdate]):
         
         # 应用过滤条件
         if menu_name:
-            query = query.filter(self.model.menu_name.like(f"%{menu_name}%"))
+            query = query.filter(search_contains(db, self.model.menu_name, menu_name))
         if status:
             query = query.filter(self.model.status == status)
         
@@ -44,6 +49,14 @@ class CRUDMenu(CRUDBase[SysMenu, MenuCreate, MenuUpdate]):
         # 构建菜单树
         return self._build_menu_tree(menus)
     
+    @cached("menu", ttl=3600, stale_ttl=600, tables=("sys_menu",))
+    def get_tree_data(self, db: Session, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        获取菜单树（缓存，菜单提交修改后自动失效）
+        返回可JSON序列化的字典，供接口直接作为MenuTree列表返回
+        """
+        return [node.model_dump(mode="json") for node in self.get_tree(db, status=status)]
+    
     def _build_menu_tree(self, menus: List[SysMenu], parent_id: int = 0) -> List[MenuTree]:
         """
         递归构建菜单树
@@ -71,10 +84,11 @@ class CRUDMenu(CRUDBase[SysMenu, MenuCreate, MenuUpdate]):
                         "remark": menu.remark
                     }
                     
-                    # 打印调试信息
-                    print(f"[DEBUG] 处理菜单 ID: {menu.menu_id}, 名称: {menu.menu_name}")
-                    print(f"[DEBUG] is_frame 类型: {type(menu.is_frame)}, 值: {menu.is_frame}")
-                    print(f"[DEBUG] is_cache 类型: {type(menu.is_cache)}, 值: {menu.is_cache}")
+                    if sampled(logger, "menu.tree_node"):
+                        logger.debug(
+                            "处理菜单 ID: %s, 名称: %s, is_frame: %r, is_cache: %r",
+                            menu.menu_id, menu.menu_name, menu.is_frame, menu.is_cache,
+                        )
                     
                     # 使用model_validate处理字典
                     menu_tree = MenuTree.model_validate(menu_dict)
@@ -84,8 +98,7 @@ class CRUDMenu(CRUDBase[SysMenu, MenuCreate, MenuUpdate]):
                     menu_tree.children = children
                     tree.append(menu_tree)
                 except Exception as e:
-                    print(f"[ERROR] 构建菜单树错误, 菜单ID: {menu.menu_id}, 错误: {str(e)}")
-                    print(f"[ERROR] 详细错误: {traceback.format_exc()}")
+                    logger.error("构建菜单树错误, 菜单ID: %s, 错误: %s", menu.menu_id, e, exc_info=True)
                     # 记录问题，但不阻止其他菜单的处理
                     continue
         return tree
@@ -206,10 +219,9 @@ class CRUDMenu(CRUDBase[SysMenu, MenuCreate, MenuUpdate]):
         """
         获取角色关联的菜单ID列表
         """
-        print(f"[DEBUG] 正在菜单模块中查询角色菜单IDs: role_id={role_id}")
         result = db.execute(SysRoleMenu.select().where(SysRoleMenu.c.role_id == role_id))
         menu_ids = [row.menu_id for row in result]
-        print(f"[DEBUG] 菜单模块找到的菜单IDs: {menu_ids}")
+        logger.debug("角色 %s 的菜单IDs: %s", role_id, menu_ids)
         return menu_ids
 
 
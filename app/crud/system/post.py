@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.crud.utils.base import CRUDBase
 from app.models.system.post import SysPost
 from app.schemas.system.post import PostCreate, PostUpdate
+from app.db.search import search_contains
 
 
 class CRUDPost(CRUDBase[SysPost, PostCreate, PostUpdate]):
@@ -38,9 +39,9 @@ class CRUDPost(CRUDBase[SysPost, PostCreate, PostUpdate]):
         
         # 应用过滤条件
         if post_name:
-            query = query.filter(self.model.post_name.like(f"%{post_name}%"))
+            query = query.filter(search_contains(db, self.model.post_name, post_name))
         if post_code:
-            query = query.filter(self.model.post_code.like(f"%{post_code}%"))
+            query = query.filter(search_contains(db, self.model.post_code, post_code))
         if status:
             query = query.filter(self.model.status == status)
         
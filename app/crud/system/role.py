@@ -1,3 +1,4 @@
+import logging
 from typing import Dict, List, Optional, Union, Tuple, Any
 from sqlalchemy.orm import Session
 
@@ -5,6 +6,9 @@ from app.crud.utils.base import CRUDBase
 from app.models.system.role import SysRole
 from app.models.utils.relation import SysRoleMenu, SysUserRole
 from app.schemas.system.role import RoleCreate, RoleUpdate
+from app.db.search import search_contains
+
+logger = logging.getLogger(__name__)
 
 
 class CRUDRole(CRUDBase[SysRole, RoleCreate, RoleUpdate]):
@@ -37,27 +41,20 @@ class CRUDRole(CRUDBase[SysRole, RoleCreate, RoleUpdate]):
         """
         query = db.query(self.model)
         
-        # 打印调试信息
-        print(f"查询角色列表参数: skip={skip}, limit={limit}, role_name={role_name}, role_key={role_key}, status={status}")
-        
         # 应用过滤条件
         if role_name:
-            query = query.filter(self.model.role_name.like(f"%{role_name}%"))
+            query = query.filter(search_contains(db, self.model.role_name, role_name))
         if role_key:
-            query = query.filter(self.model.role_key.like(f"%{role_key}%"))
+            query = query.filter(search_contains(db, self.model.role_key, role_key))
         if status:
             query = query.filter(self.model.status == status)
         
         # 计算总数
         total = query.count()
-        print(f"查询到的角色总数: {total}")
         
         # 应用分页并返回数据
         roles = query.order_by(self.model.role_sort).offset(skip).limit(limit).all()
-        
-        # 打印查询结果
-        role_info = [f"ID:{role.role_id}, 名称:{role.role_name}" for role in roles]
-        print(f"查询到的角色列表: {role_info}")
+        logger.debug("查询到的角色: %s", [role.role_id for role in roles])
         
         return roles, total
     
@@ -121,11 +118,10 @@ class CRUDRole(CRUDBase[SysRole, RoleCreate, RoleUpdate]):
         """
         获取角色关联的菜单ID列表
         """
-        print(f"[DEBUG] 获取角色菜单IDs: role_id={role_id}")
         # 使用Table对象查询
         result = db.execute(SysRoleMenu.select().where(SysRoleMenu.c.role_id == role_id))
         menu_ids = [row.menu_id for row in result]
-        print(f"[DEBUG] 找到的菜单IDs: {menu_ids}")
+        logger.debug("角色 %s 的菜单IDs: %s", role_id, menu_ids)
         return menu_ids
     
     def set_role_menus(self, db: Session, *, role_id: int, menu_ids: List[int]) -> None:
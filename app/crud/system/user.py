@@ -8,6 +8,7 @@ from app.models.system.role import SysRole
 from app.models.system.post import SysPost
 from app.schemas.system.user import UserCreate, UserUpdate
 from app.utils.password import get_password_hash, verify_password
+from app.core.cache import cached
 
 
 class CRUDUser(CRUDBase[SysUser, UserCreate, UserUpdate]):
@@ -136,9 +137,14 @@ class CRUDUser(CRUDBase[SysUser, UserCreate, UserUpdate]):
         """
         return user.del_flag != "0"
     
+    @cached(
+        "perms", ttl=600,
+        tables=("sys_role", "sys_menu", "sys_role_menu", "sys_user_role"),
+        key_func=lambda self, user: user.user_id,
+    )
     def get_user_permissions(self, user: SysUser) -> List[str]:
         """
-        获取用户权限集合
+        获取用户权限集合（按用户ID缓存，角色、菜单及其关联提交修改后自动失效）
         :param user: 用户对象
         :return: 权限列表
         """
@@ -8,6 +8,7 @@ from app.db.session import engine
 from app.models.tool.gen import GenTable, GenTableColumn
 from app.schemas.tool.gen import GenTableCreate, GenTableUpdate, GenTableColumnCreate, GenTableColumnUpdate, TableQueryParams
 from app.utils.db_utils import camel_case, get_table_info
+from app.db.search import search_contains
 
 
 class CRUDGenTable:
@@ -25,9 +26,9 @@ class CRUDGenTable:
         """获取表列表"""
         filters = []
         if query.table_name:
-            filters.append(GenTable.table_name.like(f"%{query.table_name}%"))
+            filters.append(search_contains(db, GenTable.table_name, query.table_name))
         if query.table_comment:
-            filters.append(GenTable.table_comment.like(f"%{query.table_comment}%"))
+            filters.append(search_contains(db, GenTable.table_comment, query.table_comment))
         if query.begin_time and query.end_time:
             filters.append(GenTable.create_time.between(query.begin_time, query.end_time))
         
@@ -40,9 +41,9 @@ class CRUDGenTable:
         """获取表总数"""
         filters = []
         if query.table_name:
-            filters.append(GenTable.table_name.like(f"%{query.table_name}%"))
+            filters.append(search_contains(db, GenTable.table_name, query.table_name))
         if query.table_comment:
-            filters.append(GenTable.table_comment.like(f"%{query.table_comment}%"))
+            filters.append(search_contains(db, GenTable.table_comment, query.table_comment))
         if query.begin_time and query.end_time:
             filters.append(GenTable.create_time.between(query.begin_time, query.end_time))
         
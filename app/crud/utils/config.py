@@ -4,6 +4,9 @@ from sqlalchemy.orm import Session
 from app.crud.utils.base import CRUDBase
 from app.models.utils.config import SysConfig
 from app.schemas.utils.config import ConfigCreate, ConfigUpdate
+from app.db.search import search_contains, search_any
+from app.core.cache import cached
+from app.db.snapshot import reference_snapshot
 
 
 class CRUDConfig(CRUDBase[SysConfig, ConfigCreate, ConfigUpdate]):
@@ -64,7 +67,16 @@ class CRUDConfig(CRUDBase[SysConfig, ConfigCreate, ConfigUpdate]):
         return db.query(self.model).filter(self.model.config_key.in_(config_keys)).all()
     
     def get_config_value_by_key(self, db: Session, *, config_key: str) -> Optional[str]:
-        """通过键名获取配置值"""
+        """通过键名获取配置值（优先读取参考数据快照，快照不可用时查询缓存）"""
+        snapshot = reference_snapshot.table("sys_config")
+        if snapshot is not None:
+            row = snapshot.find_one("config_key", config_key)
+            return row["config_value"] if row else None
+        return self._load_config_value(db, config_key=config_key)
+    
+    @cached("config", ttl=3600, stale_ttl=600, tables=("sys_config",))
+    def _load_config_value(self, db: Session, *, config_key: str) -> Optional[str]:
+        """从数据库获取配置值（缓存，参数提交修改后自动失效）"""
         config = self.get_by_key(db, config_key=config_key)
         return config.config_value if config else None
     
@@ -83,10 +95,10 @@ class CRUDConfig(CRUDBase[SysConfig, ConfigCreate, ConfigUpdate]):
         
         # 应用过滤条件
         if config_name:
-            query = query.filter(self.model.config_name.like(f"%{config_name}%"))
+            query = query.filter(search_contains(db, self.model.config_name, config_name))
         
         if config_key:
-            query = query.filter(self.model.config_key.like(f"%{config_key}%"))
+            query = query.filter(search_contains(db, self.model.config_key, config_key))
             
         if config_type:
             query = query.filter(self.model.config_type == config_type)
@@ -115,17 +127,15 @@ class CRUDConfig(CRUDBase[SysConfig, ConfigCreate, ConfigUpdate]):
         
         # 搜索条件
         if keyword:
-            query = query.filter(
-                (self.model.config_name.like(f"%{keyword}%")) | 
-                (self.model.config_key.like(f"%{keyword}%")) |
-                (self.model.config_value.like(f"%{keyword}%"))
-            )
+            query = query.filter(search_any(
+                db, [self.model.config_name, self.model.config_key, self.model.config_value], keyword
+            ))
         
         if config_name:
-            query = query.filter(self.model.config_name.like(f"%{config_name}%"))
+            query = query.filter(search_contains(db, self.model.config_name, config_name))
         
         if config_key:
-            query = query.filter(self.model.config_key.like(f"%{config_key}%"))
+            query = query.filter(search_contains(db, self.model.config_key, config_key))
             
         if config_type:
             query = query.filter(self.model.config_type == config_type)
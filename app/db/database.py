@@ -1,27 +1,2 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-
-from app.core.config import settings
-
-# 创建连接引擎
-engine = create_engine(
-    settings.DATABASE_URI,
-    echo=False,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-)
-
-# 创建会话工厂
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-# 创建模型基类
-Base = declarative_base()
-
-# 获取数据库会话
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close() 
\ No newline at end of file
+# 兼容旧的导入路径，引擎和会话统一由app.db.session创建
+from app.db.session import Base, SessionLocal, engine, get_db  # noqa
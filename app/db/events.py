@@ -0,0 +1,33 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.request_context import record_timing
+from app.db.sql_monitor import sql_monitor
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+    # 超过语句预算时在执行前抛出异常，开始时间由handle_error弹出
+    sql_monitor.check_budget()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    duration = time.perf_counter() - started
+    record_timing("db", duration)
+    sql_monitor.record(statement, duration)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """注册SQL执行事件，把每条语句的耗时累加到当前请求并交给SQL监控汇总"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
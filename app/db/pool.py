@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Any, Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.config import settings
+from app.core.metrics import DB_POOL_CHECKED_OUT, DB_POOL_OVERFLOW, DB_POOL_WAIT
+from app.core.request_context import current_timings
+
+
+class InstrumentedQueuePool(QueuePool):
+    """记录获取连接等待时间的连接池"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+
+class PoolCheckoutTracker:
+    """
+    记录每个已借出连接的借出时间、所属路由和线程，用于排查未归还的会话
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # 引擎名称 -> {连接记录ID: 借出信息}
+        self._checkouts: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self._engines: Dict[str, Engine] = {}
+
+    def register(self, name: str, engine: Engine) -> None:
+        """注册引擎，并通过连接池事件更新指标和借出记录"""
+        pool = engine.pool
+        self._engines[name] = engine
+        self._checkouts[name] = {}
+
+        def _update_gauges() -> None:
+            if isinstance(pool, QueuePool):
+                DB_POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+                DB_POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+            timings = current_timings()
+            with self._lock:
+                self._checkouts[name][id(connection_record)] = {
+                    "since": time.time(),
+                    "route": f"{timings.method} {timings.route}" if timings is not None else None,
+                    "thread": threading.current_thread().name,
+                }
+            _update_gauges()
+
+        def _on_checkin(dbapi_connection, connection_record) -> None:
+            with self._lock:
+                self._checkouts[name].pop(id(connection_record), None)
+            _update_gauges()
+
+        event.listen(engine, "checkout", _on_checkout)
+        event.listen(engine, "checkin", _on_checkin)
+
+    def status(self, leak_seconds: float) -> List[Dict[str, Any]]:
+        """
+        获取各连接池状态和已借出连接
+        :param leak_seconds: 借出超过该时长的连接标记为疑似泄漏
+        """
+        now = time.time()
+        result = []
+        for name, engine in self._engines.items():
+            pool = engine.pool
+            with self._lock:
+                checkouts = list(self._checkouts[name].values())
+            connections = sorted(
+                (
+                    {
+                        "route": item["route"],
+                        "thread": item["thread"],
+                        "hold_seconds": round(now - item["since"], 3),
+                        "suspected_leak": now - item["since"] >= leak_seconds,
+                    }
+                    for item in checkouts
+                ),
+                key=lambda c: c["hold_seconds"],
+                reverse=True,
+            )
+            info: Dict[str, Any] = {"engine": name, "status": pool.status(), "connections": connections}
+            if isinstance(pool, QueuePool):
+                info.update({
+                    "size": pool.size(),
+                    # 所有引擎都按DB_MAX_OVERFLOW创建（见app/db/session.py）
+                    "max_overflow": settings.DB_MAX_OVERFLOW,
+                    "timeout": pool.timeout(),
+                    "checked_in": pool.checkedin(),
+                    "checked_out": pool.checkedout(),
+                    "overflow": max(pool.overflow(), 0),
+                })
+            result.append(info)
+        return result
+
+
+pool_tracker = PoolCheckoutTracker()
@@ -1,27 +1,5 @@
-import redis
-from app.core.config import settings
-
-# Redis客户端连接池
-redis_client = redis.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=settings.REDIS_DB,
-    password=settings.REDIS_PASSWORD or None,
-    decode_responses=True  # 自动解码响应
-)
-
-def get_redis():
-    """获取Redis客户端实例"""
-    try:
-        # 测试连接是否有效
-        redis_client.ping()
-        return redis_client
-    except redis.ConnectionError:
-        # 连接失败则重新连接
-        return redis.Redis(
-            host=settings.REDIS_HOST,
-            port=settings.REDIS_PORT,
-            db=settings.REDIS_DB,
-            password=settings.REDIS_PASSWORD or None,
-            decode_responses=True
-        ) 
\ No newline at end of file
+"""
+兼容旧的导入路径，Redis客户端统一由app.core.redis提供（共用连接池和熔断器）
+注意：统一客户端不自动解码响应，返回值为bytes
+"""
+from app.core.redis import get_redis_client as get_redis, redis_client  # noqa
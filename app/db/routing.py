@@ -0,0 +1,240 @@
+"""
+读写分离
+
+RoutingSession按语句决定使用主库还是从库：
+- 写语句（INSERT/UPDATE/DELETE）、flush、SELECT ... FOR UPDATE走主库，之后同一会话的所有语句都走主库
+- 请求写入过数据后，中间件下发Cookie，在DB_STICKY_SECONDS内该客户端的读取也走主库（读自己的写）
+- primary_reads()上下文中的读取都走主库：缓存加载的结果会被所有请求共享，不能读到落后的从库
+- 后台线程定期检查从库延迟，延迟超过DB_REPLICA_MAX_LAG或检查失败的从库不参与路由，全部不可用时读取回到主库
+- 未配置DATABASE_REPLICA_URLS时与普通Session完全一致
+
+本地验证可以用两个SQLite文件代替主从库：
+    DATABASE_URL=sqlite:///./primary.db
+    DATABASE_REPLICA_URLS=["sqlite:///./replica.db"]
+SQLite没有复制延迟，延迟检查总是返回0。
+"""
+import itertools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import Delete, Insert, Update, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 当前请求的路由状态：primary_until为Cookie中的粘滞截止时间，wrote表示本请求写入过数据
+_request_state: ContextVar[Optional[Dict[str, Any]]] = ContextVar("db_routing_state", default=None)
+# 为True时当前上下文中的读取都走主库
+_primary_reads: ContextVar[bool] = ContextVar("db_primary_reads", default=False)
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """
+    上下文中所有会话的读取都走主库，不影响上下文结束后的路由
+    用于结果会被共享的读取（缓存加载、内存索引构建）：提交后立即失效重新加载时，
+    从库可能还没有这次写入，旧数据会在整个TTL内被所有请求读到
+    """
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+class ReplicaRouter:
+    """从库选择和延迟检查"""
+
+    def __init__(self, replicas: List[Engine]):
+        self.replicas = replicas
+        self._healthy: List[Engine] = list(replicas)
+        self._lags: Dict[str, Optional[float]] = {}
+        self._counter = itertools.count()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def choose(self) -> Optional[Engine]:
+        """轮询选择一个可用从库，没有可用从库时返回None"""
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def start(self) -> None:
+        """启动从库延迟检查线程"""
+        if not self.replicas or self._thread is not None:
+            return
+        self._stop_event.clear()
+        self.check()
+        self._thread = threading.Thread(target=self._run, name="db-replica-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止从库延迟检查线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(settings.DB_REPLICA_LAG_CHECK_INTERVAL):
+            self.check()
+
+    def check(self) -> None:
+        """检查所有从库的复制延迟并更新可用列表"""
+        healthy = []
+        for replica in self.replicas:
+            lag = self._measure_lag(replica)
+            self._lags[replica.url.render_as_string(hide_password=True)] = lag
+            if lag is not None and lag <= settings.DB_REPLICA_MAX_LAG:
+                healthy.append(replica)
+        if len(healthy) != len(self._healthy):
+            logger.warning(f"可用从库数量变化: {len(self._healthy)} -> {len(healthy)}")
+        self._healthy = healthy
+
+    @staticmethod
+    def _measure_lag(replica: Engine) -> Optional[float]:
+        """
+        获取从库复制延迟（秒），无法获取时返回None
+        """
+        try:
+            with replica.connect() as conn:
+                if replica.dialect.name != "mysql":
+                    conn.execute(text("SELECT 1"))
+                    return 0.0
+                try:
+                    row = conn.execute(text("SHOW REPLICA STATUS")).mappings().first()
+                    key = "Seconds_Behind_Source"
+                except Exception:
+                    # MySQL 8.0.22之前的版本
+                    row = conn.execute(text("SHOW SLAVE STATUS")).mappings().first()
+                    key = "Seconds_Behind_Master"
+                if row is None or row.get(key) is None:
+                    return None
+                return float(row[key])
+        except Exception as e:
+            logger.warning(f"检查从库延迟失败 {replica.url.render_as_string(hide_password=True)}: {e}")
+            return None
+
+    def status(self) -> Dict[str, Any]:
+        """从库状态"""
+        healthy = {id(r) for r in self._healthy}
+        return {
+            "replicas": [
+                {
+                    "url": r.url.render_as_string(hide_password=True),
+                    "lag": self._lags.get(r.url.render_as_string(hide_password=True)),
+                    "healthy": id(r) in healthy,
+                }
+                for r in self.replicas
+            ],
+            "max_lag": settings.DB_REPLICA_MAX_LAG,
+            "sticky_seconds": settings.DB_STICKY_SECONDS,
+        }
+
+
+class RoutingSession(Session):
+    """按语句类型在主库和从库之间路由的会话"""
+
+    def __init__(self, *args: Any, router: Optional[ReplicaRouter] = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.router = router
+        self.use_primary = False
+        # 当前事务中是否执行过写语句，提交或回滚后清除
+        self.uncommitted_writes = False
+
+    def get_bind(self, mapper: Any = None, clause: Any = None, **kwargs: Any) -> Any:
+        primary = super().get_bind(mapper=mapper, clause=clause, **kwargs)
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)) or self._is_locking_read(clause):
+            self._mark_write()
+            return primary
+        if self.router is None or not self.router.replicas:
+            return primary
+        if self.use_primary or _primary_reads.get() or self._sticky():
+            return primary
+        return self.router.choose() or primary
+
+    def _mark_write(self) -> None:
+        self.uncommitted_writes = True
+        if self.router is None or not self.router.replicas:
+            return
+        # 同一会话后续的读取也必须看到刚写入的数据
+        self.use_primary = True
+        state = _request_state.get()
+        if state is not None:
+            state["wrote"] = True
+
+    @staticmethod
+    def _is_locking_read(clause: Any) -> bool:
+        return getattr(clause, "_for_update_arg", None) is not None
+
+    @staticmethod
+    def _sticky() -> bool:
+        state = _request_state.get()
+        if state is None:
+            return False
+        return state["wrote"] or state["primary_until"] > time.time()
+
+
+@event.listens_for(RoutingSession, "after_commit")
+@event.listens_for(RoutingSession, "after_rollback")
+def _clear_uncommitted_writes(session: RoutingSession) -> None:
+    session.uncommitted_writes = False
+
+
+class ReadYourWritesMiddleware:
+    """
+    读自己的写中间件（纯ASGI实现）
+
+    请求写入过数据时下发Cookie记录粘滞截止时间，截止前该客户端的读请求都走主库。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.cookie_name = settings.DB_STICKY_COOKIE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = {"wrote": False, "primary_until": self._read_cookie(scope)}
+        token = _request_state.set(state)
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and state["wrote"]:
+                until = time.time() + settings.DB_STICKY_SECONDS
+                cookie = (
+                    f"{self.cookie_name}={until:.3f}; Max-Age={int(settings.DB_STICKY_SECONDS) + 1}; "
+                    f"Path=/; HttpOnly; SameSite=Lax"
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie.encode("latin-1")))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_state.reset(token)
+
+    def _read_cookie(self, scope: Scope) -> float:
+        for name, value in scope.get("headers", []):
+            if name != b"cookie":
+                continue
+            for part in value.decode("latin-1").split(";"):
+                key, _, raw = part.strip().partition("=")
+                if key == self.cookie_name:
+                    try:
+                        return float(raw)
+                    except ValueError:
+                        return 0.0
+        return 0.0
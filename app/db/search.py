@@ -0,0 +1,337 @@
+"""
+子串搜索
+
+列表筛选中的模糊查询统一通过search_contains/search_any生成过滤条件，按数据库能力选择后端：
+- MySQL：列上有ngram解析器的FULLTEXT索引时，用MATCH ... AGAINST按短语缩小候选集；
+  ngram解析器会丢弃包含停用词的词元（默认停用词表含a、i等单字母），搜索词的某个ngram含停用词时
+  短语查询会漏掉结果，此时改用LIKE。建议设置innodb_ft_enable_stopword=0后重建FULLTEXT索引，
+  关闭停用词后所有搜索词都能使用全文索引
+- SQLite：存在FTS5（trigram分词）外部内容表{table}_fts时，用MATCH获取候选rowid
+- 内存n-gram索引：SEARCHABLE_COLUMNS中行数不超过SEARCH_MEMORY_MAX_ROWS的小表在进程内建立二元组倒排索引，
+  候选行超过SEARCH_MEMORY_MAX_CANDIDATES时说明搜索词区分度低，不生成过长的IN列表
+- 以上都不可用或搜索词太短时退回LIKE
+
+索引后端只负责缩小候选集，最终结果总是再用LIKE校验，保证与原来的子串匹配语义一致。
+FULLTEXT索引和FTS5表由Alembic迁移0003_search_indexes创建。
+内存索引在本进程flush时失效，其他worker提交的写入通过缓存失效总线通知。
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import Column, and_, event, false, literal_column, or_, select, table, text, true
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.core.cache import on_tables_committed
+from app.core.config import settings
+from app.db.routing import primary_reads
+
+logger = logging.getLogger(__name__)
+
+# 建立了全文索引的列（与迁移0003_search_indexes保持一致）
+SEARCHABLE_COLUMNS: Dict[str, List[str]] = {
+    "sys_user": ["username", "nickname"],
+    "sys_role": ["role_name", "role_key"],
+    "sys_post": ["post_name", "post_code"],
+    "sys_dept": ["dept_name"],
+    "sys_menu": ["menu_name"],
+    "sys_dict_type": ["dict_name", "dict_type"],
+    "sys_dict_data": ["dict_label"],
+    "sys_config": ["config_name", "config_key", "config_value"],
+    "sys_job": ["job_name", "job_group", "invoke_target"],
+    "sys_job_log": ["job_name"],
+    "gen_table": ["table_name", "table_comment"],
+}
+
+
+# InnoDB默认停用词表（INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD）
+INNODB_DEFAULT_STOPWORDS: FrozenSet[str] = frozenset((
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for", "from", "how", "i", "in",
+    "is", "it", "la", "of", "on", "or", "that", "the", "this", "to", "was", "what", "when", "where", "who",
+    "will", "with", "und", "www",
+))
+
+
+def _searchable(column: Column) -> bool:
+    return column.name in SEARCHABLE_COLUMNS.get(column.table.name, [])
+
+
+def _primary_key(column: Column) -> Optional[Column]:
+    """单列主键，复合主键的表不支持候选集过滤"""
+    pks = list(column.table.primary_key.columns)
+    if len(pks) != 1:
+        return None
+    return pks[0]
+
+
+class MySQLFulltextBackend:
+    """MySQL FULLTEXT（ngram解析器）后端"""
+
+    name = "mysql_fulltext"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexed: Optional[Set[Tuple[str, str]]] = None
+        self._stopwords: FrozenSet[str] = INNODB_DEFAULT_STOPWORDS
+
+    @staticmethod
+    def _load_stopwords(db: Session) -> FrozenSet[str]:
+        """当前生效的停用词：关闭停用词时为空，配置了服务器停用词表时读取该表，否则为默认停用词表"""
+        enabled, table_name = db.execute(text(
+            "SELECT @@innodb_ft_enable_stopword, @@innodb_ft_server_stopword_table"
+        )).one()
+        if not int(enabled):
+            return frozenset()
+        if not table_name:
+            return INNODB_DEFAULT_STOPWORDS
+        # 变量值格式为"库名/表名"
+        schema, _, name = table_name.partition("/")
+        rows = db.execute(text(f"SELECT value FROM `{schema}`.`{name}`")).scalars().all()
+        return frozenset(str(value).lower() for value in rows if value)
+
+    def _has_stopword(self, term: str) -> bool:
+        """搜索词的ngram中是否有被停用词过滤掉的词元（ngram解析器丢弃包含停用词的词元）"""
+        if not self._stopwords:
+            return False
+        size = settings.SEARCH_NGRAM_SIZE
+        term = term.lower()
+        for i in range(len(term) - size + 1):
+            gram = term[i:i + size]
+            if any(word in gram for word in self._stopwords if len(word) <= size):
+                return True
+        return False
+
+    def _load(self, db: Session) -> Set[Tuple[str, str]]:
+        if self._indexed is not None:
+            return self._indexed
+        with self._lock:
+            if self._indexed is None:
+                rows = db.execute(text(
+                    "SELECT INDEX_NAME, TABLE_NAME, COLUMN_NAME FROM information_schema.STATISTICS "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_TYPE = 'FULLTEXT'"
+                )).all()
+                columns: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+                for index_name, table_name, column_name in rows:
+                    columns.setdefault((table_name, index_name), []).append((table_name, column_name))
+                # MATCH的列必须与某个FULLTEXT索引的列完全一致，这里只使用单列索引
+                self._indexed = {cols[0] for cols in columns.values() if len(cols) == 1}
+                logger.info(f"可用的FULLTEXT索引列: {sorted(self._indexed)}")
+                if self._indexed:
+                    try:
+                        self._stopwords = self._load_stopwords(db)
+                    except Exception as e:
+                        logger.warning(f"读取FULLTEXT停用词配置失败，按默认停用词表处理: {e}")
+                        self._stopwords = INNODB_DEFAULT_STOPWORDS
+                    if self._stopwords:
+                        logger.info("FULLTEXT停用词已启用，ngram含停用词的搜索词使用LIKE")
+        return self._indexed
+
+    def condition(self, db: Session, column: Column, term: str) -> Optional[ColumnElement]:
+        if db.bind.dialect.name != "mysql" or len(term) < settings.SEARCH_NGRAM_SIZE:
+            return None
+        if (column.table.name, column.name) not in self._load(db) or self._has_stopword(term):
+            return None
+        # 布尔模式的短语查询要求ngram连续出现，近似子串匹配
+        phrase = '"' + term.replace('"', " ") + '"'
+        return column.match(phrase)
+
+    def reset(self) -> None:
+        self._indexed = None
+        self._stopwords = INNODB_DEFAULT_STOPWORDS
+
+
+class SqliteFtsBackend:
+    """SQLite FTS5（trigram分词）后端"""
+
+    name = "sqlite_fts5"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables: Optional[Set[str]] = None
+
+    def _load(self, db: Session) -> Set[str]:
+        if self._tables is not None:
+            return self._tables
+        with self._lock:
+            if self._tables is None:
+                rows = db.execute(text(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE '%\\_fts' ESCAPE '\\'"
+                )).scalars().all()
+                self._tables = set(rows)
+        return self._tables
+
+    def condition(self, db: Session, column: Column, term: str) -> Optional[ColumnElement]:
+        # trigram分词要求搜索词至少3个字符
+        if db.bind.dialect.name != "sqlite" or len(term) < 3:
+            return None
+        if not _searchable(column):
+            return None
+        fts_name = f"{column.table.name}_fts"
+        pk = _primary_key(column)
+        if pk is None or fts_name not in self._load(db):
+            return None
+        query = f'{column.name} : "{term.replace(chr(34), chr(34) * 2)}"'
+        fts = table(fts_name)
+        candidates = select(literal_column("rowid")).select_from(fts).where(
+            literal_column(fts_name).op("MATCH")(query)
+        )
+        return pk.in_(candidates)
+
+    def reset(self) -> None:
+        self._tables = None
+
+
+class MemoryNgramBackend:
+    """
+    进程内二元组倒排索引后端
+
+    SEARCHABLE_COLUMNS中的小表列首次搜索时读取整列建立索引，ORM提交涉及该表时标记失效，
+    另按SEARCH_MEMORY_TTL定期重建，兜底批量更新等绕过ORM事件的修改。
+    只登记的列参与，其他表的写入不会通过缓存失效总线通知，索引可能过期。
+    索引为进程内共享，总是从主库构建；构建期间发生失效时（代数变化）本次结果只用于当前查询，不保存。
+    """
+
+    name = "memory_ngram"
+    N = 2
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        # (表名, 列名) -> (建立时间, 倒排索引)，倒排索引为None表示表太大
+        self._indexes: Dict[Tuple[str, str], Tuple[float, Optional[Dict[str, Set[Any]]]]] = {}
+        # 每次失效加一
+        self._generation = 0
+
+    @classmethod
+    def _grams(cls, value: str) -> Set[str]:
+        value = value.lower()
+        if len(value) < cls.N:
+            return {value} if value else set()
+        return {value[i:i + cls.N] for i in range(len(value) - cls.N + 1)}
+
+    def _build(self, db: Session, column: Column, pk: Column) -> Optional[Dict[str, Set[Any]]]:
+        rows = db.execute(
+            select(pk, column).limit(settings.SEARCH_MEMORY_MAX_ROWS + 1)
+        ).all()
+        if len(rows) > settings.SEARCH_MEMORY_MAX_ROWS:
+            return None
+        index: Dict[str, Set[Any]] = {}
+        for key, value in rows:
+            for gram in self._grams(str(value or "")):
+                index.setdefault(gram, set()).add(key)
+        return index
+
+    def _get_index(self, db: Session, column: Column, pk: Column) -> Optional[Dict[str, Set[Any]]]:
+        key = (column.table.name, column.name)
+        entry = self._indexes.get(key)
+        if entry is not None and time.time() - entry[0] < settings.SEARCH_MEMORY_TTL:
+            return entry[1]
+        with self._build_lock:
+            entry = self._indexes.get(key)
+            if entry is not None and time.time() - entry[0] < settings.SEARCH_MEMORY_TTL:
+                return entry[1]
+            generation = self._generation
+            built_at = time.time()
+            # 刚提交的写入触发失效后立即重建，从库可能还没有这次写入
+            with primary_reads():
+                index = self._build(db, column, pk)
+            with self._lock:
+                if self._generation == generation:
+                    self._indexes[key] = (built_at, index)
+        return index
+
+    def condition(self, db: Session, column: Column, term: str) -> Optional[ColumnElement]:
+        if len(term) < self.N or settings.SEARCH_MEMORY_MAX_ROWS <= 0 or not _searchable(column):
+            return None
+        pk = _primary_key(column)
+        if pk is None:
+            return None
+        index = self._get_index(db, column, pk)
+        if index is None:
+            return None
+        candidates: Optional[Set[Any]] = None
+        for gram in self._grams(term):
+            ids = index.get(gram)
+            if not ids:
+                return false()
+            candidates = set(ids) if candidates is None else candidates & ids
+            if not candidates:
+                return false()
+        if len(candidates) > settings.SEARCH_MEMORY_MAX_CANDIDATES:
+            # 区分度太低，过长的IN列表不比LIKE快
+            return None
+        return pk.in_(sorted(candidates))
+
+    def invalidate(self, table_names: Iterable[str]) -> None:
+        names = set(table_names)
+        with self._lock:
+            self._generation += 1
+            for key in [k for k in self._indexes if k[0] in names]:
+                del self._indexes[key]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._indexes.clear()
+
+
+mysql_fulltext_backend = MySQLFulltextBackend()
+sqlite_fts_backend = SqliteFtsBackend()
+memory_ngram_backend = MemoryNgramBackend()
+
+BACKENDS = [mysql_fulltext_backend, sqlite_fts_backend, memory_ngram_backend]
+
+
+def search_contains(db: Session, column: Any, term: Optional[str]) -> ColumnElement:
+    """
+    生成"列包含搜索词"的过滤条件
+    :param db: 数据库会话，用于检测索引和建立内存索引
+    :param column: 模型列，如SysUser.username
+    :param term: 搜索词，为空时不过滤
+    """
+    term = (term or "").strip()
+    if not term:
+        return true()
+    like = column.contains(term, autoescape=True)
+    if settings.SEARCH_BACKEND == "like":
+        return like
+    table_column = column.property.columns[0] if hasattr(column, "property") else column
+    for backend in BACKENDS:
+        try:
+            condition = backend.condition(db, table_column, term)
+        except Exception as e:
+            logger.warning(f"搜索后端{backend.name}不可用，退回LIKE: {e}")
+            continue
+        if condition is not None:
+            return and_(condition, like)
+    return like
+
+
+def search_any(db: Session, columns: List[Any], term: Optional[str]) -> ColumnElement:
+    """生成"任一列包含搜索词"的过滤条件"""
+    if not (term or "").strip():
+        return true()
+    return or_(*[search_contains(db, column, term) for column in columns])
+
+
+def reset_search_backends() -> None:
+    """清空索引检测结果和内存索引（执行迁移后调用）"""
+    for backend in BACKENDS:
+        backend.reset()
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_memory_index(session: Session, flush_context: Any) -> None:
+    tables = {
+        obj.__table__.name
+        for obj in list(session.new) + list(session.dirty) + list(session.deleted)
+        if hasattr(obj, "__table__")
+    }
+    if tables:
+        memory_ngram_backend.invalidate(tables)
+
+
+# 其他worker提交了这些表的写入时同样失效
+on_tables_committed(SEARCHABLE_COLUMNS.keys(), memory_ngram_backend.invalidate)
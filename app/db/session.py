@@ -1,23 +1,105 @@
+from typing import Any, Callable, Generator, Optional
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 from app.core.config import settings
+from app.db.events import instrument_engine
+from app.db.pool import InstrumentedQueuePool, pool_tracker
+from app.db.routing import ReplicaRouter, RoutingSession
+
+
+def _create_engine(name: str, url: str):
+    """
+    创建引擎，连接池参数按单个worker进程计算：
+    每个进程最多 DB_POOL_SIZE + DB_MAX_OVERFLOW 个连接，总连接数需乘以worker数
+    """
+    db_engine = create_engine(
+        url,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+        echo=True if settings.LOGGING_LEVEL == "DEBUG" else False
+    )
+    pool_tracker.register(name, db_engine)
+    instrument_engine(db_engine)
+    return db_engine
+
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    echo=True if settings.LOGGING_LEVEL == "DEBUG" else False
+# 主库
+engine = _create_engine("primary", settings.DATABASE_URL)
+# 从库，只读查询在其中轮询
+replica_engines = [_create_engine(f"replica{i}", url) for i, url in enumerate(settings.DATABASE_REPLICA_URLS)]
+replica_router = ReplicaRouter(replica_engines)
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, router=replica_router
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
-def get_db():
-    """获取数据库会话"""
-    db = SessionLocal()
+class LazySession:
+    """
+    懒加载会话代理
+
+    第一次访问会话属性时才创建Session，Session本身也只在执行第一条语句时才从连接池借出连接；
+    不访问数据库的请求不会占用任何连接。release()在没有未提交写入时结束当前事务并归还连接，
+    已加载的对象保持可用，之后再访问数据库会重新借出连接。
+    """
+
+    def __init__(self, factory: Callable[[], Session] = SessionLocal):
+        self._factory = factory
+        self._session: Optional[Session] = None
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            self._session = self._factory()
+        return self._session
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.session, name)
+
+    def release(self) -> None:
+        """没有未提交的写入时提前归还连接"""
+        db = self._session
+        if db is None or not db.in_transaction():
+            return
+        if db.new or db.dirty or db.deleted or getattr(db, "uncommitted_writes", False):
+            return
+        # 只读事务直接提交，提交时不让已加载的对象过期
+        expire_on_commit = db.expire_on_commit
+        db.expire_on_commit = False
+        try:
+            db.commit()
+        finally:
+            db.expire_on_commit = expire_on_commit
+
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+
+def release_db(db: Any) -> None:
+    """请求内提前归还连接，非懒加载代理的会话不做处理"""
+    if isinstance(db, LazySession):
+        db.release()
+
+
+def get_db() -> Generator[Session, None, None]:
+    """
+    获取数据库会话（请求依赖）
+    返回懒加载代理，同一请求内的依赖共享同一个实例
+    """
+    db = LazySession()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -0,0 +1,326 @@
+"""
+参考数据快照
+
+字典数据、参数这类读多写少且按键查询频繁的表序列化为一个带版本的二进制文件，
+同一节点的所有worker以只读方式mmap该文件，数据只在操作系统页缓存中保存一份，
+worker启动时直接映射已有文件，不再各自查询数据库预热。
+
+文件格式（小端）：
+    头部      magic(4s) 格式版本(H) 保留(H) 快照版本(Q) 开始构建时间(d) 目录偏移(Q) 目录长度(I)
+    每张表    行偏移数组(uint32 * (行数 + 1)，4字节对齐) + 行数据(每行一个紧凑JSON数组)
+    目录      JSON：各表的列名、行数、偏移数组和行数据的位置、按列建立的取值 -> 行号索引
+
+访问通过轻量视图进行：行偏移数组直接cast为uint32视图，只有读取的行才会解码。
+
+更新流程：
+- 提交了快照中表的写入后（本进程或通过缓存失效总线得知的其他进程），该表立即标记为过期，
+  过期期间table()返回None，调用方回退到数据库或缓存，保证读到自己的写入
+- 延迟SNAPSHOT_REBUILD_DELAY后在后台重建：持有文件锁，若已有其他worker在标记之后开始构建则跳过，
+  否则从主库读取并写入临时文件后原子替换
+- 各worker发现文件被替换（inode或修改时间变化）后重新映射，新快照的构建时间晚于过期标记时清除标记
+- 失效总线重新订阅后（断开期间可能漏掉其他节点的写入）不标记过期，只安排一次后台重建，
+  重建完成前继续使用当前快照，避免每次重连都让所有worker回退到数据库
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import Table, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import on_tables_committed
+from app.core.config import settings
+from app.models.system.dict import SysDictData
+from app.models.utils.config import SysConfig
+
+try:
+    import fcntl
+except ImportError:  # Windows下不加锁，多个worker可能重复构建
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"RSNP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHQdQI")
+
+# 快照包含的表及需要建立索引的列，只收录有读取路径的表（CRUDDictData、CRUDConfig），
+# 新增表时需同时让对应CRUD方法读取快照，否则只会增加构建开销和无谓的过期标记
+REFERENCE_TABLES: Dict[str, Tuple[Table, Sequence[str]]] = {
+    "sys_config": (SysConfig.__table__, ("config_key",)),
+    "sys_dict_data": (SysDictData.__table__, ("dict_type",)),
+}
+
+
+class SnapshotTable:
+    """单张表的只读视图，行在读取时才解码"""
+
+    __slots__ = ("name", "columns", "_buf", "_offsets", "_data", "_indexes")
+
+    def __init__(self, name: str, buf: memoryview, meta: Dict[str, Any]):
+        self.name = name
+        self.columns: List[str] = meta["columns"]
+        self._buf = buf
+        rows = meta["rows"]
+        self._offsets = buf[meta["offsets"]:meta["offsets"] + (rows + 1) * 4].cast("I")
+        self._data = meta["data"]
+        self._indexes: Dict[str, Dict[str, List[int]]] = meta["indexes"]
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def row(self, i: int) -> Dict[str, Any]:
+        """按行号读取一行"""
+        start = self._data + self._offsets[i]
+        end = self._data + self._offsets[i + 1]
+        return dict(zip(self.columns, json.loads(bytes(self._buf[start:end]))))
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def find(self, column: str, value: Any) -> List[Dict[str, Any]]:
+        """按建立了索引的列查找，值按字符串比较"""
+        return [self.row(i) for i in self._indexes[column].get(str(value), [])]
+
+    def find_one(self, column: str, value: Any) -> Optional[Dict[str, Any]]:
+        ids = self._indexes[column].get(str(value))
+        return self.row(ids[0]) if ids else None
+
+
+class _Mapping:
+    """一次映射的快照文件"""
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # mmap在视图存在期间不能关闭，随最后一个引用释放
+        buf = memoryview(mm)
+        magic, fmt, _, version, started_at, dir_offset, dir_length = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"快照文件格式不匹配: {path}")
+        meta = json.loads(bytes(buf[dir_offset:dir_offset + dir_length]))
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        self.version = version
+        self.started_at = started_at
+        self.size = stat.st_size
+        self.tables = {name: SnapshotTable(name, buf, t) for name, t in meta["tables"].items()}
+
+
+@contextmanager
+def _file_lock(path: str) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    with open(path, "a+") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_snapshot(db: Session, path: str) -> Tuple[int, float]:
+    """
+    从数据库读取参考表并写入快照文件（先写临时文件再原子替换）
+    :return: (快照版本, 开始构建时间)
+    """
+    started_at = time.time()
+    version = int(started_at * 1000)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    directory: Dict[str, Any] = {}
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        for name, (table, index_columns) in REFERENCE_TABLES.items():
+            columns = [c.name for c in table.columns]
+            rows = db.execute(select(table).order_by(*table.primary_key.columns)).all()
+            encoded: List[bytes] = []
+            indexes: Dict[str, Dict[str, List[int]]] = {c: defaultdict(list) for c in index_columns}
+            for i, row in enumerate(rows):
+                values = list(row)
+                encoded.append(json.dumps(values, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+                for column in index_columns:
+                    indexes[column][str(values[columns.index(column)])].append(i)
+            # 偏移数组按4字节对齐
+            f.write(b"\0" * (-f.tell() % 4))
+            offsets_pos = f.tell()
+            offset = 0
+            offsets = [0]
+            for data in encoded:
+                offset += len(data)
+                offsets.append(offset)
+            f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            data_pos = f.tell()
+            for data in encoded:
+                f.write(data)
+            directory[name] = {
+                "columns": columns,
+                "rows": len(encoded),
+                "offsets": offsets_pos,
+                "data": data_pos,
+                "indexes": indexes,
+            }
+        dir_offset = f.tell()
+        dir_bytes = json.dumps({"tables": directory}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        f.write(dir_bytes)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, version, started_at, dir_offset, len(dir_bytes)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return version, started_at
+
+
+class ReferenceSnapshot:
+    """参考数据快照的加载、失效和重建"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mapping: Optional[_Mapping] = None
+        self._stale: Dict[str, float] = {}
+        self._checked = 0.0
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._started = False
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    def start(self) -> None:
+        """
+        映射已有快照，文件不存在或在本进程启动前构建时重建（应用启动时调用）
+        同一节点先启动的worker完成构建后，其余worker直接映射
+        """
+        if not settings.SNAPSHOT_ENABLED or self._started:
+            return
+        self._started = True
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        try:
+            self.rebuild(requested_at=_process_started)
+        except Exception as e:
+            logger.error(f"构建参考数据快照失败，将直接查询数据库: {e}")
+
+    def table(self, name: str) -> Optional[SnapshotTable]:
+        """
+        获取表视图，快照不可用或该表有未反映到快照的写入时返回None，调用方应回退到数据库
+        未调用start()的进程（脚本等）收不到写入通知，总是返回None
+        """
+        if not settings.SNAPSHOT_ENABLED or not self._started:
+            return None
+        now = time.monotonic()
+        if self._stale or now - self._checked >= settings.SNAPSHOT_CHECK_INTERVAL:
+            self._checked = now
+            self._reload()
+        mapping = self._mapping
+        if mapping is None or name in self._stale:
+            return None
+        return mapping.tables.get(name)
+
+    def _reload(self) -> None:
+        """文件被替换后重新映射"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        current = self._mapping
+        if current is not None and current.identity == (stat.st_ino, stat.st_mtime_ns, stat.st_size):
+            return
+        try:
+            mapping = _Mapping(self.path)
+        except Exception as e:
+            logger.warning(f"映射参考数据快照失败: {e}")
+            return
+        with self._lock:
+            self._mapping = mapping
+            # 快照开始构建时间晚于过期标记，说明已包含对应的写入
+            for name, marked_at in list(self._stale.items()):
+                if mapping.started_at >= marked_at:
+                    del self._stale[name]
+
+    def mark_stale(self, tables: Set[str]) -> None:
+        """标记表已有新的写入，并安排后台重建"""
+        if not settings.SNAPSHOT_ENABLED or not self._started:
+            return
+        now = time.time()
+        with self._lock:
+            for name in tables:
+                self._stale[name] = now
+            self._schedule_rebuild(now)
+
+    def resync(self) -> None:
+        """失效总线重新订阅后安排后台重建，不标记过期；同一节点只有一个worker实际构建"""
+        if not settings.SNAPSHOT_ENABLED or not self._started:
+            return
+        with self._lock:
+            self._schedule_rebuild(time.time())
+
+    def _schedule_rebuild(self, requested_at: float) -> None:
+        # 调用方持有self._lock
+        if self._timer is None:
+            self._timer = threading.Timer(
+                settings.SNAPSHOT_REBUILD_DELAY, self._scheduled_rebuild, args=(requested_at,)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _scheduled_rebuild(self, requested_at: float) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.rebuild(requested_at)
+        except Exception as e:
+            logger.error(f"重建参考数据快照失败: {e}")
+
+    def rebuild(self, requested_at: float) -> None:
+        """
+        重建快照，同一节点的worker串行执行；已有在requested_at之后开始的构建时跳过
+        """
+        from app.db.session import SessionLocal
+
+        with _file_lock(f"{self.path}.lock"):
+            self._reload()
+            mapping = self._mapping
+            if mapping is None or mapping.started_at < requested_at:
+                db = SessionLocal()
+                # 快照必须反映已提交的写入，不使用可能有延迟的从库
+                db.use_primary = True
+                started = time.perf_counter()
+                try:
+                    version, _ = write_snapshot(db, self.path)
+                finally:
+                    db.close()
+                elapsed = time.perf_counter() - started
+                self.builds += 1
+                self.build_seconds += elapsed
+                logger.info(f"参考数据快照已重建: 版本{version}，耗时{elapsed * 1000:.0f}ms")
+            self._reload()
+
+    def status(self) -> Dict[str, Any]:
+        mapping = self._mapping
+        return {
+            "enabled": settings.SNAPSHOT_ENABLED,
+            "path": self.path,
+            "version": mapping.version if mapping else None,
+            "started_at": mapping.started_at if mapping else None,
+            "size": mapping.size if mapping else 0,
+            "tables": {name: len(t) for name, t in mapping.tables.items()} if mapping else {},
+            "stale_tables": sorted(self._stale),
+            "builds": self.builds,
+            "avg_build_ms": round(self.build_seconds * 1000 / self.builds, 2) if self.builds else None,
+        }
+
+
+# 模块导入时间近似为worker进程启动时间
+_process_started = time.time()
+
+reference_snapshot = ReferenceSnapshot(settings.SNAPSHOT_PATH)
+
+# 本进程或其他进程提交了快照中表的写入
+on_tables_committed(REFERENCE_TABLES.keys(), reference_snapshot.mark_stale, on_resync=reference_snapshot.resync)
@@ -0,0 +1,139 @@
+"""
+SQL执行监控
+
+通过引擎事件记录每条语句：
+- 按指纹（去掉字面量和参数后的语句）汇总次数、总耗时和最大耗时，供管理接口查看最慢的语句
+- 超过SQL_SLOW_QUERY_MS的语句输出慢查询日志，包含指纹、耗时和所属路由；绑定参数可能含有密码等敏感数据，不输出
+- 统计每个请求执行的语句数，超过预算时告警（SQL_BUDGET_MODE=warn）或抛出异常（raise，用于测试环境发现N+1）；
+  预算在语句执行前检查，raise模式下超出预算的语句不会执行
+"""
+import logging
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from app.core.config import settings
+from app.core.request_context import current_timings
+
+logger = logging.getLogger("app.sql")
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%\([^)]+\)s|%s|:\w+|\?")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_RE = re.compile(r"\bVALUES\s*\([\s?,]*\)(?:\s*,\s*\([\s?,]*\))*", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+class SqlBudgetExceeded(Exception):
+    """单个请求执行的SQL语句数超过预算"""
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """
+    把SQL语句归一化为指纹：字面量和绑定参数替换为?，IN列表和多行VALUES合并，空白压缩
+    """
+    sql = _STRING_RE.sub("?", statement)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    sql = _VALUES_RE.sub("VALUES (...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+class SqlMonitor:
+    """按语句指纹汇总执行统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, statement: str, duration: float) -> None:
+        """
+        记录一条语句的执行（在after_cursor_execute中调用）
+        :param duration: 耗时（秒）
+        """
+        fingerprint = normalize_sql(statement)
+        duration_ms = duration * 1000
+        timings = current_timings()
+        route = timings.route if timings is not None else None
+
+        with self._lock:
+            stat = self._stats.get(fingerprint)
+            if stat is None:
+                if len(self._stats) >= settings.SQL_STATS_MAX_FINGERPRINTS:
+                    self._evict()
+                stat = self._stats[fingerprint] = {
+                    "fingerprint": fingerprint,
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "slow_count": 0,
+                    "routes": {},
+                }
+            stat["count"] += 1
+            stat["total_ms"] += duration_ms
+            if duration_ms > stat["max_ms"]:
+                stat["max_ms"] = duration_ms
+            if route and (route in stat["routes"] or len(stat["routes"]) < 10):
+                stat["routes"][route] = stat["routes"].get(route, 0) + 1
+            slow = duration_ms >= settings.SQL_SLOW_QUERY_MS
+            if slow:
+                stat["slow_count"] += 1
+
+        if slow:
+            logger.warning("慢查询 %.2fms route=%s sql=%s", duration_ms, route or "-", fingerprint)
+
+    def _evict(self) -> None:
+        # 淘汰总耗时最小的十分之一指纹
+        victims = sorted(self._stats.values(), key=lambda s: s["total_ms"])
+        for stat in victims[:max(len(victims) // 10, 1)]:
+            del self._stats[stat["fingerprint"]]
+
+    @staticmethod
+    def check_budget() -> None:
+        """
+        检查当前请求即将执行的语句是否超过预算（在before_cursor_execute中调用）
+        已执行的语句数加上本条超过预算时告警，raise模式下抛出异常，本条语句不执行
+        """
+        mode = settings.SQL_BUDGET_MODE
+        if mode == "off":
+            return
+        timings = current_timings()
+        if timings is None:
+            return
+        route = timings.route
+        budget = settings.SQL_STATEMENT_BUDGETS.get(route, settings.SQL_STATEMENT_BUDGET)
+        count = timings.count("db") + 1
+        if budget <= 0 or count <= budget:
+            return
+        message = f"请求 {timings.method} {route} 执行了{count}条SQL，超过预算{budget}"
+        if mode == "raise":
+            raise SqlBudgetExceeded(message)
+        if not timings.extra.get("sql_budget_warned"):
+            timings.extra["sql_budget_warned"] = True
+            logger.warning(message)
+
+    def top(self, limit: int = 20, order_by: str = "total_ms") -> List[Dict[str, Any]]:
+        """
+        获取排名靠前的语句指纹
+        :param order_by: 排序字段：total_ms、max_ms、count、avg_ms
+        """
+        with self._lock:
+            stats = [dict(stat, routes=dict(stat["routes"])) for stat in self._stats.values()]
+        for stat in stats:
+            stat["avg_ms"] = round(stat["total_ms"] / stat["count"], 3) if stat["count"] else 0.0
+            stat["total_ms"] = round(stat["total_ms"], 3)
+            stat["max_ms"] = round(stat["max_ms"], 3)
+        stats.sort(key=lambda s: s[order_by], reverse=True)
+        return stats[:limit]
+
+    def reset(self) -> None:
+        """清空统计"""
+        with self._lock:
+            self._stats.clear()
+
+
+sql_monitor = SqlMonitor()
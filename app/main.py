@@ -1,36 +1,89 @@
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 import logging
 from contextlib import asynccontextmanager
 
 from app.api.v1.api import api_router
+from app.core.audit import AuditMiddleware
 from app.core.config import settings
-from app.db.session import engine
-from app.models.tool.gen import GenTable, GenTableColumn
+from app.core.log import setup_logging, shutdown_logging
+from app.core.request_context import ServerTimingMiddleware
+from app.core.redis import close_redis
+from app.core.cache_bus import invalidation_bus
+from app.core.warmup import warmup
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from app.core.metrics import PrometheusMiddleware, generate_metrics, mark_process_dead
+from app.db.routing import ReadYourWritesMiddleware
+from app.db.session import replica_router
+from app.service.monitor.job_log_retention import job_log_retention_worker
+from app.service.monitor.job_log_writer import job_log_writer
+from app.service.monitor.oper_log_writer import oper_log_writer
+from app.service.monitor.login_log_writer import login_log_writer
+from app.service.monitor.server import server_service
+from app.service.monitor.metrics_history import metrics_history
+from app.service.monitor.server_stream import server_stream_hub
+from app.service.monitor.server_cluster import server_cluster_service
+from app.service.monitor.process import process_metrics_service
+from app.service.monitor.online import online_service
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # 定义lifespan上下文管理器来处理启动和关闭事件
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # 启动事件：在应用启动时执行
-    try:
-        # 创建代码生成相关表
-        logger.info("检查并创建代码生成表结构...")
-        GenTable.__table__.create(engine, checkfirst=True)
-        GenTableColumn.__table__.create(engine, checkfirst=True)
-        logger.info("代码生成表结构检查完成")
-    except Exception as e:
-        logger.error(f"创建代码生成表结构失败: {e}")
+    # 只启动后台线程，访问数据库和文件系统的初始化（建表、模板、缓存）在预热任务中进行
+
+    # 在worker进程中配置日志，日志队列的写入线程属于当前进程
+    setup_logging()
+
+    # 启动从库延迟检查
+    replica_router.start()
+
+    # 订阅缓存失效广播，其他worker写入后清空本进程的本地缓存
+    invalidation_bus.start()
+
+    # 启动任务日志批量写入和保留策略
+    job_log_writer.start()
+    job_log_retention_worker.start()
+
+    # 启动操作日志和登录日志批量写入
+    oper_log_writer.start()
+    login_log_writer.start()
+
+    # 启动服务器信息后台采样，记录指标历史、推送给实时订阅者并上报集群
+    server_service.add_listener(metrics_history.record)
+    server_service.add_listener(server_stream_hub.publish)
+    server_service.add_listener(server_cluster_service.publish)
+    server_service.add_listener(online_service.record_session_metric)
+    server_service.start()
+
+    # 启动进程运行时指标采集（事件循环延迟、线程池、GC）
+    process_metrics_service.start()
+
+    # 后台预热（连接池、建表、模板、参考数据快照、缓存），完成前/ready返回未就绪
+    warmup.start()
     
     yield  # 这里会暂停，直到应用关闭
     
     # 关闭事件：在应用关闭时执行
     logger.info("应用正在关闭...")
+    await warmup.stop()
+    await process_metrics_service.stop()
+    server_service.stop()
+    job_log_retention_worker.stop()
+    job_log_writer.stop()
+    oper_log_writer.stop()
+    login_log_writer.stop()
+    replica_router.stop()
+    invalidation_bus.stop()
+    await close_redis()
+    mark_process_dead()
+    shutdown_logging()
 
 # 创建FastAPI应用
 app = FastAPI(
@@ -53,6 +106,21 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+# 读写分离的读自己的写（未配置从库时不影响请求）
+if settings.DATABASE_REPLICA_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+# 写操作审计日志，需要在请求上下文内层读取认证依赖记录的用户和权限
+if settings.OPER_LOG_ENABLED:
+    app.add_middleware(AuditMiddleware)
+
+# 请求上下文和耗时分布（Server-Timing）
+app.add_middleware(ServerTimingMiddleware)
+
+# HTTP请求指标
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+
 # 挂载API路由
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
@@ -78,6 +146,28 @@ def health_check():
     return {"status": "ok", "message": "系统运行正常"}
 
 
+# 就绪检查接口
+@app.get("/ready", tags=["系统"])
+def readiness_check():
+    """
+    就绪检查接口，启动预热完成前和关闭过程中返回503
+    """
+    status = warmup.status()
+    return JSONResponse(
+        status_code=200 if status["ready"] else 503,
+        content={"status": "ready" if status["ready"] else "not_ready", **status},
+    )
+
+
+if settings.METRICS_ENABLED:
+    @app.get("/metrics", tags=["系统"], include_in_schema=False)
+    def metrics():
+        """
+        Prometheus指标（在线会话数由后台采样更新，抓取时不访问Redis）
+        """
+        return Response(generate_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run("app.main:app", host="127.0.0.1", port=8000, reload=True)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 
 from app.db.base_class import Base
 
@@ -28,6 +28,12 @@ class SysJob(Base):
 class SysJobLog(Base):
     """定时任务调度日志表"""
     __tablename__ = "sys_job_log"
+    __table_args__ = (
+        # 日志列表按任务组和状态筛选、按ID倒序分页，InnoDB二级索引隐含主键
+        Index("ix_sys_job_log_group_status", "job_group", "status"),
+        # 按时间范围查询和保留策略
+        Index("ix_sys_job_log_create_time", "create_time"),
+    )
     
     job_log_id = Column(Integer, primary_key=True, index=True, autoincrement=True, comment="任务日志ID")
     # job_id字段在数据库中不存在，需要去掉或修改
@@ -0,0 +1,40 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Float, UniqueConstraint
+
+from app.db.base_class import Base
+
+
+class JobStatMixin:
+    """任务执行统计公共字段"""
+    stat_id = Column(Integer, primary_key=True, autoincrement=True, comment="统计ID")
+    job_name = Column(String(64), nullable=False, comment="任务名称")
+    job_group = Column(String(64), nullable=False, comment="任务组名")
+    stat_time = Column(DateTime, nullable=False, comment="统计周期开始时间")
+    total_count = Column(Integer, default=0, comment="执行次数")
+    success_count = Column(Integer, default=0, comment="成功次数")
+    fail_count = Column(Integer, default=0, comment="失败次数")
+    timed_count = Column(Integer, default=0, comment="有耗时记录的执行次数")
+    min_duration = Column(Float, nullable=True, comment="最短耗时（毫秒）")
+    max_duration = Column(Float, nullable=True, comment="最长耗时（毫秒）")
+    sum_duration = Column(Float, default=0, comment="总耗时（毫秒）")
+    p95_duration = Column(Float, nullable=True, comment="P95耗时（毫秒）")
+    duration_histogram = Column(String(500), default="", comment="耗时分布直方图")
+    last_failure_time = Column(DateTime, nullable=True, comment="最近失败时间")
+    last_failure_message = Column(String(500), nullable=True, comment="最近失败信息")
+    update_time = Column(DateTime, default=datetime.now, onupdate=datetime.now, comment="更新时间")
+
+
+class SysJobStatHourly(JobStatMixin, Base):
+    """定时任务执行小时统计表"""
+    __tablename__ = "sys_job_stat_hourly"
+    __table_args__ = (
+        UniqueConstraint("job_name", "job_group", "stat_time", name="uk_job_stat_hourly"),
+    )
+
+
+class SysJobStatDaily(JobStatMixin, Base):
+    """定时任务执行日统计表"""
+    __tablename__ = "sys_job_stat_daily"
+    __table_args__ = (
+        UniqueConstraint("job_name", "job_group", "stat_time", name="uk_job_stat_daily"),
+    )
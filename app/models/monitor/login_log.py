@@ -0,0 +1,28 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, Index
+
+from app.db.base_class import Base
+
+
+class SysLoginLog(Base):
+    """系统访问记录（登录日志）"""
+    __tablename__ = "sys_login_log"
+    __table_args__ = (
+        # 列表默认按时间倒序，时间范围查询、统计和清理
+        Index("ix_sys_login_log_login_time", "login_time"),
+        # 按状态（登录失败）、用户名或IP筛选后再按时间范围
+        Index("ix_sys_login_log_status_time", "status", "login_time"),
+        Index("ix_sys_login_log_name_time", "user_name", "login_time"),
+        Index("ix_sys_login_log_ip_time", "ipaddr", "login_time"),
+    )
+
+    info_id = Column(Integer, primary_key=True, autoincrement=True, comment="访问ID")
+    user_name = Column(String(50), default="", comment="用户账号")
+    ipaddr = Column(String(128), default="", comment="登录IP地址")
+    login_location = Column(String(255), default="", comment="登录地点")
+    browser = Column(String(50), default="", comment="浏览器类型")
+    os = Column(String(50), default="", comment="操作系统")
+    status = Column(String(1), default="0", comment="登录状态（0成功 1失败）")
+    msg = Column(String(255), default="", comment="提示消息")
+    login_time = Column(DateTime, default=datetime.now, comment="访问时间")
+    request_id = Column(String(64), default="", comment="请求关联ID")
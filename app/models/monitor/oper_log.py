@@ -0,0 +1,36 @@
+from datetime import datetime
+from sqlalchemy import BigInteger, Column, Integer, String, DateTime, Index
+
+from app.db.base_class import Base
+
+
+class SysOperLog(Base):
+    """操作日志记录"""
+    __tablename__ = "sys_oper_log"
+    __table_args__ = (
+        # 列表默认按时间倒序，时间范围查询和清理
+        Index("ix_sys_oper_log_oper_time", "oper_time"),
+        # 按状态（异常操作）或操作人员筛选后再按时间范围
+        Index("ix_sys_oper_log_status_time", "status", "oper_time"),
+        Index("ix_sys_oper_log_name_time", "oper_name", "oper_time"),
+    )
+
+    oper_id = Column(Integer, primary_key=True, autoincrement=True, comment="日志主键")
+    title = Column(String(50), default="", comment="模块标题")
+    business_type = Column(Integer, default=0, comment="业务类型（0其它 1新增 2修改 3删除）")
+    method = Column(String(100), default="", comment="方法名称")
+    request_method = Column(String(10), default="", comment="请求方式")
+    operator_type = Column(Integer, default=0, comment="操作类别（0其它 1后台用户 2手机端用户）")
+    oper_name = Column(String(50), default="", comment="操作人员")
+    dept_name = Column(String(50), default="", comment="部门名称")
+    oper_url = Column(String(255), default="", comment="请求URL")
+    oper_ip = Column(String(128), default="", comment="主机地址")
+    oper_location = Column(String(255), default="", comment="操作地点")
+    oper_param = Column(String(2000), default="", comment="请求参数")
+    json_result = Column(String(2000), default="", comment="返回参数")
+    status = Column(Integer, default=0, comment="操作状态（0正常 1异常）")
+    error_msg = Column(String(2000), default="", comment="错误消息")
+    oper_time = Column(DateTime, default=datetime.now, comment="操作时间")
+    perms = Column(String(100), default="", comment="接口要求的权限标识")
+    cost_time = Column(BigInteger, default=0, comment="消耗时间（毫秒）")
+    request_id = Column(String(64), default="", comment="请求关联ID")
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 
 from app.db.base_class import Base
 
@@ -22,6 +22,10 @@ class SysDictType(Base):
 class SysDictData(Base):
     """字典数据表"""
     __tablename__ = "sys_dict_data"
+    __table_args__ = (
+        # 按字典类型获取启用的字典数据并排序
+        Index("ix_sys_dict_data_type_status_sort", "dict_type", "status", "dict_sort"),
+    )
     
     dict_code = Column(Integer, primary_key=True, autoincrement=True, comment="字典编码")
     dict_sort = Column(Integer, default=0, comment="字典排序")
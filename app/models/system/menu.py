@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -9,6 +9,10 @@ from app.models.utils.relation import SysRoleMenu
 class SysMenu(Base):
     """系统菜单表"""
     __tablename__ = "sys_menu"
+    __table_args__ = (
+        # 菜单列表和菜单树按父菜单和显示顺序排序
+        Index("ix_sys_menu_parent_order", "parent_id", "order_num"),
+    )
 
     menu_id = Column(Integer, primary_key=True, autoincrement=True, comment="菜单ID")
     menu_name = Column(String(50), nullable=False, comment="菜单名称")
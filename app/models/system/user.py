@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from app.db.session import Base
@@ -9,6 +9,10 @@ from app.models.utils.relation import SysUserRole, SysUserPost
 class SysUser(Base):
     """系统用户表"""
     __tablename__ = "sys_user"
+    __table_args__ = (
+        # 按部门和状态筛选用户
+        Index("ix_sys_user_dept_status", "dept_id", "status", "del_flag"),
+    )
 
     user_id = Column(Integer, primary_key=True, autoincrement=True, comment="用户ID")
     dept_id = Column(Integer, ForeignKey("sys_dept.dept_id"), nullable=True, comment="部门ID")
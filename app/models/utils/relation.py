@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Table
+from sqlalchemy import Column, Integer, ForeignKey, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from app.db.session import Base
 
@@ -23,7 +23,9 @@ SysRoleMenu = Table(
     "sys_role_menu",
     Base.metadata,
     Column("role_id", Integer, ForeignKey("sys_role.role_id"), primary_key=True, comment="角色ID"),
-    Column("menu_id", Integer, ForeignKey("sys_menu.menu_id"), primary_key=True, comment="菜单ID")
+    Column("menu_id", Integer, ForeignKey("sys_menu.menu_id"), primary_key=True, comment="菜单ID"),
+    # 主键以role_id开头，按菜单反查角色（删除菜单、权限变更）需要单独的索引
+    Index("ix_sys_role_menu_menu_id", "menu_id")
 )
 
 # 角色和部门关联表
@@ -0,0 +1,41 @@
+from typing import List, Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class LoginLogOut(BaseModel):
+    """登录日志Schema"""
+    info_id: int
+    user_name: Optional[str] = Field(None, description="用户账号")
+    ipaddr: Optional[str] = Field(None, description="登录IP地址")
+    login_location: Optional[str] = Field(None, description="登录地点")
+    browser: Optional[str] = Field(None, description="浏览器类型")
+    os: Optional[str] = Field(None, description="操作系统")
+    status: Optional[str] = Field(None, description="登录状态（0成功 1失败）")
+    msg: Optional[str] = Field(None, description="提示消息")
+    login_time: Optional[datetime] = Field(None, description="访问时间")
+    request_id: Optional[str] = Field(None, description="请求关联ID")
+
+    model_config = {"from_attributes": True}
+
+
+class LoginWindowStat(BaseModel):
+    """单个时间窗口的登录统计"""
+    window: int = Field(..., description="窗口长度（秒）")
+    attempts: int = Field(0, description="登录次数")
+    failures: int = Field(0, description="失败次数")
+    failure_rate: float = Field(0.0, description="失败率（0~1）")
+
+
+class LoginSource(BaseModel):
+    """失败次数较多的来源"""
+    key: str = Field(..., description="IP地址或用户账号")
+    failures: int = Field(0, description="失败次数")
+
+
+class LoginStats(BaseModel):
+    """登录失败统计"""
+    source: str = Field(..., description="数据来源（redis或database）")
+    windows: List[LoginWindowStat] = Field(default_factory=list, description="各时间窗口统计")
+    top_ips: List[LoginSource] = Field(default_factory=list, description="当前小时失败次数最多的IP")
+    top_users: List[LoginSource] = Field(default_factory=list, description="当前小时失败次数最多的账号")
@@ -0,0 +1,28 @@
+from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+
+class OperLogOut(BaseModel):
+    """操作日志Schema"""
+    oper_id: int
+    title: Optional[str] = Field(None, description="模块标题")
+    business_type: Optional[int] = Field(None, description="业务类型（0其它 1新增 2修改 3删除）")
+    method: Optional[str] = Field(None, description="方法名称")
+    request_method: Optional[str] = Field(None, description="请求方式")
+    operator_type: Optional[int] = Field(None, description="操作类别（0其它 1后台用户 2手机端用户）")
+    oper_name: Optional[str] = Field(None, description="操作人员")
+    dept_name: Optional[str] = Field(None, description="部门名称")
+    oper_url: Optional[str] = Field(None, description="请求URL")
+    oper_ip: Optional[str] = Field(None, description="主机地址")
+    oper_location: Optional[str] = Field(None, description="操作地点")
+    oper_param: Optional[str] = Field(None, description="请求参数（查询参数、路径参数和请求体摘要）")
+    json_result: Optional[str] = Field(None, description="返回参数")
+    status: Optional[int] = Field(None, description="操作状态（0正常 1异常）")
+    error_msg: Optional[str] = Field(None, description="错误消息")
+    oper_time: Optional[datetime] = Field(None, description="操作时间")
+    perms: Optional[str] = Field(None, description="接口要求的权限标识")
+    cost_time: Optional[int] = Field(None, description="消耗时间（毫秒）")
+    request_id: Optional[str] = Field(None, description="请求关联ID")
+
+    model_config = {"from_attributes": True}
@@ -1,12 +1,53 @@
+import logging
 import time
-from datetime import datetime
-from typing import Any, Dict, List, Optional, Tuple
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import redis
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
+from app.core.metrics import JOB_DURATION, JOB_EXECUTIONS
+from app.core.redis import redis_client
 from app.crud.monitor.job import job as job_crud, job_log as job_log_crud
 from app.models.monitor.job import SysJob, SysJobLog
 from app.schemas.monitor.job import JobCreate, JobUpdate, JobLogCreate
+from app.service.monitor.job_log_archive import job_log_archive
+from app.service.monitor.job_log_writer import job_log_writer
+
+logger = logging.getLogger(__name__)
+
+# 任务日志清理锁，所有worker和手动清理共用，同一时间只有一个清理在执行
+PURGE_LOCK_KEY = "monitor:job_log:purge_lock"
+# 只释放自己持有的锁（值与令牌相同时才删除）
+RELEASE_LOCK_SCRIPT = "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('DEL', KEYS[1]) end return 0"
+
+
+@contextmanager
+def _purge_lock(required: bool) -> Iterator[bool]:
+    """
+    获取任务日志清理锁
+    :param required: Redis不可用时是否放弃清理（自动清理为True，手动清理为False）
+    :return: 是否可以执行清理
+    """
+    token = uuid.uuid4().hex
+    try:
+        acquired = bool(redis_client.set(PURGE_LOCK_KEY, token, nx=True, ex=settings.JOB_LOG_PURGE_LOCK_TTL))
+    except redis.RedisError as e:
+        logger.warning("获取任务日志清理锁失败: %s", e)
+        yield not required
+        return
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            try:
+                redis_client.eval(RELEASE_LOCK_SCRIPT, 1, PURGE_LOCK_KEY, token)
+            except redis.RedisError as e:
+                # 释放失败时锁在TTL后自动过期
+                logger.warning("释放任务日志清理锁失败: %s", e)
 
 
 class JobService:
@@ -30,7 +71,10 @@ class JobService:
         status: str = None
     ) -> Tuple[List[SysJob], int]:
         """获取任务列表"""
-        print(f"[DEBUG] service.get_jobs - 参数: skip={skip}, limit={limit}, job_name={job_name}, job_group={job_group}, status={status}")
+        logger.debug(
+            "get_jobs - 参数: skip=%s, limit=%s, job_name=%s, job_group=%s, status=%s",
+            skip, limit, job_name, job_group, status,
+        )
         result = job_crud.search_by_keyword(
             db,
             job_name=job_name,
@@ -39,7 +83,6 @@ class JobService:
             page=skip // limit + 1 if limit > 0 else 1,
             page_size=limit
         )
-        print(f"[DEBUG] service.get_jobs - 结果类型: items={type(result['items'])}, 第一条={type(result['items'][0]) if result['items'] else 'None'}")
         return result["items"], result["total"]
     
     def get_job_list(
@@ -104,34 +147,36 @@ class JobService:
             # start_time=datetime.now()
         )
         
-        # 记录执行开始
-        job_log = job_log_crud.create(db, obj_in=job_log_obj)
+        # 记录执行开始，日志在执行结束后一次性提交给批量写入器
+        start_time = datetime.now()
+        started = time.perf_counter()
         
         try:
             # 这里只是模拟执行任务，实际应该根据invoke_target执行相应的函数
             # 例如：通过importlib动态导入模块并执行函数
             time.sleep(1)  # 模拟任务执行
             
-            # 更新任务日志（移除不存在的字段）
-            # job_log.end_time = datetime.now()  # end_time字段在数据库中不存在，移除
-            job_log.status = "0"  # 成功
-            job_log.job_message = "执行成功"
-            db.add(job_log)
-            db.commit()
-            db.refresh(job_log)
-            
-            return {"success": True, "message": "任务执行成功"}
+            job_log_obj.status = "0"  # 成功
+            job_log_obj.job_message = "执行成功"
+            result = {"success": True, "message": "任务执行成功"}
         except Exception as e:
-            # 更新任务日志（移除不存在的字段）
-            # job_log.end_time = datetime.now()  # end_time字段在数据库中不存在，移除
-            job_log.status = "1"  # 失败
-            job_log.job_message = "执行失败"
-            job_log.exception_info = str(e)
-            db.add(job_log)
-            db.commit()
-            db.refresh(job_log)
-            
-            return {"success": False, "message": f"任务执行失败: {str(e)}"}
+            job_log_obj.status = "1"  # 失败
+            job_log_obj.job_message = "执行失败"
+            job_log_obj.exception_info = str(e)
+            result = {"success": False, "message": f"任务执行失败: {str(e)}"}
+        
+        self._record_execution(job_log_obj, start_time, time.perf_counter() - started)
+        return result
+
+    def _record_execution(self, job_log_obj: JobLogCreate, start_time: datetime, duration: float) -> None:
+        """提交一条任务执行记录到写后批量落库队列"""
+        record = job_log_obj.model_dump()
+        record["create_time"] = start_time
+        # duration_ms不是sys_job_log的列，落库时会被忽略
+        record["duration_ms"] = round(duration * 1000, 3)
+        job_log_writer.submit(record)
+        JOB_EXECUTIONS.labels(job_log_obj.job_group, job_log_obj.job_name, job_log_obj.status).inc()
+        JOB_DURATION.labels(job_log_obj.job_group, job_log_obj.job_name).observe(duration)
     
     def get_job_logs(
         self, 
@@ -141,15 +186,21 @@ class JobService:
         job_name: str = None, 
         job_group: str = None,
         job_id: int = None,
-        status: str = None
+        status: str = None,
+        begin_time: datetime = None,
+        end_time: datetime = None
     ) -> Tuple[List[SysJobLog], int]:
         """获取任务日志列表"""
-        print(f"[DEBUG] JobService.get_job_logs - 参数: job_name={job_name}, job_group={job_group}, job_id={job_id}, status={status}")
+        logger.debug(
+            "get_job_logs - 参数: job_name=%s, job_group=%s, job_id=%s, status=%s", job_name, job_group, job_id, status
+        )
         result = job_log_crud.search_by_keyword(
             db,
             job_name=job_name,
             job_group=job_group,
             status=status,
+            begin_time=begin_time,
+            end_time=end_time,
             page=skip // limit + 1 if limit > 0 else 1,
             page_size=limit
         )
@@ -177,15 +228,109 @@ class JobService:
         
         return result
     
-    def clean_job_logs(self, db: Session) -> int:
-        """清空任务日志"""
-        return job_log_crud.clean(db)
+    def get_archived_job_logs(
+        self,
+        begin_time: datetime = None,
+        end_time: datetime = None,
+        job_name: str = None,
+        job_group: str = None,
+        status: str = None,
+        page: int = 1,
+        page_size: int = 10
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """查询已归档的任务日志"""
+        return job_log_archive.query(
+            begin_time=begin_time,
+            end_time=end_time,
+            job_name=job_name,
+            job_group=job_group,
+            status=status,
+            page=page,
+            page_size=page_size
+        )
+
+    def purge_job_logs(
+        self,
+        db: Session,
+        retention_days: Optional[int] = None,
+        max_rows: Optional[int] = None,
+        archive: Optional[bool] = None,
+        require_lock: bool = False
+    ) -> Dict[str, Any]:
+        """
+        按保留策略清理任务日志
+        :param retention_days: 最大保留天数，默认取配置
+        :param max_rows: 最大保留行数，默认取配置
+        :param archive: 清理前是否归档，默认取配置
+        :param require_lock: Redis不可用、无法加锁时是否跳过清理
+        :return: 清理结果，其他清理正在进行时skipped为True
+        """
+        retention_days = settings.JOB_LOG_RETENTION_DAYS if retention_days is None else retention_days
+        max_rows = settings.JOB_LOG_RETENTION_MAX_ROWS if max_rows is None else max_rows
+        before = datetime.now() - timedelta(days=retention_days) if retention_days > 0 else None
+
+        with _purge_lock(require_lock) as acquired:
+            if not acquired:
+                return self._skipped_result()
+            upper_id = job_log_crud.get_purge_upper_id(db, before=before, keep_rows=max_rows)
+            return self._purge_up_to(db, upper_id=upper_id, archive=archive)
+
+    @staticmethod
+    def _skipped_result() -> Dict[str, Any]:
+        logger.info("其他任务日志清理正在进行，跳过本次清理")
+        return {"deleted": 0, "archived": 0, "batches": 0, "files": [], "skipped": True}
+
+    def _purge_up_to(self, db: Session, upper_id: Optional[int], archive: Optional[bool] = None) -> Dict[str, Any]:
+        """按主键范围分批删除不大于upper_id的日志，批次之间暂停以减少锁争用（调用方持有清理锁）"""
+        archive = settings.JOB_LOG_ARCHIVE_ENABLED if archive is None else archive
+        result = {"deleted": 0, "archived": 0, "batches": 0, "files": [], "skipped": False}
+        if upper_id is None:
+            return result
+
+        batch_size = max(settings.JOB_LOG_PURGE_BATCH_SIZE, 1)
+        start_id = 0
+        while start_id <= upper_id:
+            chunk = job_log_crud.get_chunk(
+                db, start_id=start_id, end_id=upper_id, limit=batch_size, with_rows=archive
+            )
+            if not chunk:
+                break
+            if archive:
+                rows = [log.to_dict() for log in chunk]
+                result["files"].append(job_log_archive.write(rows))
+                result["archived"] += len(rows)
+                first_id, last_id = rows[0]["job_log_id"], rows[-1]["job_log_id"]
+                # 释放已归档对象，避免长时间清理占用内存
+                db.expunge_all()
+            else:
+                first_id, last_id = chunk[0], chunk[-1]
+
+            result["deleted"] += job_log_crud.delete_range(db, start_id=first_id, end_id=last_id)
+            result["batches"] += 1
+            start_id = last_id + 1
+            if start_id <= upper_id and settings.JOB_LOG_PURGE_PAUSE > 0:
+                time.sleep(settings.JOB_LOG_PURGE_PAUSE)
+
+        logger.info(
+            f"任务日志清理完成: 删除{result['deleted']}条, 归档{result['archived']}条, 共{result['batches']}批"
+        )
+        return result
+
+    def clean_job_logs(self, db: Session) -> Dict[str, Any]:
+        """
+        清空任务日志
+        :return: 清理结果，其他worker正在清理时skipped为True
+        """
+        with _purge_lock(False) as acquired:
+            if not acquired:
+                return self._skipped_result()
+            return self._purge_up_to(db, upper_id=job_log_crud.get_max_id(db))
 
     def run_job_once(self, db: Session, job_id: int) -> Dict[str, Any]:
         """立即执行一次任务"""
         return self.run_job(db, job_id=job_id)
     
-    def clean_all_job_logs(self, db: Session) -> int:
+    def clean_all_job_logs(self, db: Session) -> Dict[str, Any]:
         """清空所有任务日志"""
         return self.clean_job_logs(db)
 
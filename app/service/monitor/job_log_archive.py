@@ -0,0 +1,138 @@
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 归档文件名格式：job_log_<最早时间>_<最晚时间>_<起始ID>_<结束ID>.jsonl.gz
+ARCHIVE_PREFIX = "job_log_"
+ARCHIVE_SUFFIX = ".jsonl.gz"
+ARCHIVE_TIME_FORMAT = "%Y%m%d%H%M%S"
+
+
+class JobLogArchive:
+    """
+    定时任务日志归档
+
+    清理前把日志按批写入gzip压缩的JSONL文件，文件名中带有时间范围，
+    查询时可以只打开与时间范围有交集的文件。
+    """
+
+    def __init__(self, archive_dir: Optional[str] = None):
+        self.archive_dir = archive_dir or settings.JOB_LOG_ARCHIVE_DIR
+
+    def write(self, rows: List[Dict[str, Any]]) -> Optional[str]:
+        """
+        写入一批日志
+        :param rows: 按job_log_id升序排列的日志字典
+        :return: 归档文件路径
+        """
+        if not rows:
+            return None
+        os.makedirs(self.archive_dir, exist_ok=True)
+
+        times = [row["create_time"] for row in rows if row.get("create_time")]
+        begin = min(times) if times else datetime.now()
+        end = max(times) if times else begin
+        filename = (
+            f"{ARCHIVE_PREFIX}{begin.strftime(ARCHIVE_TIME_FORMAT)}_{end.strftime(ARCHIVE_TIME_FORMAT)}"
+            f"_{rows[0]['job_log_id']}_{rows[-1]['job_log_id']}{ARCHIVE_SUFFIX}"
+        )
+        path = os.path.join(self.archive_dir, filename)
+
+        # 先写临时文件再重命名，避免留下不完整的归档
+        tmp_path = f"{path}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False, default=self._json_default))
+                f.write("\n")
+        os.replace(tmp_path, path)
+        logger.info(f"已归档任务日志 {len(rows)} 条: {path}")
+        return path
+
+    def query(
+        self,
+        *,
+        begin_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None,
+        job_name: Optional[str] = None,
+        job_group: Optional[str] = None,
+        status: Optional[str] = None,
+        page: int = 1,
+        page_size: int = 10
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        查询归档日志，按job_log_id倒序分页
+        """
+        items = []
+        seen_ids = set()
+        for path, file_begin, file_end in self._list_files():
+            # 按文件名中的时间范围跳过无关文件
+            if begin_time and file_end < begin_time.replace(microsecond=0):
+                continue
+            if end_time and file_begin > end_time:
+                continue
+            for row in self._read_file(path):
+                # 归档成功但删除失败的批次会在下次清理时再次归档，同一条日志只保留一次
+                if row["job_log_id"] in seen_ids:
+                    continue
+                create_time = row.get("create_time")
+                if begin_time and (not create_time or create_time < begin_time):
+                    continue
+                if end_time and (not create_time or create_time > end_time):
+                    continue
+                if job_name and job_name not in (row.get("job_name") or ""):
+                    continue
+                if job_group and row.get("job_group") != job_group:
+                    continue
+                if status and row.get("status") != status:
+                    continue
+                seen_ids.add(row["job_log_id"])
+                items.append(row)
+
+        items.sort(key=lambda r: r["job_log_id"], reverse=True)
+        start = (page - 1) * page_size
+        return items[start:start + page_size], len(items)
+
+    def _list_files(self) -> List[Tuple[str, datetime, datetime]]:
+        """列出归档文件及其时间范围"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        files = []
+        for name in os.listdir(self.archive_dir):
+            if not (name.startswith(ARCHIVE_PREFIX) and name.endswith(ARCHIVE_SUFFIX)):
+                continue
+            parts = name[len(ARCHIVE_PREFIX):-len(ARCHIVE_SUFFIX)].split("_")
+            try:
+                file_begin = datetime.strptime(parts[0], ARCHIVE_TIME_FORMAT)
+                file_end = datetime.strptime(parts[1], ARCHIVE_TIME_FORMAT)
+            except (IndexError, ValueError):
+                logger.warning(f"无法识别的归档文件名: {name}")
+                continue
+            files.append((os.path.join(self.archive_dir, name), file_begin, file_end))
+        return files
+
+    def _read_file(self, path: str) -> Iterator[Dict[str, Any]]:
+        """逐行读取归档文件"""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                if row.get("create_time"):
+                    row["create_time"] = datetime.fromisoformat(row["create_time"])
+                yield row
+
+    @staticmethod
+    def _json_default(value: Any) -> Any:
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return str(value)
+
+
+job_log_archive = JobLogArchive()
@@ -0,0 +1,59 @@
+import logging
+import threading
+from typing import Optional
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.service.monitor.job import job_service
+
+logger = logging.getLogger(__name__)
+
+
+class JobLogRetentionWorker:
+    """
+    任务日志保留策略后台线程
+
+    按JOB_LOG_RETENTION_INTERVAL周期执行清理，在应用lifespan中启动和停止。
+    每个worker都会启动该线程，清理前通过Redis锁保证同一时间只有一个worker执行，
+    Redis不可用时跳过本次清理。
+    """
+
+    def __init__(self):
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """启动后台清理线程"""
+        if settings.JOB_LOG_RETENTION_INTERVAL <= 0:
+            logger.info("任务日志自动清理已关闭")
+            return
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="job-log-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台清理线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def run_once(self) -> None:
+        """执行一次清理"""
+        db = SessionLocal()
+        try:
+            job_service.purge_job_logs(db, require_lock=True)
+        except Exception as e:
+            db.rollback()
+            logger.error(f"任务日志自动清理失败: {e}")
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(settings.JOB_LOG_RETENTION_INTERVAL):
+            self.run_once()
+
+
+job_log_retention_worker = JobLogRetentionWorker()
@@ -0,0 +1,50 @@
+import logging
+from typing import Any, Dict, List
+
+from app.core.batch_writer import BatchWriter
+from app.core.config import settings
+from app.crud.monitor.job import job_log as job_log_crud
+from app.db.session import SessionLocal
+from app.service.monitor.job_stat import job_stat_service
+
+logger = logging.getLogger(__name__)
+
+
+def flush_job_logs(records: List[Dict[str, Any]]) -> None:
+    """
+    把一批任务执行记录写入sys_job_log并提交，再在单独的事务中更新执行统计
+    统计表缺失或更新失败时只丢失这批统计，不影响日志落库，也不会导致整批重试
+    """
+    db = SessionLocal()
+    try:
+        job_log_crud.create_multi(db, rows=records)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    _apply_stats(records)
+
+
+def _apply_stats(records: List[Dict[str, Any]]) -> None:
+    db = SessionLocal()
+    try:
+        job_stat_service.apply_executions(db, records)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("更新任务执行统计失败，丢弃%d条执行记录的统计: %s", len(records), e)
+    finally:
+        db.close()
+
+
+# 任务日志写后批量落库，在应用lifespan中启动和停止
+job_log_writer = BatchWriter(
+    "job_log",
+    flush_job_logs,
+    max_batch=settings.JOB_LOG_FLUSH_SIZE,
+    flush_interval=settings.JOB_LOG_FLUSH_INTERVAL,
+    max_buffer=settings.JOB_LOG_BUFFER_MAX,
+    spill_path=settings.JOB_LOG_SPILL_FILE,
+)
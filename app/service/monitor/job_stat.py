@@ -0,0 +1,209 @@
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.crud.monitor.job_stat import job_stat_hourly, job_stat_daily
+
+# 耗时直方图的桶上界（毫秒），最后一个桶收纳所有更长的耗时
+DURATION_BUCKETS = [
+    1, 2, 5, 10, 20, 50, 100, 200, 500,
+    1000, 2000, 5000, 10000, 30000, 60000, 120000, 300000, 600000,
+]
+
+
+def _bucket_index(duration: float) -> int:
+    for i, bound in enumerate(DURATION_BUCKETS):
+        if duration <= bound:
+            return i
+    return len(DURATION_BUCKETS)
+
+
+def _load_histogram(value: Optional[str]) -> List[int]:
+    histogram = json.loads(value) if value else []
+    return histogram + [0] * (len(DURATION_BUCKETS) + 1 - len(histogram))
+
+
+def _percentile(histogram: List[int], max_duration: Optional[float], percent: float = 0.95) -> Optional[float]:
+    """根据直方图估算分位数，取所在桶的上界并以最大耗时封顶"""
+    total = sum(histogram)
+    if total == 0:
+        return None
+    threshold = total * percent
+    cumulative = 0
+    for i, count in enumerate(histogram):
+        cumulative += count
+        if cumulative >= threshold:
+            bound = DURATION_BUCKETS[i] if i < len(DURATION_BUCKETS) else max_duration
+            if max_duration is not None:
+                bound = min(bound, max_duration)
+            return float(bound)
+    return max_duration
+
+
+class JobStatService:
+    """
+    任务执行统计服务
+
+    任务日志批量落库时按小时和天增量更新汇总表，统计接口只读取汇总表，
+    查询耗时与日志表的数据量无关。
+    """
+
+    GRANULARITIES = {
+        "hour": (job_stat_hourly, lambda t: t.replace(minute=0, second=0, microsecond=0)),
+        "day": (job_stat_daily, lambda t: t.replace(hour=0, minute=0, second=0, microsecond=0)),
+    }
+    # 查询统计时的默认时间范围和允许的最大跨度，汇总表不清理，不限制范围时返回的行数会持续增长
+    DEFAULT_WINDOWS = {"hour": timedelta(hours=24), "day": timedelta(days=30)}
+    MAX_SPANS = {"hour": timedelta(days=7), "day": timedelta(days=366)}
+
+    def resolve_range(
+        self, granularity: str, begin_time: Optional[datetime], end_time: Optional[datetime]
+    ) -> Tuple[datetime, datetime]:
+        """
+        补全查询的时间范围：未指定结束时间为当前时间，未指定开始时间为结束时间前推默认窗口
+        :raises ValueError: 开始时间晚于结束时间或跨度超过上限
+        """
+        end_time = end_time or datetime.now()
+        begin_time = begin_time or end_time - self.DEFAULT_WINDOWS[granularity]
+        if begin_time > end_time:
+            raise ValueError("开始时间不能晚于结束时间")
+        max_span = self.MAX_SPANS[granularity]
+        if end_time - begin_time > max_span:
+            raise ValueError(f"按{'小时' if granularity == 'hour' else '天'}统计的时间跨度不能超过{max_span.days}天")
+        return begin_time, end_time
+
+    def apply_executions(self, db: Session, records: List[Dict[str, Any]]) -> None:
+        """
+        把一批执行记录累加到小时表和日表（不提交事务）
+        :param records: 执行记录，包含job_name、job_group、status、create_time和可选的duration_ms
+        """
+        for crud, truncate in self.GRANULARITIES.values():
+            groups: Dict[Tuple[str, str, datetime], List[Dict[str, Any]]] = {}
+            for record in records:
+                create_time = record.get("create_time") or datetime.now()
+                key = (record.get("job_name") or "", record.get("job_group") or "", truncate(create_time))
+                groups.setdefault(key, []).append(record)
+
+            # 按键排序加锁，避免并发刷新时死锁
+            for (job_name, job_group, stat_time) in sorted(groups):
+                db_obj = crud.get_or_create_bucket(
+                    db, job_name=job_name, job_group=job_group, stat_time=stat_time
+                )
+                self._accumulate(db_obj, groups[(job_name, job_group, stat_time)])
+                db.add(db_obj)
+
+    def _accumulate(self, db_obj: Any, records: List[Dict[str, Any]]) -> None:
+        histogram = _load_histogram(db_obj.duration_histogram)
+        for record in records:
+            db_obj.total_count = (db_obj.total_count or 0) + 1
+            if record.get("status") == "1":
+                db_obj.fail_count = (db_obj.fail_count or 0) + 1
+                create_time = record.get("create_time")
+                if create_time and (db_obj.last_failure_time is None or create_time >= db_obj.last_failure_time):
+                    db_obj.last_failure_time = create_time
+                    message = record.get("exception_info") or record.get("job_message") or ""
+                    db_obj.last_failure_message = message[:500]
+            else:
+                db_obj.success_count = (db_obj.success_count or 0) + 1
+
+            duration = record.get("duration_ms")
+            if duration is None:
+                continue
+            db_obj.timed_count = (db_obj.timed_count or 0) + 1
+            db_obj.sum_duration = (db_obj.sum_duration or 0) + duration
+            db_obj.min_duration = duration if db_obj.min_duration is None else min(db_obj.min_duration, duration)
+            db_obj.max_duration = duration if db_obj.max_duration is None else max(db_obj.max_duration, duration)
+            histogram[_bucket_index(duration)] += 1
+
+        db_obj.duration_histogram = json.dumps(histogram, separators=(",", ":"))
+        db_obj.p95_duration = _percentile(histogram, db_obj.max_duration)
+
+    def get_stats(
+        self,
+        db: Session,
+        granularity: str = "hour",
+        job_name: Optional[str] = None,
+        job_group: Optional[str] = None,
+        begin_time: Optional[datetime] = None,
+        end_time: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        获取任务执行统计，时间范围见resolve_range
+        :return: 每个周期的明细和按任务汇总的结果
+        :raises ValueError: 时间范围不合法
+        """
+        crud, _ = self.GRANULARITIES[granularity]
+        begin_time, end_time = self.resolve_range(granularity, begin_time, end_time)
+        rows = crud.get_range(
+            db, job_name=job_name, job_group=job_group, begin_time=begin_time, end_time=end_time
+        )
+
+        buckets = []
+        summary: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for row in rows:
+            buckets.append(self._to_dict(row))
+            key = (row.job_name, row.job_group)
+            total = summary.setdefault(key, {
+                "job_name": row.job_name,
+                "job_group": row.job_group,
+                "total_count": 0,
+                "success_count": 0,
+                "fail_count": 0,
+                "timed_count": 0,
+                "sum_duration": 0.0,
+                "min_duration": None,
+                "max_duration": None,
+                "histogram": [0] * (len(DURATION_BUCKETS) + 1),
+                "last_failure_time": None,
+                "last_failure_message": None,
+            })
+            for field in ("total_count", "success_count", "fail_count", "timed_count"):
+                total[field] += getattr(row, field) or 0
+            total["sum_duration"] += row.sum_duration or 0
+            if row.min_duration is not None:
+                total["min_duration"] = row.min_duration if total["min_duration"] is None else min(total["min_duration"], row.min_duration)
+            if row.max_duration is not None:
+                total["max_duration"] = row.max_duration if total["max_duration"] is None else max(total["max_duration"], row.max_duration)
+            total["histogram"] = [a + b for a, b in zip(total["histogram"], _load_histogram(row.duration_histogram))]
+            if row.last_failure_time and (total["last_failure_time"] is None or row.last_failure_time > total["last_failure_time"]):
+                total["last_failure_time"] = row.last_failure_time
+                total["last_failure_message"] = row.last_failure_message
+
+        jobs = []
+        for total in summary.values():
+            histogram = total.pop("histogram")
+            sum_duration = total.pop("sum_duration")
+            total["avg_duration"] = round(sum_duration / total["timed_count"], 3) if total["timed_count"] else None
+            total["p95_duration"] = _percentile(histogram, total["max_duration"])
+            total["success_rate"] = round(total["success_count"] / total["total_count"], 4) if total["total_count"] else None
+            jobs.append(total)
+
+        return {
+            "granularity": granularity,
+            "begin_time": begin_time,
+            "end_time": end_time,
+            "jobs": jobs,
+            "buckets": buckets,
+        }
+
+    @staticmethod
+    def _to_dict(row: Any) -> Dict[str, Any]:
+        return {
+            "job_name": row.job_name,
+            "job_group": row.job_group,
+            "stat_time": row.stat_time,
+            "total_count": row.total_count,
+            "success_count": row.success_count,
+            "fail_count": row.fail_count,
+            "min_duration": row.min_duration,
+            "max_duration": row.max_duration,
+            "avg_duration": round(row.sum_duration / row.timed_count, 3) if row.timed_count else None,
+            "p95_duration": row.p95_duration,
+            "last_failure_time": row.last_failure_time,
+            "last_failure_message": row.last_failure_message,
+        }
+
+
+job_stat_service = JobStatService()
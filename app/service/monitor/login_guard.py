@@ -0,0 +1,258 @@
+import logging
+import math
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.core.redis import redis_available, redis_client, run_pipeline
+from app.crud.monitor.login_log import login_log as login_log_crud
+
+logger = logging.getLogger(__name__)
+
+# 失败计数键前缀：login:fail:{user|ip}:{账号或IP}:{窗口序号}
+FAIL_KEY_PREFIX = "login:fail:"
+# 锁定键前缀：login:lock:{user|ip}:{账号或IP}，值为锁定时间戳，TTL为锁定时长
+LOCK_KEY_PREFIX = "login:lock:"
+# 全局统计计数键前缀：login:stat:{attempt|fail}:{m|h}:{分钟或小时序号}
+STAT_KEY_PREFIX = "login:stat:"
+# 每小时失败次数排行（有序集合）：login:top:{user|ip}:{小时序号}
+TOP_KEY_PREFIX = "login:top:"
+
+# 分钟计数保留2小时，更长的窗口按小时计数统计，小时计数保留8天
+MINUTE_RETENTION = 2 * 3600
+HOUR_RETENTION = 8 * 86400
+MAX_STATS_WINDOW = 7 * 86400
+
+
+class LoginLock(NamedTuple):
+    """登录锁定信息"""
+    scope: str  # user或ip
+    retry_after: int  # 剩余锁定秒数
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class LoginGuard:
+    """
+    登录防护
+
+    每个账号和IP的失败次数按LOGIN_FAIL_WINDOW长度的固定窗口计数，用当前窗口计数加上
+    上一个窗口计数按剩余比例折算作为滑动窗口内的失败次数：每次只读写两个键，与日志量无关。
+    失败次数达到阈值后写入带TTL的锁定键，登录前一次往返检查锁定键即可，不扫描登录日志表。
+
+    同时按分钟和小时累计全站登录次数和失败次数，供统计接口计算各时间窗口的失败率。
+    Redis不可用时放行登录、跳过计数（登录日志仍会写入数据库）。
+    """
+
+    @staticmethod
+    def _fail_keys(scope: str, key: str, now: float) -> Tuple[str, str]:
+        window = settings.LOGIN_FAIL_WINDOW
+        bucket = int(now // window)
+        prefix = f"{FAIL_KEY_PREFIX}{scope}:{key}"
+        return f"{prefix}:{bucket}", f"{prefix}:{bucket - 1}"
+
+    @staticmethod
+    def _estimate(current: int, previous: int, now: float) -> float:
+        """滑动窗口内的失败次数估计"""
+        window = settings.LOGIN_FAIL_WINDOW
+        elapsed = (now % window) / window
+        return current + previous * (1 - elapsed)
+
+    @staticmethod
+    def _targets(username: str, ip: str) -> List[Tuple[str, str, int]]:
+        """需要计数的(范围, 键, 阈值)，阈值为0或值为空时不计数"""
+        targets = []
+        if username and settings.LOGIN_USER_MAX_FAILURES > 0:
+            targets.append(("user", username[:50], settings.LOGIN_USER_MAX_FAILURES))
+        if ip and settings.LOGIN_IP_MAX_FAILURES > 0:
+            targets.append(("ip", ip, settings.LOGIN_IP_MAX_FAILURES))
+        return targets
+
+    def check(self, username: str, ip: str) -> Optional[LoginLock]:
+        """
+        检查账号或IP是否被锁定
+        :return: 锁定信息，未锁定或Redis不可用时返回None
+        """
+        if not settings.LOGIN_GUARD_ENABLED or not redis_available():
+            return None
+        targets = self._targets(username, ip)
+        if not targets:
+            return None
+        try:
+            ttls = run_pipeline([("TTL", f"{LOCK_KEY_PREFIX}{scope}:{key}") for scope, key, _ in targets])
+        except Exception as e:
+            logger.warning("检查登录锁定失败: %s", e)
+            return None
+        for (scope, _, _), ttl in zip(targets, ttls):
+            if ttl and int(ttl) > 0:
+                return LoginLock(scope, int(ttl))
+        return None
+
+    def record(self, username: str, ip: str, success: bool) -> Optional[LoginLock]:
+        """
+        记录一次登录结果
+        失败时累加账号和IP的失败次数，达到阈值则锁定；成功时清空账号的失败次数（IP不清空，
+        撞库时同一IP偶尔成功不应重置计数）
+        :return: 本次失败触发的锁定信息
+        """
+        if not redis_available():
+            return None
+        now = time.time()
+        commands: List[Sequence[Any]] = self._stat_commands(username, ip, success, now)
+        targets = self._targets(username, ip) if settings.LOGIN_GUARD_ENABLED else []
+        offset = len(commands)
+        for scope, key, _ in targets:
+            current_key, previous_key = self._fail_keys(scope, key, now)
+            if success:
+                if scope == "user":
+                    commands.append(("DEL", current_key, previous_key))
+                continue
+            commands.extend([
+                ("INCR", current_key),
+                ("EXPIRE", current_key, settings.LOGIN_FAIL_WINDOW * 2),
+                ("GET", previous_key),
+            ])
+        try:
+            results = run_pipeline(commands)
+            if success:
+                return None
+            lock = None
+            for index, (scope, key, limit) in enumerate(targets):
+                current, _, previous = results[offset + index * 3: offset + index * 3 + 3]
+                failures = self._estimate(int(current), int(previous or 0), now)
+                if failures >= limit:
+                    redis_client.set(
+                        f"{LOCK_KEY_PREFIX}{scope}:{key}", int(now), ex=settings.LOGIN_LOCK_SECONDS, nx=True
+                    )
+                    logger.warning("登录失败次数过多，锁定%s %s: 窗口内失败约%.0f次", scope, key, failures)
+                    lock = lock or LoginLock(scope, settings.LOGIN_LOCK_SECONDS)
+            return lock
+        except Exception as e:
+            logger.warning("记录登录结果失败: %s", e)
+            return None
+
+    @staticmethod
+    def _stat_commands(username: str, ip: str, success: bool, now: float) -> List[Sequence[Any]]:
+        """全站登录统计计数命令"""
+        minute = int(now // 60)
+        hour = int(now // 3600)
+        kinds = ["attempt"] if success else ["attempt", "fail"]
+        commands: List[Sequence[Any]] = []
+        for kind in kinds:
+            minute_key = f"{STAT_KEY_PREFIX}{kind}:m:{minute}"
+            hour_key = f"{STAT_KEY_PREFIX}{kind}:h:{hour}"
+            commands.extend([
+                ("INCR", minute_key),
+                ("EXPIRE", minute_key, MINUTE_RETENTION + 60),
+                ("INCR", hour_key),
+                ("EXPIRE", hour_key, HOUR_RETENTION + 3600),
+            ])
+        if not success:
+            for scope, key in (("ip", ip), ("user", username[:50])):
+                if key:
+                    top_key = f"{TOP_KEY_PREFIX}{scope}:{hour}"
+                    commands.extend([
+                        ("ZINCRBY", top_key, 1, key),
+                        ("EXPIRE", top_key, 7200),
+                    ])
+        return commands
+
+    def unlock(self, *, username: str = None, ip: str = None) -> int:
+        """
+        解除账号或IP的锁定并清空失败次数
+        :return: 删除的锁定键数量
+        """
+        now = time.time()
+        locks: List[str] = []
+        counters: List[str] = []
+        for scope, key in (("user", username), ("ip", ip)):
+            if key:
+                locks.append(f"{LOCK_KEY_PREFIX}{scope}:{key}")
+                counters.extend(self._fail_keys(scope, key, now))
+        if not locks:
+            return 0
+        deleted, _ = run_pipeline([("DEL", *locks), ("DEL", *counters)])
+        return int(deleted)
+
+    @staticmethod
+    def _bucket_keys(kind: str, window: int, now: float) -> List[str]:
+        """覆盖最近window秒的分钟或小时计数键"""
+        if window <= MINUTE_RETENTION:
+            current = int(now // 60)
+            count = math.ceil(window / 60)
+            return [f"{STAT_KEY_PREFIX}{kind}:m:{current - i}" for i in range(count)]
+        current = int(now // 3600)
+        count = math.ceil(window / 3600)
+        return [f"{STAT_KEY_PREFIX}{kind}:h:{current - i}" for i in range(count)]
+
+    def stats(self, windows: List[int], top: int = 10) -> Dict[str, Any]:
+        """
+        各时间窗口的登录次数、失败次数和失败率，以及当前小时失败次数最多的IP和账号
+        窗口按分钟或小时计数汇总，包含当前未满的分钟（小时）
+        """
+        now = time.time()
+        hour = int(now // 3600)
+        commands: List[Sequence[Any]] = []
+        for window in windows:
+            commands.append(("MGET", *self._bucket_keys("attempt", window, now)))
+            commands.append(("MGET", *self._bucket_keys("fail", window, now)))
+        commands.append(("ZREVRANGE", f"{TOP_KEY_PREFIX}ip:{hour}", 0, top - 1, "WITHSCORES"))
+        commands.append(("ZREVRANGE", f"{TOP_KEY_PREFIX}user:{hour}", 0, top - 1, "WITHSCORES"))
+        results = run_pipeline(commands)
+
+        window_stats = []
+        for index, window in enumerate(windows):
+            attempts = sum(int(v) for v in results[index * 2] if v)
+            failures = sum(int(v) for v in results[index * 2 + 1] if v)
+            window_stats.append(self._window_stat(window, attempts, failures))
+        return {
+            "source": "redis",
+            "windows": window_stats,
+            "top_ips": self._top_sources(results[-2]),
+            "top_users": self._top_sources(results[-1]),
+        }
+
+    def stats_from_db(self, db: Any, windows: List[int], top: int = 10) -> Dict[str, Any]:
+        """Redis不可用时按登录日志表统计（按login_time索引范围扫描，未落库的缓冲记录不计入）"""
+        now = datetime.now()
+        window_stats = []
+        for window in windows:
+            attempts, failures = login_log_crud.count_by_status(db, since=now - timedelta(seconds=window))
+            window_stats.append(self._window_stat(window, attempts, failures))
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        return {
+            "source": "database",
+            "windows": window_stats,
+            "top_ips": [
+                {"key": key, "failures": count}
+                for key, count in login_log_crud.top_failures(db, column="ipaddr", since=hour_start, limit=top)
+            ],
+            "top_users": [
+                {"key": key, "failures": count}
+                for key, count in login_log_crud.top_failures(db, column="user_name", since=hour_start, limit=top)
+            ],
+        }
+
+    @staticmethod
+    def _window_stat(window: int, attempts: int, failures: int) -> Dict[str, Any]:
+        return {
+            "window": window,
+            "attempts": attempts,
+            "failures": failures,
+            "failure_rate": round(failures / attempts, 4) if attempts else 0.0,
+        }
+
+    @staticmethod
+    def _top_sources(rows: Sequence[Any]) -> List[Dict[str, Any]]:
+        # 管道中的WITHSCORES结果为成员和分数交替的平铺列表
+        if rows and isinstance(rows[0], (list, tuple)):
+            pairs = rows
+        else:
+            pairs = list(zip(rows[::2], rows[1::2]))
+        return [{"key": _decode(member), "failures": int(float(score))} for member, score in pairs]
+
+
+login_guard = LoginGuard()
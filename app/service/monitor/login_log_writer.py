@@ -0,0 +1,30 @@
+from typing import Any, Dict, List
+
+from app.core.batch_writer import BatchWriter
+from app.core.config import settings
+from app.crud.monitor.login_log import login_log as login_log_crud
+from app.db.session import SessionLocal
+
+
+def flush_login_logs(records: List[Dict[str, Any]]) -> None:
+    """把一批登录记录多行插入sys_login_log，一次提交"""
+    db = SessionLocal()
+    try:
+        login_log_crud.create_multi(db, rows=records)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# 登录日志写后批量落库，由登录接口提交，在应用lifespan中启动和停止
+login_log_writer = BatchWriter(
+    "login_log",
+    flush_login_logs,
+    max_batch=settings.LOGIN_LOG_FLUSH_SIZE,
+    flush_interval=settings.LOGIN_LOG_FLUSH_INTERVAL,
+    max_buffer=settings.LOGIN_LOG_BUFFER_MAX,
+    spill_path=settings.LOGIN_LOG_SPILL_FILE,
+)
@@ -0,0 +1,155 @@
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+from app.core.config import settings
+from app.schemas.monitor.server import ServerInfo
+
+# 支持的序列
+SERIES = (
+    "cpu",             # CPU使用率（%）
+    "load",            # 1分钟系统负载
+    "mem",             # 内存使用率（%）
+    "disk_read_bps",   # 磁盘读取速率（字节/秒）
+    "disk_write_bps",  # 磁盘写入速率（字节/秒）
+    "net_sent_bps",    # 网络发送速率（字节/秒）
+    "net_recv_bps",    # 网络接收速率（字节/秒）
+)
+
+
+class RollupRing:
+    """
+    定长环形缓冲区
+
+    每个槽位对应一个resolution秒的时间桶，用array保存桶的起始时间、最小值、最大值、
+    累加值和样本数，写入时按时间戳定位槽位，过期槽位被直接覆盖，内存占用固定。
+    """
+
+    def __init__(self, resolution: int, capacity: int):
+        self.resolution = resolution
+        self.capacity = max(capacity, 1)
+        self.bucket_ts = array("d", [0.0]) * self.capacity
+        self.mins = array("d", [0.0]) * self.capacity
+        self.maxs = array("d", [0.0]) * self.capacity
+        self.sums = array("d", [0.0]) * self.capacity
+        self.counts = array("L", [0]) * self.capacity
+
+    def add(self, ts: float, value: float) -> None:
+        """写入一个样本"""
+        slot = int(ts // self.resolution)
+        bucket = float(slot * self.resolution)
+        idx = slot % self.capacity
+        if self.bucket_ts[idx] != bucket:
+            self.bucket_ts[idx] = bucket
+            self.mins[idx] = value
+            self.maxs[idx] = value
+            self.sums[idx] = value
+            self.counts[idx] = 1
+            return
+        if value < self.mins[idx]:
+            self.mins[idx] = value
+        if value > self.maxs[idx]:
+            self.maxs[idx] = value
+        self.sums[idx] += value
+        self.counts[idx] += 1
+
+    def query(self, start: float, end: float) -> List[Tuple[float, float, float, float]]:
+        """
+        查询时间窗口内的桶
+        :return: (桶起始时间, 最小值, 平均值, 最大值) 列表，按时间升序
+        """
+        first = int(start // self.resolution)
+        last = int(end // self.resolution)
+        # 窗口超过容量时只能返回最近capacity个桶
+        first = max(first, last - self.capacity + 1)
+        points = []
+        for slot in range(first, last + 1):
+            idx = slot % self.capacity
+            bucket = float(slot * self.resolution)
+            count = self.counts[idx]
+            if self.bucket_ts[idx] != bucket or count == 0:
+                continue
+            points.append((bucket, self.mins[idx], self.sums[idx] / count, self.maxs[idx]))
+        return points
+
+
+class MetricsHistory:
+    """
+    服务器指标历史
+
+    每个序列保存1秒、1分钟、15分钟三级分辨率，新样本同时写入三级缓冲区，
+    粗粒度缓冲区自然形成最小/平均/最大值的汇总。
+    """
+
+    RESOLUTIONS = {"1s": 1, "1m": 60, "15m": 900}
+
+    def __init__(self):
+        capacities = {
+            "1s": settings.SERVER_HISTORY_1S_POINTS,
+            "1m": settings.SERVER_HISTORY_1M_POINTS,
+            "15m": settings.SERVER_HISTORY_15M_POINTS,
+        }
+        self._rings: Dict[str, Dict[str, RollupRing]] = {
+            name: {res: RollupRing(seconds, capacities[res]) for res, seconds in self.RESOLUTIONS.items()}
+            for name in SERIES
+        }
+        self._lock = threading.Lock()
+        self._last_counters: Optional[Tuple[float, int, int, int, int]] = None
+
+    def record(self, snapshot: ServerInfo) -> None:
+        """
+        记录一次采样，作为服务器采样线程的监听器使用
+        """
+        now = time.time()
+        values = {
+            "cpu": snapshot.cpu_percent or 0.0,
+            "load": snapshot.load_avg[0] if snapshot.load_avg else 0.0,
+            "mem": snapshot.memory_percent or 0.0,
+        }
+
+        # 磁盘和网络为累计计数器，需要与上一次采样求差得到速率
+        disk_io = psutil.disk_io_counters()
+        read_bytes = disk_io.read_bytes if disk_io else 0
+        write_bytes = disk_io.write_bytes if disk_io else 0
+        counters = (now, read_bytes, write_bytes, snapshot.network.sent_bytes, snapshot.network.recv_bytes)
+        if self._last_counters is not None:
+            elapsed = now - self._last_counters[0]
+            if elapsed > 0:
+                deltas = [max(cur - prev, 0) / elapsed for cur, prev in zip(counters[1:], self._last_counters[1:])]
+                values["disk_read_bps"], values["disk_write_bps"], values["net_sent_bps"], values["net_recv_bps"] = deltas
+        self._last_counters = counters
+
+        with self._lock:
+            for name, value in values.items():
+                for ring in self._rings[name].values():
+                    ring.add(now, float(value))
+
+    def query(
+        self,
+        series: List[str],
+        resolution: str = "1s",
+        start: Optional[float] = None,
+        end: Optional[float] = None
+    ) -> Dict[str, List[List[float]]]:
+        """
+        查询指定时间窗口的历史数据
+        :param series: 序列名称列表
+        :param resolution: 分辨率：1s、1m、15m
+        :param start: 开始时间戳（秒），默认结束时间前600个分辨率单位
+        :param end: 结束时间戳（秒），默认当前时间
+        :return: {序列名: [[时间戳, 最小值, 平均值, 最大值], ...]}
+        """
+        end = end or time.time()
+        start = start or end - self.RESOLUTIONS[resolution] * 600
+        result = {}
+        with self._lock:
+            for name in series:
+                points = self._rings[name][resolution].query(start, end)
+                result[name] = [[ts, round(lo, 3), round(avg, 3), round(hi, 3)] for ts, lo, avg, hi in points]
+        return result
+
+
+metrics_history = MetricsHistory()
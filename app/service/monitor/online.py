@@ -1,15 +1,20 @@
-from typing import List, Tuple, Optional
+from typing import Any, List, Tuple, Optional
 from datetime import datetime
 import json
-import traceback
+import logging
+import time
 
 from sqlalchemy.orm import Session
 
 from app.models.system.user import SysUser
 from app.schemas.monitor.online import OnlineUserOut
-from app.core.redis import redis_client
+from app.core.metrics import ONLINE_SESSIONS
+from app.core.redis import redis_available, redis_client, run_pipeline
 from app.utils.ip import get_location_by_ip
 from app.core.config import settings
+from app.core.log import sampled
+
+logger = logging.getLogger(__name__)
 
 # Redis键前缀
 ONLINE_KEY_PREFIX = "online:token:"
@@ -19,6 +24,9 @@ class OnlineService:
     """
     在线用户服务
     """
+
+    def __init__(self):
+        self._last_session_sample = 0.0
     
     def get_online_users(
         self, 
@@ -28,30 +36,29 @@ class OnlineService:
         """
         获取在线用户列表
         """
-        print(f"[DEBUG] 获取在线用户列表 - 参数: skip={skip}, limit={limit}, ipaddr={ipaddr}, username={username}")
-        # 获取所有在线用户的token
-        online_keys = redis_client.keys(f"{ONLINE_KEY_PREFIX}*")
-        print(f"[DEBUG] 在线用户Redis键数量: {len(online_keys)}")
+        logger.debug("获取在线用户列表 - 参数: skip=%s, limit=%s, ipaddr=%s, username=%s", skip, limit, ipaddr, username)
+        # 获取所有在线用户的token和用户信息（SCAN遍历，MGET一次取回）
+        online_keys, values = self._load_online_entries()
+        logger.debug("在线用户Redis键数量: %d", len(online_keys))
         online_users = []
+        refreshed = []
         
         # 遍历所有token获取用户信息
-        for key in online_keys:
+        for key, user_data in zip(online_keys, values):
             try:
                 token = key.decode("utf-8").replace(ONLINE_KEY_PREFIX, "")
-                user_data = redis_client.get(key)
                 if not user_data:
-                    print(f"[DEBUG] 键 {key} 的数据为空")
+                    # 会话在SCAN和MGET之间过期
                     continue
                 
                 user_info = json.loads(user_data)
-                print(f"[DEBUG] 解析用户数据: {user_info}")
+                if sampled(logger, "online.session"):
+                    logger.debug("解析用户数据: %s", user_info)
                 
-                # 更新最后访问时间
+                # 更新最后访问时间，循环结束后用一个管道写回
                 user_info['last_access_time'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                redis_client.setex(
-                    key,
-                    settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-                    json.dumps(user_info)
+                refreshed.append(
+                    ("SETEX", key, settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60, json.dumps(user_info))
                 )
                 
                 # 过滤条件
@@ -82,18 +89,17 @@ class OnlineService:
                     "expire_time": user_info.get("expire_time", settings.ACCESS_TOKEN_EXPIRE_MINUTES)
                 }
                 
-                print(f"[DEBUG] 创建在线用户对象: {online_user_data}")
                 online_users.append(OnlineUserOut(**online_user_data))
             except Exception as e:
-                print(f"[DEBUG] 解析在线用户数据出错: {str(e)}")
-                print(traceback.format_exc())
+                logger.warning("解析在线用户数据出错: %s", e, exc_info=True)
+        
+        if refreshed:
+            run_pipeline(refreshed)
         
         # 排序和分页
         online_users.sort(key=lambda x: x.start_timestamp if x.start_timestamp else "", reverse=True)
         total = len(online_users)
         
-        print(f"[DEBUG] 在线用户总数: {total}")
-        
         # 分页处理
         if skip < total:
             end = min(skip + limit, total)
@@ -101,9 +107,39 @@ class OnlineService:
         else:
             result_users = []
         
-        print(f"[DEBUG] 返回用户数量: {len(result_users)}")
+        logger.debug("在线用户总数: %d, 返回用户数量: %d", total, len(result_users))
         return result_users, total
     
+    def _load_online_entries(self, batch_size: int = 500) -> Tuple[List[bytes], List[Optional[bytes]]]:
+        """
+        获取所有在线会话的键和值
+        SCAN遍历键，每batch_size个键用一次MGET取值，值为None表示键已过期
+        """
+        keys = list(redis_client.scan_iter(match=f"{ONLINE_KEY_PREFIX}*", count=batch_size))
+        values: List[Optional[bytes]] = []
+        for i in range(0, len(keys), batch_size):
+            values.extend(redis_client.mget(keys[i:i + batch_size]))
+        return keys, values
+
+    def count_online_users(self) -> int:
+        """
+        统计在线会话数（SCAN遍历，不阻塞Redis）
+        """
+        return sum(1 for _ in redis_client.scan_iter(match=f"{ONLINE_KEY_PREFIX}*", count=500))
+
+    def record_session_metric(self, snapshot: Any = None) -> None:
+        """
+        更新在线会话数指标（注册为服务器采样线程的监听器，按ONLINE_SESSIONS_SAMPLE_INTERVAL节流）
+        """
+        now = time.monotonic()
+        if now - self._last_session_sample < settings.ONLINE_SESSIONS_SAMPLE_INTERVAL or not redis_available():
+            return
+        self._last_session_sample = now
+        try:
+            ONLINE_SESSIONS.set(self.count_online_users())
+        except Exception as e:
+            logger.warning("统计在线会话数失败: %s", e)
+
     def is_current_user_token(self, token: str, current_user: SysUser) -> bool:
         """
         检查是否是当前用户的token
@@ -122,21 +158,15 @@ class OnlineService:
         """
         强制用户退出登录
         """
-        key = f"{ONLINE_KEY_PREFIX}{token}"
-        if redis_client.exists(key):
-            redis_client.delete(key)
-            return True
-        return False
+        return redis_client.delete(f"{ONLINE_KEY_PREFIX}{token}") > 0
     
     def batch_force_logout(self, db: Session, tokens: List[str]) -> int:
         """
         批量强制用户退出登录
         """
-        count = 0
-        for token in tokens:
-            if self.force_logout(db, token):
-                count += 1
-        return count
+        if not tokens:
+            return 0
+        return redis_client.delete(*[f"{ONLINE_KEY_PREFIX}{token}" for token in tokens])
     
     def save_online_user(self, token: str, user: SysUser, ip_addr: str) -> None:
         """
@@ -162,7 +192,7 @@ class OnlineService:
                 "expire_time": settings.ACCESS_TOKEN_EXPIRE_MINUTES
             }
             
-            print(f"[DEBUG] 保存在线用户: {token[:10]}..., 用户ID: {user.user_id}, 用户名: {user.username}")
+            logger.debug("保存在线用户: 用户ID=%s, 用户名=%s", user.user_id, user.username)
             
             # 存储到Redis，设置过期时间与token一致
             key = f"{ONLINE_KEY_PREFIX}{token}"
@@ -172,8 +202,7 @@ class OnlineService:
                 json.dumps(online_user)
             )
         except Exception as e:
-            print(f"[ERROR] 保存在线用户出错: {str(e)}")
-            print(traceback.format_exc())
+            logger.error("保存在线用户出错: %s", e, exc_info=True)
             
     def _clean_previous_sessions(self, user_id: int) -> None:
         """
@@ -181,38 +210,33 @@ class OnlineService:
         """
         try:
             # 获取所有在线用户的token
-            online_keys = redis_client.keys(f"{ONLINE_KEY_PREFIX}*")
-            count = 0
+            online_keys, values = self._load_online_entries()
+            stale_keys = []
             
-            # 遍历查找该用户的旧会话并删除
-            for key in online_keys:
-                user_data = redis_client.get(key)
+            # 遍历查找该用户的旧会话，最后一次删除
+            for key, user_data in zip(online_keys, values):
                 if not user_data:
                     continue
                 
                 try:
                     user_info = json.loads(user_data)
                     if user_info.get("user_id") == user_id:
-                        token = key.decode("utf-8").replace(ONLINE_KEY_PREFIX, "")
-                        print(f"[DEBUG] 清理用户ID {user_id} 的旧会话: {token[:10]}...")
-                        redis_client.delete(key)
-                        count += 1
+                        stale_keys.append(key)
                 except (json.JSONDecodeError, UnicodeDecodeError):
                     continue
                 
+            count = redis_client.delete(*stale_keys) if stale_keys else 0
             if count > 0:
-                print(f"[INFO] 已清理用户ID {user_id} 的 {count} 个旧会话")
+                logger.info("已清理用户ID %s 的 %d 个旧会话", user_id, count)
         except Exception as e:
-            print(f"[ERROR] 清理用户旧会话出错: {str(e)}")
+            logger.error("清理用户旧会话出错: %s", e)
             # 不阻止主流程执行
     
     def remove_online_user(self, token: str) -> None:
         """
         移除在线用户
         """
-        key = f"{ONLINE_KEY_PREFIX}{token}"
-        if redis_client.exists(key):
-            redis_client.delete(key)
+        redis_client.delete(f"{ONLINE_KEY_PREFIX}{token}")
 
 
 # 实例化服务
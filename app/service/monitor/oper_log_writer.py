@@ -0,0 +1,30 @@
+from typing import Any, Dict, List
+
+from app.core.batch_writer import BatchWriter
+from app.core.config import settings
+from app.crud.monitor.oper_log import oper_log as oper_log_crud
+from app.db.session import SessionLocal
+
+
+def flush_oper_logs(records: List[Dict[str, Any]]) -> None:
+    """把一批操作记录多行插入sys_oper_log，一次提交"""
+    db = SessionLocal()
+    try:
+        oper_log_crud.create_multi(db, rows=records)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+# 操作日志写后批量落库，由审计中间件提交，在应用lifespan中启动和停止
+oper_log_writer = BatchWriter(
+    "oper_log",
+    flush_oper_logs,
+    max_batch=settings.OPER_LOG_FLUSH_SIZE,
+    flush_interval=settings.OPER_LOG_FLUSH_INTERVAL,
+    max_buffer=settings.OPER_LOG_BUFFER_MAX,
+    spill_path=settings.OPER_LOG_SPILL_FILE,
+)
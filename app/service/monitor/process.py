@@ -0,0 +1,172 @@
+import asyncio
+import gc
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import psutil
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ProcessMetricsService:
+    """
+    应用进程运行时指标
+
+    每个worker进程独立统计：
+    - 事件循环延迟：后台协程按固定间隔休眠，实际唤醒时间与预期的差值即循环被阻塞的时长
+    - 线程池：AnyIO默认线程池（同步def接口在其中运行）的占用数和排队数
+    - GC：通过gc.callbacks记录各代回收次数和暂停时间
+    - 进程：RSS、打开的文件描述符数和线程数
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lag_samples: Deque[float] = deque(maxlen=settings.PROCESS_LOOP_LAG_WINDOW)
+        self._lag_last = 0.0
+        self._probe_task: Optional[asyncio.Task] = None
+        self._limiter: Any = None
+        self._process: Optional[psutil.Process] = None
+        self._gc_start: Optional[float] = None
+        self._gc_collections = [0, 0, 0]
+        self._gc_pause_total = [0.0, 0.0, 0.0]
+        self._gc_pause_max = [0.0, 0.0, 0.0]
+        self._gc_recent: Deque[float] = deque(maxlen=100)
+        self._started_at = time.time()
+
+    @property
+    def process(self) -> psutil.Process:
+        """当前进程，fork出的worker进程重新获取"""
+        if self._process is None or self._process.pid != os.getpid():
+            self._process = psutil.Process(os.getpid())
+        return self._process
+
+    def start(self) -> None:
+        """
+        启动事件循环延迟探测并注册GC回调（需在事件循环中调用）
+        """
+        if self._probe_task is not None:
+            return
+        try:
+            from anyio.to_thread import current_default_thread_limiter
+            self._limiter = current_default_thread_limiter()
+        except Exception as e:
+            logger.warning(f"获取AnyIO线程池限制器失败: {e}")
+        if self._on_gc not in gc.callbacks:
+            gc.callbacks.append(self._on_gc)
+        self._probe_task = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def stop(self) -> None:
+        """停止探测并移除GC回调"""
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        if self._probe_task is None:
+            return
+        self._probe_task.cancel()
+        try:
+            await self._probe_task
+        except asyncio.CancelledError:
+            pass
+        self._probe_task = None
+
+    async def _probe_loop(self) -> None:
+        interval = settings.PROCESS_LOOP_PROBE_INTERVAL
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            lag = max(loop.time() - expected, 0.0) * 1000
+            with self._lock:
+                self._lag_last = lag
+                self._lag_samples.append(lag)
+
+    def _on_gc(self, phase: str, info: Dict[str, Any]) -> None:
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+            return
+        if self._gc_start is None:
+            return
+        pause = (time.perf_counter() - self._gc_start) * 1000
+        self._gc_start = None
+        generation = info.get("generation", 0)
+        with self._lock:
+            self._gc_collections[generation] += 1
+            self._gc_pause_total[generation] += pause
+            if pause > self._gc_pause_max[generation]:
+                self._gc_pause_max[generation] = pause
+            self._gc_recent.append(pause)
+
+    def get_process_info(self) -> Dict[str, Any]:
+        """
+        获取当前worker进程的运行时指标
+        """
+        with self._lock:
+            lag_samples = list(self._lag_samples)
+            lag_last = self._lag_last
+            gc_collections = list(self._gc_collections)
+            gc_pause_total = list(self._gc_pause_total)
+            gc_pause_max = list(self._gc_pause_max)
+            gc_recent = list(self._gc_recent)
+
+        return {
+            "pid": self.process.pid,
+            "uptime": round(time.time() - self._started_at, 3),
+            "loop_lag": self._lag_summary(lag_samples, lag_last),
+            "threadpool": self.get_threadpool_info(),
+            "gc": {
+                "enabled": gc.isenabled(),
+                "thresholds": list(gc.get_threshold()),
+                "pending": list(gc.get_count()),
+                "collections": gc_collections,
+                "pause_total_ms": [round(v, 3) for v in gc_pause_total],
+                "pause_max_ms": [round(v, 3) for v in gc_pause_max],
+                "recent_pause_max_ms": round(max(gc_recent), 3) if gc_recent else 0.0,
+            },
+            "memory": self._memory_info(),
+            "num_fds": self._num_fds(),
+            "num_threads": self.process.num_threads(),
+        }
+
+    def _lag_summary(self, samples: List[float], last: float) -> Dict[str, Any]:
+        if not samples:
+            return {"probing": self._probe_task is not None, "last_ms": 0.0, "avg_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        ordered = sorted(samples)
+        return {
+            "probing": self._probe_task is not None,
+            "interval": settings.PROCESS_LOOP_PROBE_INTERVAL,
+            "samples": len(ordered),
+            "last_ms": round(last, 3),
+            "avg_ms": round(sum(ordered) / len(ordered), 3),
+            "p99_ms": round(ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)], 3),
+            "max_ms": round(ordered[-1], 3),
+        }
+
+    def get_threadpool_info(self) -> Dict[str, Any]:
+        """AnyIO默认线程池的容量、占用数和排队数"""
+        if self._limiter is None:
+            return {"total": None, "in_use": None, "queued": None}
+        stats = self._limiter.statistics()
+        return {
+            "total": int(self._limiter.total_tokens),
+            "in_use": stats.borrowed_tokens,
+            "queued": stats.tasks_waiting,
+        }
+
+    def _memory_info(self) -> Dict[str, int]:
+        mem = self.process.memory_info()
+        return {"rss": mem.rss, "vms": mem.vms}
+
+    def _num_fds(self) -> Optional[int]:
+        # Windows没有文件描述符计数
+        try:
+            return self.process.num_fds()
+        except (AttributeError, psutil.Error):
+            return None
+
+
+process_metrics_service = ProcessMetricsService()
@@ -1,31 +1,105 @@
+import logging
 import os
 import platform
 import socket
+import threading
 import time
 import psutil
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 
+from app.core.config import settings
 from app.schemas.monitor.server import (
     ServerInfo, CpuInfo, MemInfo, DiskInfo, 
     SysInfo, NetworkInfo
 )
 
+logger = logging.getLogger(__name__)
+
+# 第一次采集CPU使用率时的阻塞间隔（秒）
+CPU_FIRST_SAMPLE_INTERVAL = 0.1
+
 
 class ServerService:
     """
     服务器监控服务
+
+    CPU型号、主机名、IP、启动时间等静态信息只采集一次；CPU、内存、磁盘和网络等
+    动态数据由后台采样线程按SERVER_SAMPLE_INTERVAL刷新，接口直接返回最新快照。
     """
+
+    def __init__(self):
+        self._static: Optional[Dict[str, Any]] = None
+        self._static_lock = threading.Lock()
+        self._cpu_primed = False
+        self._disk_cache: List[DiskInfo] = []
+        self._disk_time = 0.0
+        self._latest: Optional[ServerInfo] = None
+        self._listeners: List[Callable[[ServerInfo], None]] = []
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
     
     def get_server_info(self) -> ServerInfo:
         """
         获取服务器基本信息
+        后台采样线程运行时直接返回最新快照，否则同步采集一次
         """
+        snapshot = self._latest
+        if snapshot is not None and self.is_sampling():
+            return snapshot
+        return self.collect()
+
+    def add_listener(self, listener: Callable[[ServerInfo], None]) -> None:
+        """注册快照监听器，每次采样完成后在采样线程中调用"""
+        self._listeners.append(listener)
+
+    def start(self) -> None:
+        """启动后台采样线程"""
+        if self.is_sampling():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="server-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台采样线程"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def is_sampling(self) -> bool:
+        """后台采样线程是否在运行"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(settings.SERVER_SAMPLE_INTERVAL):
+            try:
+                snapshot = self.collect()
+            except Exception as e:
+                logger.error(f"服务器信息采样失败: {e}")
+                continue
+            for listener in list(self._listeners):
+                try:
+                    listener(snapshot)
+                except Exception as e:
+                    logger.error(f"服务器信息监听器执行失败: {e}")
+
+    def collect(self) -> ServerInfo:
+        """
+        采集一次服务器信息
+        """
+        static = self._get_static_info()
         cpu_info = self._get_cpu_info()
         mem_info = self._get_mem_info()
         sys_info = self._get_sys_info()
         disk_info_list = self._get_disk_info()
         network_info = self._get_network_info()
+
+        # 磁盘信息 (汇总所有磁盘)
+        disk_total = sum(d.total for d in disk_info_list) if disk_info_list else 0
+        disk_used = sum(d.used for d in disk_info_list) if disk_info_list else 0
+        disk_free = sum(d.free for d in disk_info_list) if disk_info_list else 0
         
         # 创建扁平化的服务器信息，前端更容易处理
         result = ServerInfo(
@@ -33,56 +107,76 @@ class ServerService:
             mem=mem_info,
             sys=sys_info,
             disk=disk_info_list,
-            network=network_info
+            network=network_info,
+            # 系统信息
+            os=sys_info.os_name,
+            arch=cpu_info.arch,
+            processor=cpu_info.model or cpu_info.name,
+            hostname=sys_info.hostname,
+            ip=sys_info.ip,
+            boot_time=int(static["boot_timestamp"]),
+            # CPU信息
+            cpu_percent=cpu_info.usage,
+            cpu_count=cpu_info.cores,
+            load_avg=self._get_load_average(cpu_info.usage),
+            # 内存信息
+            total_memory=mem_info.total,
+            used_memory=mem_info.used,
+            free_memory=mem_info.free,
+            memory_percent=mem_info.usage,
+            disk_total=disk_total,
+            disk_used=disk_used,
+            disk_free=disk_free,
+            # 计算平均磁盘使用率
+            disk_percent=(disk_used / disk_total) * 100 if disk_total > 0 else 0
         )
-        
-        # 添加扁平化的属性，便于前端直接访问
-        # 系统信息
-        result.os = sys_info.os_name
-        result.arch = cpu_info.arch
-        result.processor = cpu_info.model or cpu_info.name
-        result.hostname = sys_info.hostname
-        result.ip = sys_info.ip
-        result.boot_time = int(datetime.strptime(sys_info.boot_time, "%Y-%m-%d %H:%M:%S").timestamp()) if sys_info.boot_time else None
-        
-        # CPU信息
-        result.cpu_percent = cpu_info.usage
-        result.cpu_count = cpu_info.cores
-        result.load_avg = self._get_load_average()
-        
-        # 内存信息
-        result.total_memory = mem_info.total
-        result.used_memory = mem_info.used
-        result.free_memory = mem_info.free
-        result.memory_percent = mem_info.usage
-        
-        # 磁盘信息 (汇总所有磁盘)
-        result.disk_total = sum(d.total for d in disk_info_list) if disk_info_list else 0
-        result.disk_used = sum(d.used for d in disk_info_list) if disk_info_list else 0
-        result.disk_free = sum(d.free for d in disk_info_list) if disk_info_list else 0
-        # 计算平均磁盘使用率
-        if result.disk_total > 0:
-            result.disk_percent = (result.disk_used / result.disk_total) * 100
-        else:
-            result.disk_percent = 0
-        
+
+        self._latest = result
         return result
+
+    def _get_static_info(self) -> Dict[str, Any]:
+        """
+        获取运行期间不变的静态信息，只采集一次
+        """
+        if self._static is not None:
+            return self._static
+        with self._static_lock:
+            if self._static is None:
+                self._static = {
+                    "cpu_name": platform.processor(),
+                    "cpu_model": self._get_cpu_model(),
+                    "arch": platform.machine(),
+                    "cores": psutil.cpu_count(logical=False),
+                    "logical_cores": psutil.cpu_count(),
+                    "os_name": platform.system(),
+                    "os_version": platform.version(),
+                    "hostname": socket.gethostname(),
+                    "ip": self._get_host_ip(),
+                    "python_version": platform.python_version(),
+                    "boot_timestamp": psutil.boot_time(),
+                }
+        return self._static
     
     def _get_cpu_info(self) -> CpuInfo:
         """
         获取CPU信息
         """
-        cpu_count = psutil.cpu_count(logical=False)
-        logical_count = psutil.cpu_count()
-        cpu_usage = psutil.cpu_percent(interval=1)
+        static = self._get_static_info()
+        if self._cpu_primed:
+            # 非阻塞调用，返回距上次调用以来的CPU使用率
+            cpu_usage = psutil.cpu_percent(interval=None)
+        else:
+            # 首次非阻塞调用只建立基准并返回0.0，第一次采样阻塞一个短间隔得到真实值
+            cpu_usage = psutil.cpu_percent(interval=CPU_FIRST_SAMPLE_INTERVAL)
+            self._cpu_primed = True
         
         return CpuInfo(
-            name=platform.processor(),
-            arch=platform.machine(),
-            cores=cpu_count,
-            logical_cores=logical_count,
+            name=static["cpu_name"],
+            arch=static["arch"],
+            cores=static["cores"],
+            logical_cores=static["logical_cores"],
             usage=cpu_usage,
-            model=self._get_cpu_model()
+            model=static["cpu_model"]
         )
     
     def _get_cpu_model(self) -> str:
@@ -118,16 +212,17 @@ class ServerService:
         """
         获取系统信息
         """
-        boot_time = datetime.fromtimestamp(psutil.boot_time()).strftime("%Y-%m-%d %H:%M:%S")
+        static = self._get_static_info()
+        boot_time = datetime.fromtimestamp(static["boot_timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
         
         return SysInfo(
-            os_name=platform.system(),
-            os_version=platform.version(),
-            hostname=socket.gethostname(),
-            ip=self._get_host_ip(),
-            python_version=platform.python_version(),
+            os_name=static["os_name"],
+            os_version=static["os_version"],
+            hostname=static["hostname"],
+            ip=static["ip"],
+            python_version=static["python_version"],
             boot_time=boot_time,
-            run_time=self._get_run_time(psutil.boot_time())
+            run_time=self._get_run_time(static["boot_timestamp"])
         )
     
     def _get_host_ip(self) -> str:
@@ -164,7 +259,12 @@ class ServerService:
     def _get_disk_info(self) -> List[DiskInfo]:
         """
         获取磁盘信息
+        遍历分区开销较大，按SERVER_DISK_SAMPLE_INTERVAL缓存
         """
+        now = time.monotonic()
+        if self._disk_cache and now - self._disk_time < settings.SERVER_DISK_SAMPLE_INTERVAL:
+            return self._disk_cache
+
         disk_info = []
         
         for part in psutil.disk_partitions():
@@ -173,7 +273,11 @@ class ServerService:
                     # 跳过CD-ROM驱动器
                     continue
             
-            usage = psutil.disk_usage(part.mountpoint)
+            try:
+                usage = psutil.disk_usage(part.mountpoint)
+            except OSError:
+                # 分区不可访问（如未就绪的可移动设备）
+                continue
             
             disk_info.append(
                 DiskInfo(
@@ -187,6 +291,8 @@ class ServerService:
                 )
             )
         
+        self._disk_cache = disk_info
+        self._disk_time = now
         return disk_info
     
     def _get_network_info(self) -> NetworkInfo:
@@ -202,14 +308,14 @@ class ServerService:
             recv_packets=net_io.packets_recv
         )
     
-    def _get_load_average(self) -> Optional[List[float]]:
+    def _get_load_average(self, cpu_usage: float) -> Optional[List[float]]:
         """
         获取系统负载
         """
         try:
             if platform.system() == "Windows":
                 # Windows系统没有原生的load average，使用CPU使用率代替
-                return [psutil.cpu_percent(interval=0.1)]
+                return [cpu_usage]
             else:
                 # Linux/Unix系统获取1分钟、5分钟、15分钟的负载
                 return list(os.getloadavg())
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+import redis
+
+from app.core.config import settings
+from app.core.redis import redis_available, redis_client
+from app.schemas.monitor.server import ServerInfo
+from app.service.monitor.server import server_service
+
+logger = logging.getLogger(__name__)
+
+# 节点快照哈希前缀，每个节点一个键，带TTL
+NODE_KEY_PREFIX = "monitor:server:node:"
+# 节点心跳索引（有序集合，分数为最近一次上报时间）
+NODE_INDEX_KEY = "monitor:server:nodes"
+
+
+def _decode(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+class ServerClusterService:
+    """
+    集群服务器监控
+
+    每个节点作为采样线程的监听器，按SERVER_NODE_PUBLISH_INTERVAL把最新快照写入
+    以节点ID为键的Redis哈希并刷新TTL，同时在有序集合中记录心跳时间。
+    集群接口读取所有节点，超过SERVER_NODE_STALE_AFTER未上报的节点标记为失联，
+    哈希已过期的节点从索引中移除。
+    """
+
+    def __init__(self):
+        self._node_id: Optional[str] = None
+        self._last_publish = 0.0
+
+    @property
+    def node_id(self) -> str:
+        """当前节点ID，未配置时使用主机名"""
+        if self._node_id is None:
+            self._node_id = settings.SERVER_NODE_ID or socket.gethostname()
+        return self._node_id
+
+    def publish(self, snapshot: ServerInfo) -> None:
+        """
+        上报当前节点快照（在采样线程中调用，按上报间隔节流）
+        """
+        now = time.time()
+        if now - self._last_publish < settings.SERVER_NODE_PUBLISH_INTERVAL or not redis_available():
+            return
+        self._last_publish = now
+
+        key = f"{NODE_KEY_PREFIX}{self.node_id}"
+        try:
+            pipe = redis_client.pipeline(transaction=False)
+            pipe.hset(key, mapping={
+                "node_id": self.node_id,
+                "pid": os.getpid(),
+                "updated_at": now,
+                "snapshot": snapshot.model_dump_json(),
+            })
+            pipe.expire(key, settings.SERVER_NODE_TTL)
+            pipe.zadd(NODE_INDEX_KEY, {self.node_id: now})
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"上报节点服务器信息失败: {e}")
+
+    def get_cluster_info(self) -> Dict[str, Any]:
+        """
+        获取集群所有节点的服务器信息和汇总数据
+        Redis不可用（包括熔断中）时只返回当前节点，并标记degraded
+        """
+        if not redis_available():
+            return self._local_cluster_info()
+        now = time.time()
+        try:
+            node_ids = [_decode(n) for n in redis_client.zrange(NODE_INDEX_KEY, 0, -1)]
+            pipe = redis_client.pipeline(transaction=False)
+            for node_id in node_ids:
+                pipe.hgetall(f"{NODE_KEY_PREFIX}{node_id}")
+            results = pipe.execute() if node_ids else []
+        except redis.RedisError as e:
+            logger.warning("读取集群节点信息失败，只返回当前节点: %s", e)
+            return self._local_cluster_info()
+
+        nodes = []
+        expired = []
+        for node_id, data in zip(node_ids, results):
+            if not data:
+                expired.append(node_id)
+                continue
+            data = {_decode(k): _decode(v) for k, v in data.items()}
+            updated_at = float(data.get("updated_at") or 0)
+            age = now - updated_at
+            nodes.append({
+                "node_id": node_id,
+                "pid": int(data.get("pid") or 0),
+                "updated_at": updated_at,
+                "age": round(age, 3),
+                "status": "stale" if age > settings.SERVER_NODE_STALE_AFTER else "live",
+                "current": node_id == self.node_id,
+                "server": json.loads(data["snapshot"]) if data.get("snapshot") else None,
+            })
+
+        if expired:
+            try:
+                redis_client.zrem(NODE_INDEX_KEY, *expired)
+            except Exception as e:
+                logger.warning(f"清理过期节点索引失败: {e}")
+
+        live = [n["server"] for n in nodes if n["status"] == "live" and n["server"]]
+        return {
+            "nodes": nodes,
+            "summary": self._aggregate(live),
+            "live_count": len(live),
+            "stale_count": sum(1 for n in nodes if n["status"] == "stale"),
+            "stale_after": settings.SERVER_NODE_STALE_AFTER,
+            "degraded": False,
+        }
+
+    def _local_cluster_info(self) -> Dict[str, Any]:
+        """只包含当前节点的集群信息（Redis不可用时）"""
+        server = server_service.get_server_info().model_dump(mode="json")
+        node = {
+            "node_id": self.node_id,
+            "pid": os.getpid(),
+            "updated_at": time.time(),
+            "age": 0.0,
+            "status": "live",
+            "current": True,
+            "server": server,
+        }
+        return {
+            "nodes": [node],
+            "summary": self._aggregate([server]),
+            "live_count": 1,
+            "stale_count": 0,
+            "stale_after": settings.SERVER_NODE_STALE_AFTER,
+            "degraded": True,
+        }
+
+    @staticmethod
+    def _aggregate(servers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """汇总在线节点的容量和使用情况"""
+        def total(field: str) -> int:
+            return sum(s.get(field) or 0 for s in servers)
+
+        cpu_count = total("cpu_count")
+        memory_total = total("total_memory")
+        memory_used = total("used_memory")
+        disk_total = total("disk_total")
+        disk_used = total("disk_used")
+        # CPU使用率按核心数加权平均
+        cpu_weighted = sum((s.get("cpu_percent") or 0) * (s.get("cpu_count") or 0) for s in servers)
+        return {
+            "node_count": len(servers),
+            "cpu_count": cpu_count,
+            "cpu_percent": round(cpu_weighted / cpu_count, 2) if cpu_count else 0.0,
+            "load_avg": round(sum((s.get("load_avg") or [0])[0] for s in servers), 2),
+            "total_memory": memory_total,
+            "used_memory": memory_used,
+            "free_memory": total("free_memory"),
+            "memory_percent": round(memory_used / memory_total * 100, 2) if memory_total else 0.0,
+            "disk_total": disk_total,
+            "disk_used": disk_used,
+            "disk_free": total("disk_free"),
+            "disk_percent": round(disk_used / disk_total * 100, 2) if disk_total else 0.0,
+            "net_sent_bytes": sum(s.get("network", {}).get("sent_bytes") or 0 for s in servers),
+            "net_recv_bytes": sum(s.get("network", {}).get("recv_bytes") or 0 for s in servers),
+        }
+
+
+server_cluster_service = ServerClusterService()
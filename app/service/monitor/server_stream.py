@@ -0,0 +1,137 @@
+import asyncio
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from app.schemas.monitor.server import ServerInfo
+
+# 等待消息期间检查客户端是否断开的间隔（秒）
+DISCONNECT_CHECK_INTERVAL = 1.0
+
+
+def _frame(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class ServerStreamSubscriber:
+    """
+    单个推送订阅者
+
+    队列长度为1，客户端消费不及时时用最新快照替换未发送的数据（只保留最新值），
+    被替换过的订阅者下一次收到完整快照而不是增量，保证客户端状态正确。
+    """
+
+    def __init__(self):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.need_full = True
+        self.dropped = 0
+
+    def offer(self, message: Tuple[str, str]) -> None:
+        """放入(完整快照帧, 增量帧)，所有订阅者共用同一组已编码的字符串"""
+        if self.queue.full():
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self.dropped += 1
+            self.need_full = True
+        self.queue.put_nowait(message)
+
+    async def next_event(self, heartbeat: float, is_disconnected: Callable[[], Awaitable[bool]]) -> Optional[str]:
+        """
+        等待下一条SSE消息，每次唤醒（收到消息或每隔DISCONNECT_CHECK_INTERVAL秒）检查客户端是否断开
+        :param heartbeat: 无数据时发送心跳的间隔（秒）
+        :param is_disconnected: 检查客户端是否断开的协程函数
+        :return: SSE格式的消息，超过heartbeat秒无数据返回心跳注释，客户端断开返回None
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + heartbeat
+        while True:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return ": ping\n\n"
+            try:
+                snapshot_frame, delta_frame = await asyncio.wait_for(
+                    self.queue.get(), timeout=min(DISCONNECT_CHECK_INTERVAL, remaining)
+                )
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return None
+                continue
+            if await is_disconnected():
+                return None
+            if self.need_full:
+                self.need_full = False
+                return snapshot_frame
+            return delta_frame
+
+
+class ServerStreamHub:
+    """
+    服务器信息推送中心
+
+    作为服务器采样线程的监听器，每次采样计算一次与上次快照的增量，并在采样线程中
+    把完整快照和增量各编码一次为SSE帧，再把同一组字符串分发给所有订阅者，
+    订阅者数量不影响采集和序列化的开销。
+    """
+
+    def __init__(self):
+        self._subscribers: Set[ServerStreamSubscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._last: Dict[str, Any] = {}
+        self._last_frame: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def publish(self, snapshot: ServerInfo) -> None:
+        """
+        发布新快照（在采样线程中调用）
+        """
+        full = snapshot.model_dump(mode="json")
+        with self._lock:
+            delta = {k: v for k, v in full.items() if self._last.get(k) != v}
+            self._last = full
+            # 没有订阅者时不编码，新订阅者需要时再编码
+            self._last_frame = None
+        if not self._subscribers or self._loop is None:
+            return
+        snapshot_frame = _frame("snapshot", full)
+        with self._lock:
+            if self._last is full:
+                self._last_frame = snapshot_frame
+        message = (snapshot_frame, _frame("delta", delta))
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, message)
+        except RuntimeError:
+            # 事件循环已关闭
+            self._loop = None
+
+    def _dispatch(self, message: Tuple[str, str]) -> None:
+        for subscriber in list(self._subscribers):
+            subscriber.offer(message)
+
+    def subscribe(self) -> ServerStreamSubscriber:
+        """新增订阅者（在事件循环中调用）"""
+        self._loop = asyncio.get_running_loop()
+        subscriber = ServerStreamSubscriber()
+        with self._lock:
+            if self._last_frame is None and self._last:
+                self._last_frame = _frame("snapshot", self._last)
+            last_frame = self._last_frame
+        if last_frame is not None:
+            subscriber.offer((last_frame, last_frame))
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: ServerStreamSubscriber) -> None:
+        """移除订阅者"""
+        self._subscribers.discard(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        """订阅统计"""
+        return {
+            "subscribers": len(self._subscribers),
+            "dropped": sum(s.dropped for s in list(self._subscribers)),
+        }
+
+
+server_stream_hub = ServerStreamHub()
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app.models.system.dept import SysDept
 from app.common.constants import StatusEnum, DeleteFlagEnum
 from app.common.exception import BusinessException
+from app.db.search import search_contains
 
 class DeptService:
     """部门服务类"""
@@ -28,7 +29,7 @@ class DeptService:
         
         # 应用过滤条件
         if dept_name:
-            query = query.filter(SysDept.dept_name.like(f"%{dept_name}%"))
+            query = query.filter(search_contains(db, SysDept.dept_name, dept_name))
         if status:
             query = query.filter(SysDept.status == status)
         
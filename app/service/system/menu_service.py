@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app.models.system.menu import SysMenu
 from app.common.constants import StatusEnum, VisibleEnum, MenuTypeEnum
 from app.common.exception import BusinessException
+from app.db.search import search_contains
 
 class MenuService:
     """菜单服务类"""
@@ -25,7 +26,7 @@ class MenuService:
         
         # 应用过滤条件
         if menu_name:
-            query = query.filter(SysMenu.menu_name.like(f"%{menu_name}%"))
+            query = query.filter(search_contains(db, SysMenu.menu_name, menu_name))
         if status:
             query = query.filter(SysMenu.status == status)
         
@@ -5,6 +5,7 @@ from sqlalchemy.orm import Session
 from app.models.system.post import SysPost
 from app.common.constants import StatusEnum
 from app.common.exception import BusinessException
+from app.db.search import search_contains
 
 class PostService:
     """岗位服务类"""
@@ -33,9 +34,9 @@ class PostService:
         
         # 应用过滤条件
         if post_code:
-            query = query.filter(SysPost.post_code.like(f"%{post_code}%"))
+            query = query.filter(search_contains(db, SysPost.post_code, post_code))
         if post_name:
-            query = query.filter(SysPost.post_name.like(f"%{post_name}%"))
+            query = query.filter(search_contains(db, SysPost.post_name, post_name))
         if status:
             query = query.filter(SysPost.status == status)
         
@@ -8,6 +8,7 @@ from app.models.system.dept import SysDept
 from app.schemas.system.role import RoleCreate, RoleUpdate
 from app.common.exception import BusinessException
 from app.common.constants import StatusEnum, DeleteFlagEnum
+from app.db.search import search_contains
 
 class RoleService:
     """角色服务类"""
@@ -44,9 +45,9 @@ class RoleService:
         
         # 应用过滤条件
         if role_name:
-            query = query.filter(SysRole.role_name.like(f"%{role_name}%"))
+            query = query.filter(search_contains(db, SysRole.role_name, role_name))
         if role_key:
-            query = query.filter(SysRole.role_key.like(f"%{role_key}%"))
+            query = query.filter(search_contains(db, SysRole.role_key, role_key))
         if status:
             query = query.filter(SysRole.status == status)
         if begin_time and end_time:
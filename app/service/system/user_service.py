@@ -10,6 +10,7 @@ from app.models.system.post import SysPost
 from app.schemas.system.user import UserCreate, UserUpdate
 from app.common.exception import BusinessException
 from app.common.constants import UserStatusEnum, DeleteFlagEnum
+from app.db.search import search_contains
 
 class UserService:
     """用户服务类"""
@@ -59,9 +60,9 @@ class UserService:
         
         # 应用过滤条件
         if username:
-            query = query.filter(SysUser.username.like(f"%{username}%"))
+            query = query.filter(search_contains(db, SysUser.username, username))
         if nickname:
-            query = query.filter(SysUser.nickname.like(f"%{nickname}%"))
+            query = query.filter(search_contains(db, SysUser.nickname, nickname))
         if status:
             query = query.filter(SysUser.status == status)
         if dept_id:
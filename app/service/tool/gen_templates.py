@@ -0,0 +1,544 @@
+"""
+代码生成默认模板
+
+模板目录中缺少某个类别时写入这些模板，只在第一次生成代码时导入
+"""
+from typing import Dict
+
+DEFAULT_TEMPLATES: Dict[str, str] = {
+    "model.py.j2": '''from typing import Optional
+from datetime import datetime
+from sqlalchemy import Column, String, Integer, DateTime
+from app.db.base_class import Base
+
+class {{ table.class_name }}(Base):
+    """
+    {{ table.table_comment or table.class_name }}
+    """
+    __tablename__ = "{{ table.table_name }}"
+    
+    {% for column in columns %}
+    {{ column.field_name }} = Column({{ column.python_type | title }}{% if column.column_type %}({{ column.column_type.replace('(', ', ').replace(')', '') }}){% endif %}, {% if column.is_pk == '1' %}primary_key=True, {% endif %}{% if column.is_pk == '1' %}index=True, {% endif %}{% if column.is_increment == '1' %}autoincrement=True, {% endif %}{% if column.is_required == '1' %}nullable=False, {% endif %}comment="{{ column.column_comment }}")
+    {% endfor %}
+''',
+    "schema.py.j2": '''from typing import Optional
+from datetime import datetime
+from pydantic import BaseModel, Field
+
+class {{ table.class_name }}Base(BaseModel):
+    """{{ table.table_comment or table.class_name }}基础信息"""
+    {% for column in not_pk_columns %}
+    {{ column.field_name }}: {% if column.is_required != '1' %}Optional[{% endif %}{{ column.python_type }}{% if column.is_required != '1' %}]{% endif %} = {% if column.is_required != '1' %}None{% else %}Field(..., description="{{ column.column_comment }}"){% endif %}{% if column.is_required != '1' %} = Field(None, description="{{ column.column_comment }}"){% endif %}
+    {% endfor %}
+
+class {{ table.class_name }}Create({{ table.class_name }}Base):
+    """创建{{ table.table_comment or table.class_name }}"""
+    pass
+
+class {{ table.class_name }}Update({{ table.class_name }}Base):
+    """更新{{ table.table_comment or table.class_name }}"""
+    pass
+
+class {{ table.class_name }}InDB({{ table.class_name }}Base):
+    """数据库中的{{ table.table_comment or table.class_name }}"""
+    {% for column in pk_columns %}
+    {{ column.field_name }}: {{ column.python_type }}
+    {% endfor %}
+    create_time: Optional[datetime] = None
+    update_time: Optional[datetime] = None
+    
+    class Config:
+        orm_mode = True
+''',
+    "crud.py.j2": '''from typing import List, Optional, Dict, Any, Union
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, desc
+from fastapi.encoders import jsonable_encoder
+
+from app.models.{{ table.module_name }}.{{ table.business_name }} import {{ table.class_name }}
+from app.schemas.{{ table.module_name }}.{{ table.business_name }} import {{ table.class_name }}Create, {{ table.class_name }}Update
+
+class CRUD{{ table.class_name }}:
+    def get(self, db: Session, id: int) -> Optional[{{ table.class_name }}]:
+        return db.query({{ table.class_name }}).filter({{ table.class_name }}.id == id).first()
+    
+    def get_multi(self, db: Session, *, skip: int = 0, limit: int = 100) -> List[{{ table.class_name }}]:
+        return db.query({{ table.class_name }}).order_by(desc({{ table.class_name }}.create_time)).offset(skip).limit(limit).all()
+    
+    def create(self, db: Session, *, obj_in: {{ table.class_name }}Create) -> {{ table.class_name }}:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = {{ table.class_name }}(**obj_in_data)
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    
+    def update(self, db: Session, *, db_obj: {{ table.class_name }}, obj_in: Union[{{ table.class_name }}Update, Dict[str, Any]]) -> {{ table.class_name }}:
+        obj_data = jsonable_encoder(db_obj)
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.dict(exclude_unset=True)
+        for field in obj_data:
+            if field in update_data:
+                setattr(db_obj, field, update_data[field])
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+    
+    def remove(self, db: Session, *, id: int) -> {{ table.class_name }}:
+        obj = db.query({{ table.class_name }}).get(id)
+        db.delete(obj)
+        db.commit()
+        return obj
+
+{{ table.business_name }} = CRUD{{ table.class_name }}()
+''',
+    "api.py.j2": '''from typing import Any, List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.api import deps
+from app.models.{{ table.module_name }}.{{ table.business_name }} import {{ table.class_name }}
+from app.schemas.{{ table.module_name }}.{{ table.business_name }} import {{ table.class_name }}Create, {{ table.class_name }}Update, {{ table.class_name }}InDB
+from app.crud.{{ table.module_name }}.{{ table.business_name }} import {{ table.business_name }}
+
+router = APIRouter()
+
+@router.get("/", response_model=List[{{ table.class_name }}InDB])
+def read_{{ table.business_name }}s(
+    db: Session = Depends(deps.get_db),
+    skip: int = 0,
+    limit: int = 100,
+) -> Any:
+    """
+    获取{{ table.table_comment or table.class_name }}列表
+    """
+    {{ table.business_name }}s = {{ table.business_name }}.get_multi(db, skip=skip, limit=limit)
+    return {{ table.business_name }}s
+
+@router.post("/", response_model={{ table.class_name }}InDB)
+def create_{{ table.business_name }}(
+    *,
+    db: Session = Depends(deps.get_db),
+    {{ table.business_name }}_in: {{ table.class_name }}Create,
+) -> Any:
+    """
+    创建{{ table.table_comment or table.class_name }}
+    """
+    {{ table.business_name }}_obj = {{ table.business_name }}.create(db, obj_in={{ table.business_name }}_in)
+    return {{ table.business_name }}_obj
+
+@router.get("/{id}", response_model={{ table.class_name }}InDB)
+def read_{{ table.business_name }}(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+) -> Any:
+    """
+    获取指定{{ table.table_comment or table.class_name }}
+    """
+    {{ table.business_name }}_obj = {{ table.business_name }}.get(db, id=id)
+    if not {{ table.business_name }}_obj:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return {{ table.business_name }}_obj
+
+@router.put("/{id}", response_model={{ table.class_name }}InDB)
+def update_{{ table.business_name }}(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+    {{ table.business_name }}_in: {{ table.class_name }}Update,
+) -> Any:
+    """
+    更新{{ table.table_comment or table.class_name }}
+    """
+    {{ table.business_name }}_obj = {{ table.business_name }}.get(db, id=id)
+    if not {{ table.business_name }}_obj:
+        raise HTTPException(status_code=404, detail="Item not found")
+    {{ table.business_name }}_obj = {{ table.business_name }}.update(db, db_obj={{ table.business_name }}_obj, obj_in={{ table.business_name }}_in)
+    return {{ table.business_name }}_obj
+
+@router.delete("/{id}", response_model={{ table.class_name }}InDB)
+def delete_{{ table.business_name }}(
+    *,
+    db: Session = Depends(deps.get_db),
+    id: int,
+) -> Any:
+    """
+    删除{{ table.table_comment or table.class_name }}
+    """
+    {{ table.business_name }}_obj = {{ table.business_name }}.get(db, id=id)
+    if not {{ table.business_name }}_obj:
+        raise HTTPException(status_code=404, detail="Item not found")
+    {{ table.business_name }}_obj = {{ table.business_name }}.remove(db, id=id)
+    return {{ table.business_name }}_obj
+''',
+    "vue_api.js.j2": '''import request from '@/request'
+
+// 查询{{ table.table_comment or table.class_name }}列表
+export function list{{ table.class_name }}(query) {
+  return request({
+    url: '/{{ table.module_name }}/{{ table.business_name }}/list',
+    method: 'get',
+    params: query
+  })
+}
+
+// 查询{{ table.table_comment or table.class_name }}详细
+export function get{{ table.class_name }}(id) {
+  return request({
+    url: '/{{ table.module_name }}/{{ table.business_name }}/' + id,
+    method: 'get'
+  })
+}
+
+// 新增{{ table.table_comment or table.class_name }}
+export function add{{ table.class_name }}(data) {
+  return request({
+    url: '/{{ table.module_name }}/{{ table.business_name }}',
+    method: 'post',
+    data: data
+  })
+}
+
+// 修改{{ table.table_comment or table.class_name }}
+export function update{{ table.class_name }}(id, data) {
+  return request({
+    url: '/{{ table.module_name }}/{{ table.business_name }}/' + id,
+    method: 'put',
+    data: data
+  })
+}
+
+// 删除{{ table.table_comment or table.class_name }}
+export function del{{ table.class_name }}(id) {
+  return request({
+    url: '/{{ table.module_name }}/{{ table.business_name }}/' + id,
+    method: 'delete'
+  })
+}
+
+// 导出{{ table.table_comment or table.class_name }}
+export function export{{ table.class_name }}(query) {
+  return request({
+    url: '/{{ table.module_name }}/{{ table.business_name }}/export',
+    method: 'get',
+    params: query
+  })
+}
+''',
+    "vue_index.vue.j2": '''<template>
+  <div class="app-container">
+    <el-card>
+      <template #header>
+        <div class="card-header">
+          <span>{{ table.table_comment or table.class_name }}管理</span>
+        </div>
+      </template>
+      
+      <!-- 搜索区域 -->
+      <el-form :model="queryParams" ref="queryForm" :inline="true" v-show="showSearch">
+        {% for column in columns %}
+        {% if column.is_query == '1' %}
+        <el-form-item label="{{ column.column_comment }}" prop="{{ column.field_name }}">
+          <el-input
+            v-model="queryParams.{{ column.field_name }}"
+            placeholder="请输入{{ column.column_comment }}"
+            clearable
+            @keyup.enter.native="handleQuery"
+          />
+        </el-form-item>
+        {% endif %}
+        {% endfor %}
+        <el-form-item>
+          <el-button type="primary" icon="el-icon-search" @click="handleQuery">搜索</el-button>
+          <el-button icon="el-icon-refresh" @click="resetQuery">重置</el-button>
+        </el-form-item>
+      </el-form>
+
+      <!-- 操作工具栏 -->
+      <el-row :gutter="10" class="mb8">
+        <el-col :span="1.5">
+          <el-button
+            type="primary"
+            plain
+            icon="el-icon-plus"
+            @click="handleAdd"
+            v-hasPermi="['{{ table.module_name }}:{{ table.business_name }}:add']"
+          >新增</el-button>
+        </el-col>
+        <el-col :span="1.5">
+          <el-button
+            type="success"
+            plain
+            icon="el-icon-edit"
+            :disabled="single"
+            @click="handleUpdate"
+            v-hasPermi="['{{ table.module_name }}:{{ table.business_name }}:edit']"
+          >修改</el-button>
+        </el-col>
+        <el-col :span="1.5">
+          <el-button
+            type="danger"
+            plain
+            icon="el-icon-delete"
+            :disabled="multiple"
+            @click="handleDelete"
+            v-hasPermi="['{{ table.module_name }}:{{ table.business_name }}:remove']"
+          >删除</el-button>
+        </el-col>
+        <el-col :span="1.5">
+          <el-button
+            type="warning"
+            plain
+            icon="el-icon-download"
+            @click="handleExport"
+            v-hasPermi="['{{ table.module_name }}:{{ table.business_name }}:export']"
+          >导出</el-button>
+        </el-col>
+        <right-toolbar :showSearch.sync="showSearch" @queryTable="getList"></right-toolbar>
+      </el-row>
+
+      <!-- 数据表格 -->
+      <el-table v-loading="loading" :data="dataList" @selection-change="handleSelectionChange">
+        <el-table-column type="selection" width="55" align="center" />
+        <el-table-column label="序号" type="index" width="50" align="center" />
+        {% for column in columns %}
+        {% if column.is_list == '1' %}
+        <el-table-column label="{{ column.column_comment }}" prop="{{ column.field_name }}" {% if column.list_width %}width="{{ column.list_width }}"{% endif %} {% if column.dict_type %}:formatter="dict{{ column.dict_type }}Format"{% endif %} />
+        {% endif %}
+        {% endfor %}
+        <el-table-column label="操作" align="center" class-name="small-padding fixed-width">
+          <template slot-scope="scope">
+            <el-button
+              size="mini"
+              type="text"
+              icon="el-icon-edit"
+              @click="handleUpdate(scope.row)"
+              v-hasPermi="['{{ table.module_name }}:{{ table.business_name }}:edit']"
+            >修改</el-button>
+            <el-button
+              size="mini"
+              type="text"
+              icon="el-icon-delete"
+              @click="handleDelete(scope.row)"
+              v-hasPermi="['{{ table.module_name }}:{{ table.business_name }}:remove']"
+            >删除</el-button>
+          </template>
+        </el-table-column>
+      </el-table>
+      
+      <!-- 分页组件 -->
+      <pagination
+        v-show="total > 0"
+        :total="total"
+        :page.sync="queryParams.pageNum"
+        :limit.sync="queryParams.pageSize"
+        @pagination="getList"
+      />
+
+      <!-- 添加或修改对话框 -->
+      <el-dialog :title="title" :visible.sync="open" width="500px" append-to-body>
+        <el-form ref="form" :model="form" :rules="rules" label-width="100px">
+          {% for column in columns %}
+          {% if column.is_edit == '1' %}
+          <el-form-item label="{{ column.column_comment }}" prop="{{ column.field_name }}">
+            {% if column.html_type == 'input' %}
+            <el-input v-model="form.{{ column.field_name }}" placeholder="请输入{{ column.column_comment }}" />
+            {% elif column.html_type == 'textarea' %}
+            <el-input v-model="form.{{ column.field_name }}" type="textarea" placeholder="请输入{{ column.column_comment }}" />
+            {% elif column.html_type == 'select' and column.dict_type %}
+            <el-select v-model="form.{{ column.field_name }}" placeholder="请选择{{ column.column_comment }}">
+              <el-option
+                v-for="dict in dict.type.{{ column.dict_type }}"
+                :key="dict.value"
+                :label="dict.label"
+                :value="dict.value"
+              ></el-option>
+            </el-select>
+            {% elif column.html_type == 'radio' and column.dict_type %}
+            <el-radio-group v-model="form.{{ column.field_name }}">
+              <el-radio
+                v-for="dict in dict.type.{{ column.dict_type }}"
+                :key="dict.value"
+                :label="dict.value"
+              >{{dict.label}}</el-radio>
+            </el-radio-group>
+            {% elif column.html_type == 'datetime' %}
+            <el-date-picker
+              v-model="form.{{ column.field_name }}"
+              type="datetime"
+              placeholder="选择日期时间"
+            />
+            {% endif %}
+          </el-form-item>
+          {% endif %}
+          {% endfor %}
+        </el-form>
+        <template #footer>
+          <div class="dialog-footer">
+            <el-button type="primary" @click="submitForm">确 定</el-button>
+            <el-button @click="cancel">取 消</el-button>
+          </div>
+        </template>
+      </el-dialog>
+    </el-card>
+  </div>
+</template>
+
+<script>
+import { list{{ table.class_name }}, get{{ table.class_name }}, add{{ table.class_name }}, update{{ table.class_name }}, del{{ table.class_name }} } from "@/api/{{ table.module_name }}/{{ table.business_name }}";
+
+export default {
+  name: "{{ table.class_name }}",
+  {% if dict_types and dict_types|length > 0 %}
+  dicts: [{% for dict_type in dict_types %}'{{ dict_type }}'{% if not loop.last %}, {% endif %}{% endfor %}],
+  {% endif %}
+  data() {
+    return {
+      // 遮罩层
+      loading: false,
+      // 选中数组
+      ids: [],
+      // 非单个禁用
+      single: true,
+      // 非多个禁用
+      multiple: true,
+      // 显示搜索条件
+      showSearch: true,
+      // 总条数
+      total: 0,
+      // {{ table.table_comment or table.class_name }}表格数据
+      dataList: [],
+      // 弹出层标题
+      title: "",
+      // 是否显示弹出层
+      open: false,
+      // 查询参数
+      queryParams: {
+        pageNum: 1,
+        pageSize: 10,
+        {% for column in columns %}
+        {% if column.is_query == '1' %}
+        {{ column.field_name }}: null,
+        {% endif %}
+        {% endfor %}
+      },
+      // 表单参数
+      form: {},
+      // 表单校验
+      rules: {
+        {% for column in columns %}
+        {% if column.is_required == '1' and column.is_edit == '1' %}
+        {{ column.field_name }}: [
+          { required: true, message: "{{ column.column_comment }}不能为空", trigger: "blur" }
+        ],
+        {% endif %}
+        {% endfor %}
+      }
+    };
+  },
+  created() {
+    this.getList();
+  },
+  methods: {
+    /** 查询{{ table.table_comment or table.class_name }}列表 */
+    getList() {
+      this.loading = true;
+      list{{ table.class_name }}(this.queryParams).then(response => {
+        this.dataList = response.data.items || response.data;
+        this.total = response.data.total || this.dataList.length;
+        this.loading = false;
+      });
+    },
+    // 取消按钮
+    cancel() {
+      this.open = false;
+      this.reset();
+    },
+    // 表单重置
+    reset() {
+      this.form = {
+        {% for column in columns %}
+        {% if column.is_edit == '1' %}
+        {{ column.field_name }}: null,
+        {% endif %}
+        {% endfor %}
+      };
+      this.resetForm("form");
+    },
+    /** 搜索按钮操作 */
+    handleQuery() {
+      this.queryParams.pageNum = 1;
+      this.getList();
+    },
+    /** 重置按钮操作 */
+    resetQuery() {
+      this.resetForm("queryForm");
+      this.handleQuery();
+    },
+    // 多选框选中数据
+    handleSelectionChange(selection) {
+      this.ids = selection.map(item => item.id)
+      this.single = selection.length!==1
+      this.multiple = !selection.length
+    },
+    /** 新增按钮操作 */
+    handleAdd() {
+      this.reset();
+      this.open = true;
+      this.title = "添加{{ table.table_comment or table.class_name }}";
+    },
+    /** 修改按钮操作 */
+    handleUpdate(row) {
+      this.reset();
+      const id = row.id || this.ids[0]
+      get{{ table.class_name }}(id).then(response => {
+        this.form = response.data;
+        this.open = true;
+        this.title = "修改{{ table.table_comment or table.class_name }}";
+      });
+    },
+    /** 提交按钮 */
+    submitForm() {
+      this.$refs["form"].validate(valid => {
+        if (valid) {
+          if (this.form.id != null) {
+            update{{ table.class_name }}(this.form.id, this.form).then(response => {
+              this.$modal.msgSuccess("修改成功");
+              this.open = false;
+              this.getList();
+            });
+          } else {
+            add{{ table.class_name }}(this.form).then(response => {
+              this.$modal.msgSuccess("新增成功");
+              this.open = false;
+              this.getList();
+            });
+          }
+        }
+      });
+    },
+    /** 删除按钮操作 */
+    handleDelete(row) {
+      const ids = row.id || this.ids;
+      this.$modal.confirm('是否确认删除编号为"' + ids + '"的数据项？').then(function() {
+        return del{{ table.class_name }}(ids);
+      }).then(() => {
+        this.getList();
+        this.$modal.msgSuccess("删除成功");
+      }).catch(() => {});
+    },
+    /** 导出按钮操作 */
+    handleExport() {
+      this.download('{{ table.module_name }}/{{ table.business_name }}/export', {
+        ...this.queryParams
+      }, `{{ table.business_name }}_${new Date().getTime()}.xlsx`)
+    }
+  }
+};
+</script>
+''',
+}
@@ -1,7 +1,10 @@
 from typing import Dict, List, Any, Optional
+import logging
 import re
 from sqlalchemy.engine import Inspector
 
+logger = logging.getLogger(__name__)
+
 
 def camel_case(s: str) -> str:
     """
@@ -34,7 +37,7 @@ def get_table_info(inspector: Inspector, table_name: str) -> Optional[Dict[str,
             "comment": table_comment
         }
     except Exception as e:
-        print(f"获取表 {table_name} 信息失败: {str(e)}")
+        logger.warning("获取表 %s 信息失败: %s", table_name, e)
         return None
 
 
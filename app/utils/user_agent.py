@@ -0,0 +1,37 @@
+from typing import Tuple
+
+# 按顺序匹配，Edge、Opera等基于Chromium的浏览器需要排在Chrome之前
+BROWSERS = (
+    ("Edg/", "Edge"),
+    ("OPR/", "Opera"),
+    ("MicroMessenger", "WeChat"),
+    ("Firefox/", "Firefox"),
+    ("Chrome/", "Chrome"),
+    ("Safari/", "Safari"),
+    ("MSIE ", "Internet Explorer"),
+    ("Trident/", "Internet Explorer"),
+    ("curl/", "curl"),
+    ("python-requests", "python-requests"),
+)
+
+OPERATING_SYSTEMS = (
+    ("Windows", "Windows"),
+    ("Android", "Android"),
+    ("iPhone", "iOS"),
+    ("iPad", "iOS"),
+    ("Mac OS X", "Mac OS X"),
+    ("Linux", "Linux"),
+)
+
+
+def parse_user_agent(user_agent: str) -> Tuple[str, str]:
+    """
+    从User-Agent中识别浏览器和操作系统（只做子串匹配，不引入解析库）
+    :param user_agent: 请求头User-Agent
+    :return: (浏览器, 操作系统)，无法识别时为Unknown
+    """
+    if not user_agent:
+        return "Unknown", "Unknown"
+    browser = next((name for token, name in BROWSERS if token in user_agent), "Unknown")
+    os_name = next((name for token, name in OPERATING_SYSTEMS if token in user_agent), "Unknown")
+    return browser, os_name
@@ -0,0 +1,106 @@
+"""
+导入耗时检查
+
+在新的Python进程中用 -X importtime 导入app.main，多次测量取中位数，
+超过预算或导入了应延迟加载的模块时以非零状态退出。tests/test_import_time.py用同样的测量
+在pytest中执行相同的检查，本脚本用于手动查看耗时最多的模块。
+导入app.main不应连接数据库或Redis，也不应创建目录，所以不需要可用的数据库。
+
+用法:
+    python check_import_time.py                   # 默认预算
+    python check_import_time.py --budget 1500     # 指定预算（毫秒）
+    python check_import_time.py --runs 7 --top 20 # 测量次数和耗时最多的模块数
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.abspath(os.path.dirname(__file__))
+
+# 默认预算（毫秒），可用环境变量IMPORT_TIME_BUDGET_MS覆盖
+DEFAULT_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 2000))
+
+# 导入app.main时不应加载的模块（只在首次使用或后台预热时加载）
+LAZY_MODULES = [
+    "jinja2",
+    "app.service.tool.gen_templates",
+]
+
+
+def measure(module: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """
+    在子进程中导入模块
+    :return: (总耗时毫秒, 模块名 -> (自身耗时微秒, 累计耗时微秒))
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr[-4000:])
+        raise SystemExit(f"导入{module}失败")
+
+    modules: Dict[str, Tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        modules[name] = (int(parts[0]), int(parts[1]))
+    total = sum(own for own, _ in modules.values()) / 1000
+    return total, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="检查导入app.main的耗时")
+    parser.add_argument("--module", default="app.main", help="要导入的模块")
+    parser.add_argument(
+        "--budget", type=float, default=DEFAULT_BUDGET_MS,
+        help="预算（毫秒），默认读取环境变量IMPORT_TIME_BUDGET_MS，未设置时为2000",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="测量次数")
+    parser.add_argument("--top", type=int, default=15, help="列出累计耗时最多的项目模块数")
+    args = parser.parse_args()
+
+    # 第一次导入会编译字节码，不计入结果
+    measure(args.module)
+    totals: List[float] = []
+    modules: Dict[str, Tuple[int, int]] = {}
+    for _ in range(max(1, args.runs)):
+        total, modules = measure(args.module)
+        totals.append(total)
+    median = statistics.median(totals)
+
+    project = sorted(
+        ((name, cumulative) for name, (_, cumulative) in modules.items() if name.split(".")[0] == "app"),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+    print(f"导入{args.module}耗时（{len(totals)}次）: 中位数{median:.0f}ms，最小{min(totals):.0f}ms，最大{max(totals):.0f}ms")
+    print("累计耗时最多的项目模块:")
+    for name, cumulative in project[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failed = False
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        failed = True
+        print(f"失败: 以下模块应延迟加载，但在导入时已加载: {', '.join(eager)}")
+    if median > args.budget:
+        failed = True
+        print(f"失败: 导入耗时{median:.0f}ms超过预算{args.budget:.0f}ms")
+    if not failed:
+        print(f"通过: 预算{args.budget:.0f}ms")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
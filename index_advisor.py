@@ -0,0 +1,219 @@
+"""
+索引顾问
+
+把CRUD模块中的热点查询形态逐条用EXPLAIN执行，报告全表扫描和额外排序（filesort）。
+每条查询登记了对应的CRUD方法，分析前检查方法是否仍然存在，方法改名或删除时该条报错，提醒同步更新查询。
+建议在导入了足够数据的测试库上运行，数据量太小时优化器可能直接选择全表扫描。
+
+用法:
+    python index_advisor.py                                  # 分析当前DATABASE_URL
+    python index_advisor.py --url mysql+pymysql://.../test   # 分析指定数据库
+    python index_advisor.py --url ... --seed 20000           # 先写入带标记的测试数据再分析
+    python index_advisor.py --url ... --cleanup              # 删除--seed写入的测试数据
+
+--seed和--cleanup会写入数据，必须用--url显式指定测试库，不会使用DATABASE_URL。
+"""
+import argparse
+import importlib
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, delete, desc, func, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+
+# 将项目根目录添加到Python路径
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from app.db.session import engine as default_engine
+from app.models.monitor.job import SysJobLog
+from app.models.system.dict import SysDictData
+from app.models.system.user import SysUser
+from app.models.utils.relation import SysRoleMenu
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# --seed写入的数据使用该标记，便于清理
+SEED_MARK = "index_advisor"
+
+# (名称, 来源CRUD方法, 查询语句)，查询语句与来源方法中的查询保持一致
+# 只登记带过滤条件的查询，读取全表的查询（如菜单树）本身就是全表扫描，不在分析范围内
+QUERIES: List[Tuple[str, str, Any]] = [
+    (
+        "检查部门是否有关联用户",
+        "app.crud.system.dept.CRUDDept.has_users",
+        select(SysUser).where(SysUser.dept_id == 100).limit(1),
+    ),
+    (
+        "按类型获取启用的字典数据",
+        "app.crud.system.dict.CRUDDictData.get_by_dict_type",
+        select(SysDictData)
+        .where(SysDictData.dict_type == "sys_user_sex", SysDictData.status == "0")
+        .order_by(SysDictData.dict_sort),
+    ),
+    (
+        "获取角色关联的菜单",
+        "app.crud.system.menu.CRUDMenu.get_role_menu_ids",
+        select(SysRoleMenu).where(SysRoleMenu.c.role_id == 1),
+    ),
+    (
+        "任务日志分页",
+        "app.crud.monitor.job.CRUDJobLog.search_by_keyword",
+        select(SysJobLog)
+        .where(SysJobLog.job_group == "DEFAULT", SysJobLog.status == "1")
+        .order_by(desc(SysJobLog.job_log_id))
+        .limit(10),
+    ),
+    (
+        "任务日志按时间范围查询",
+        "app.crud.monitor.job.CRUDJobLog.search_by_keyword",
+        select(SysJobLog)
+        .where(SysJobLog.create_time >= datetime(2025, 1, 1), SysJobLog.create_time <= datetime(2025, 1, 2))
+        .order_by(desc(SysJobLog.job_log_id))
+        .limit(10),
+    ),
+    (
+        "任务日志保留策略",
+        "app.crud.monitor.job.CRUDJobLog.get_purge_upper_id",
+        select(func.max(SysJobLog.job_log_id)).where(SysJobLog.create_time < datetime(2025, 1, 1)),
+    ),
+]
+
+
+def _source_exists(source: str) -> bool:
+    """检查来源CRUD方法是否存在，source为模块路径加类名和方法名"""
+    module_name, class_name, method_name = source.rsplit(".", 2)
+    try:
+        module = importlib.import_module(module_name)
+    except ImportError:
+        return False
+    return hasattr(getattr(module, class_name, None), method_name)
+
+
+def _compile(engine: Engine, statement: Any) -> str:
+    return str(statement.compile(dialect=engine.dialect, compile_kwargs={"literal_binds": True}))
+
+
+def _explain_mysql(conn: Connection, sql: str) -> List[str]:
+    problems = []
+    rows = conn.execute(text(f"EXPLAIN {sql}")).mappings().all()
+    for row in rows:
+        extra = row.get("Extra") or ""
+        if row.get("type") == "ALL":
+            problems.append(f"全表扫描 {row.get('table')}（估算{row.get('rows')}行）")
+        if "Using filesort" in extra:
+            problems.append(f"额外排序 {row.get('table')}")
+        if "Using temporary" in extra:
+            problems.append(f"临时表 {row.get('table')}")
+    return problems
+
+
+def _explain_sqlite(conn: Connection, sql: str) -> List[str]:
+    problems = []
+    for row in conn.execute(text(f"EXPLAIN QUERY PLAN {sql}")).all():
+        detail = row[-1]
+        if detail.startswith("SCAN") and "USING" not in detail:
+            problems.append(f"全表扫描 {detail}")
+        if "TEMP B-TREE" in detail:
+            problems.append(f"额外排序 {detail}")
+    return problems
+
+
+EXPLAINERS: Dict[str, Callable[[Connection, str], List[str]]] = {
+    "mysql": _explain_mysql,
+    "sqlite": _explain_sqlite,
+}
+
+
+def analyze(engine: Engine) -> int:
+    """执行分析，返回有问题的查询数（包括来源方法已不存在的查询）"""
+    explainer = EXPLAINERS.get(engine.dialect.name)
+    if explainer is None:
+        logger.error(f"不支持的数据库: {engine.dialect.name}")
+        return -1
+
+    failed = 0
+    with engine.connect() as conn:
+        for name, source, statement in QUERIES:
+            if not _source_exists(source):
+                logger.error(f"[{name}] 来源方法{source}不存在，请同步更新QUERIES")
+                failed += 1
+                continue
+            sql = _compile(engine, statement)
+            try:
+                problems = explainer(conn, sql)
+            except Exception as e:
+                logger.error(f"[{name}] EXPLAIN失败: {e}")
+                failed += 1
+                continue
+            if problems:
+                failed += 1
+                logger.warning(f"[{name}] {source}")
+                for problem in problems:
+                    logger.warning(f"    {problem}")
+                logger.warning(f"    SQL: {' '.join(sql.split())}")
+            else:
+                logger.info(f"[{name}] 使用索引")
+    logger.info(f"共分析{len(QUERIES)}条查询，{failed}条存在问题")
+    return failed
+
+
+def seed(engine: Engine, count: int) -> None:
+    """写入测试数据，使优化器按真实数据量选择执行计划"""
+    now = datetime.now()
+    with engine.begin() as conn:
+        for start in range(0, count, 1000):
+            size = min(1000, count - start)
+            conn.execute(insert(SysJobLog), [
+                {
+                    "job_name": f"{SEED_MARK}_{i % 50}",
+                    "job_group": "DEFAULT" if i % 3 else "SYSTEM",
+                    "invoke_target": SEED_MARK,
+                    "job_message": "执行成功" if i % 10 else "执行失败",
+                    "status": "0" if i % 10 else "1",
+                    "create_time": now - timedelta(minutes=i),
+                }
+                for i in range(start, start + size)
+            ])
+            conn.execute(insert(SysDictData), [
+                {
+                    "dict_sort": i % 20,
+                    "dict_label": f"{SEED_MARK}_{i}",
+                    "dict_value": str(i),
+                    "dict_type": f"{SEED_MARK}_{i % 200}",
+                    "status": "0" if i % 5 else "1",
+                    "create_by": SEED_MARK,
+                }
+                for i in range(start, start + size)
+            ])
+    logger.info(f"已写入{count}条任务日志和字典数据")
+
+
+def cleanup(engine: Engine) -> None:
+    """删除--seed写入的测试数据"""
+    with engine.begin() as conn:
+        logs = conn.execute(delete(SysJobLog).where(SysJobLog.invoke_target == SEED_MARK)).rowcount
+        dicts = conn.execute(delete(SysDictData).where(SysDictData.create_by == SEED_MARK)).rowcount
+    logger.info(f"已删除{logs}条任务日志和{dicts}条字典数据")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="用EXPLAIN检查热点查询是否使用索引")
+    parser.add_argument("--url", help="数据库连接地址，默认使用DATABASE_URL")
+    parser.add_argument("--seed", type=int, default=0, help="分析前写入的测试数据行数，需要同时指定--url")
+    parser.add_argument("--cleanup", action="store_true", help="删除测试数据后退出，需要同时指定--url")
+    args = parser.parse_args()
+
+    if (args.seed > 0 or args.cleanup) and not args.url:
+        parser.error("--seed和--cleanup会写入数据，必须用--url显式指定测试库")
+    engine = create_engine(args.url) if args.url else default_engine
+
+    if args.cleanup:
+        cleanup(engine)
+        sys.exit(0)
+    if args.seed > 0:
+        seed(engine, args.seed)
+    sys.exit(1 if analyze(engine) else 0)
@@ -0,0 +1,43 @@
+-- 创建定时任务执行小时统计表
+CREATE TABLE IF NOT EXISTS `sys_job_stat_hourly` (
+  `stat_id` int(11) NOT NULL AUTO_INCREMENT COMMENT '统计ID',
+  `job_name` varchar(64) NOT NULL COMMENT '任务名称',
+  `job_group` varchar(64) NOT NULL COMMENT '任务组名',
+  `stat_time` datetime NOT NULL COMMENT '统计周期开始时间',
+  `total_count` int(11) DEFAULT '0' COMMENT '执行次数',
+  `success_count` int(11) DEFAULT '0' COMMENT '成功次数',
+  `fail_count` int(11) DEFAULT '0' COMMENT '失败次数',
+  `timed_count` int(11) DEFAULT '0' COMMENT '有耗时记录的执行次数',
+  `min_duration` double DEFAULT NULL COMMENT '最短耗时（毫秒）',
+  `max_duration` double DEFAULT NULL COMMENT '最长耗时（毫秒）',
+  `sum_duration` double DEFAULT '0' COMMENT '总耗时（毫秒）',
+  `p95_duration` double DEFAULT NULL COMMENT 'P95耗时（毫秒）',
+  `duration_histogram` varchar(500) DEFAULT '' COMMENT '耗时分布直方图',
+  `last_failure_time` datetime DEFAULT NULL COMMENT '最近失败时间',
+  `last_failure_message` varchar(500) DEFAULT NULL COMMENT '最近失败信息',
+  `update_time` datetime DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+  PRIMARY KEY (`stat_id`),
+  UNIQUE KEY `uk_job_stat_hourly` (`job_name`, `job_group`, `stat_time`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='定时任务执行小时统计表';
+
+-- 创建定时任务执行日统计表
+CREATE TABLE IF NOT EXISTS `sys_job_stat_daily` (
+  `stat_id` int(11) NOT NULL AUTO_INCREMENT COMMENT '统计ID',
+  `job_name` varchar(64) NOT NULL COMMENT '任务名称',
+  `job_group` varchar(64) NOT NULL COMMENT '任务组名',
+  `stat_time` datetime NOT NULL COMMENT '统计周期开始时间',
+  `total_count` int(11) DEFAULT '0' COMMENT '执行次数',
+  `success_count` int(11) DEFAULT '0' COMMENT '成功次数',
+  `fail_count` int(11) DEFAULT '0' COMMENT '失败次数',
+  `timed_count` int(11) DEFAULT '0' COMMENT '有耗时记录的执行次数',
+  `min_duration` double DEFAULT NULL COMMENT '最短耗时（毫秒）',
+  `max_duration` double DEFAULT NULL COMMENT '最长耗时（毫秒）',
+  `sum_duration` double DEFAULT '0' COMMENT '总耗时（毫秒）',
+  `p95_duration` double DEFAULT NULL COMMENT 'P95耗时（毫秒）',
+  `duration_histogram` varchar(500) DEFAULT '' COMMENT '耗时分布直方图',
+  `last_failure_time` datetime DEFAULT NULL COMMENT '最近失败时间',
+  `last_failure_message` varchar(500) DEFAULT NULL COMMENT '最近失败信息',
+  `update_time` datetime DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
+  PRIMARY KEY (`stat_id`),
+  UNIQUE KEY `uk_job_stat_daily` (`job_name`, `job_group`, `stat_time`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COMMENT='定时任务执行日统计表';
@@ -378,6 +378,10 @@ INSERT INTO `sys_menu` VALUES (1005, '用户导出', 100, 5, '', '', '', 1, 0, '
 INSERT INTO `sys_menu` VALUES (1006, '用户导入', 100, 6, '', '', '', 1, 0, 'F', '0', '0', 'system:user:import', '#', 'admin', NOW(), '', NULL, '');
 INSERT INTO `sys_menu` VALUES (1007, '重置密码', 100, 7, '', '', '', 1, 0, 'F', '0', '0', 'system:user:resetPwd', '#', 'admin', NOW(), '', NULL, '');
 
+-- 数据监控按钮
+INSERT INTO `sys_menu` VALUES (1101, 'SQL统计查询', 111, 1, '', '', '', 1, 0, 'F', '0', '0', 'monitor:db:list', '#', 'admin', NOW(), '', NULL, '');
+INSERT INTO `sys_menu` VALUES (1102, 'SQL统计清空', 111, 2, '', '', '', 1, 0, 'F', '0', '0', 'monitor:db:remove', '#', 'admin', NOW(), '', NULL, '');
+
 -- ----------------------------
 -- 初始化-用户表数据
 -- ----------------------------
@@ -427,6 +431,8 @@ INSERT INTO `sys_role_menu` VALUES (1, 1004);
 INSERT INTO `sys_role_menu` VALUES (1, 1005);
 INSERT INTO `sys_role_menu` VALUES (1, 1006);
 INSERT INTO `sys_role_menu` VALUES (1, 1007);
+INSERT INTO `sys_role_menu` VALUES (1, 1101);
+INSERT INTO `sys_role_menu` VALUES (1, 1102);
 
 -- 普通角色只有部分菜单权限
 INSERT INTO `sys_role_menu` VALUES (2, 1);
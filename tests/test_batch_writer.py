@@ -0,0 +1,60 @@
+"""
+批量写入的重试、死信和分块重放
+"""
+import json
+from typing import Any, Dict, List
+
+from app.core.batch_writer import BatchWriter
+
+
+class _Sink:
+    """记录每次写入的批次，包含bad字段的记录写入时抛出ValueError"""
+
+    def __init__(self):
+        self.batches: List[List[Dict[str, Any]]] = []
+
+    def __call__(self, records: List[Dict[str, Any]]) -> None:
+        if any(record.get("bad") for record in records):
+            raise ValueError("Data too long")
+        self.batches.append(list(records))
+
+    @property
+    def written(self) -> List[int]:
+        return [record["i"] for batch in self.batches for record in batch]
+
+
+def test_bad_record_is_dead_lettered_after_max_retries(tmp_path):
+    sink = _Sink()
+    spill = str(tmp_path / "log.jsonl")
+    writer = BatchWriter("test", sink, max_batch=10, max_buffer=100, spill_path=spill, max_retries=2)
+    for i in range(8):
+        writer.submit({"i": i, "bad": i == 5})
+
+    assert writer.flush() == 0
+    assert writer.stats()["pending"] == 8
+
+    assert writer.flush() == 7
+    assert sorted(sink.written) == [0, 1, 2, 3, 4, 6, 7]
+    with open(writer.dead_letter_path, encoding="utf-8") as f:
+        assert [json.loads(line)["i"] for line in f] == [5]
+    stats = writer.stats()
+    assert stats["dead_lettered"] == 1
+    assert stats["pending"] == 0
+    assert stats["spilled_segments"] == 0
+
+    # 之后的记录不再被阻塞
+    writer.submit({"i": 8})
+    assert writer.flush() == 1
+
+
+def test_overflow_replay_is_chunked(tmp_path):
+    sink = _Sink()
+    spill = str(tmp_path / "log.jsonl")
+    writer = BatchWriter("test", sink, max_batch=10, max_buffer=10, spill_path=spill)
+    for i in range(35):
+        writer.submit({"i": i})
+    assert writer.stats()["overflowed"]
+
+    assert writer.flush() == 35
+    assert [len(batch) for batch in sink.batches] == [10, 10, 10, 5]
+    assert sink.written == list(range(35))
@@ -0,0 +1,33 @@
+"""
+导入耗时预算
+
+与check_import_time.py使用相同的测量：在新进程中用 -X importtime 导入app.main，
+中位数超过预算（环境变量IMPORT_TIME_BUDGET_MS，默认2000毫秒）或提前加载了应延迟加载的模块时失败。
+"""
+import statistics
+from typing import Dict, Tuple
+
+import pytest
+
+from check_import_time import DEFAULT_BUDGET_MS, LAZY_MODULES, measure
+
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def import_profile() -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    # 第一次导入会编译字节码，不计入结果
+    measure("app.main")
+    results = [measure("app.main") for _ in range(RUNS)]
+    return statistics.median(total for total, _ in results), results[-1][1]
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_lazy_module_not_imported_at_startup(import_profile, module):
+    _, modules = import_profile
+    assert module not in modules, f"{module}应延迟加载，但导入app.main时已加载"
+
+
+def test_import_time_within_budget(import_profile):
+    median, _ = import_profile
+    assert median <= DEFAULT_BUDGET_MS, f"导入app.main耗时{median:.0f}ms超过预算{DEFAULT_BUDGET_MS:.0f}ms"
@@ -0,0 +1,105 @@
+"""
+线程池饱和时监控接口仍可响应
+
+占满AnyIO默认线程池后请求async监控接口：接口和认证依赖都在事件循环中执行，
+应在超时前返回；如果任何依赖是同步函数，请求会排队等待线程而超时。
+"""
+import json
+import threading
+from typing import Any, Dict, List, Tuple
+
+import anyio
+import pytest
+from anyio import to_thread
+from fastapi import FastAPI
+
+from app.api import deps
+from app.api.v1.monitor import database, server
+from app.utils.jwt import create_access_token
+
+PRINCIPAL = {"user_id": 1, "username": "admin", "status": "0", "perms": ["*:*:*"]}
+
+
+async def _get(app: FastAPI, path: str, token: str) -> Tuple[int, Dict[str, Any]]:
+    """直接按ASGI协议发起GET请求"""
+    messages: List[Dict[str, Any]] = []
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await app(scope, receive, send)
+    start = next(m for m in messages if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in messages if m["type"] == "http.response.body")
+    return start["status"], json.loads(body)
+
+
+@pytest.fixture
+def principal(monkeypatch):
+    # 不访问数据库和Redis：权限加载函数直接返回管理员，缓存只使用本地层
+    monkeypatch.setattr(deps, "_load_principal", lambda user_id: dict(PRINCIPAL, user_id=user_id))
+    monkeypatch.setattr(deps.principal_cache, "use_redis", False)
+    deps.principal_cache.local.clear()
+    yield PRINCIPAL
+    deps.principal_cache.local.clear()
+
+
+async def _request_with_saturated_threadpool(app: FastAPI, path: str, token: str) -> Tuple[int, Dict[str, Any]]:
+    limiter = to_thread.current_default_thread_limiter()
+    original_tokens = limiter.total_tokens
+    release = threading.Event()
+    limiter.total_tokens = 2
+    try:
+        async with anyio.create_task_group() as tg:
+            for _ in range(int(limiter.total_tokens)):
+                tg.start_soon(to_thread.run_sync, release.wait)
+            # 等待所有线程都被占用
+            with anyio.fail_after(5):
+                while limiter.borrowed_tokens < limiter.total_tokens:
+                    await anyio.sleep(0.01)
+            try:
+                with anyio.fail_after(5):
+                    return await _get(app, path, token)
+            finally:
+                release.set()
+    finally:
+        release.set()
+        limiter.total_tokens = original_tokens
+
+
+def test_process_info_responds_with_saturated_threadpool(principal):
+    app = FastAPI()
+    app.include_router(server.router, prefix="/monitor/server")
+    token = create_access_token(subject=str(principal["user_id"]))
+
+    status, body = anyio.run(_request_with_saturated_threadpool, app, "/monitor/server/process", token)
+
+    assert status == 200
+    assert body["data"]["threadpool"] is not None
+
+
+def test_pool_status_responds_with_saturated_threadpool(principal):
+    app = FastAPI()
+    app.include_router(database.router, prefix="/monitor/db")
+    token = create_access_token(subject=str(principal["user_id"]))
+
+    status, body = anyio.run(_request_with_saturated_threadpool, app, "/monitor/db/pool", token)
+
+    assert status == 200
+    assert "pools" in body["data"]